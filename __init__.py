@@ -17,17 +17,24 @@ bl_info = {
 import bpy
 
 from .language_lib import language_dict
-from .renderpath_preset import replaceTokens, restoreTokens
+from .renderpath_preset import replaceTokens, restoreTokens, updateFrameTokens, clearFrameTokens
+from .sort_passes import clear_pass_cache_on_load
+from .aov_index import invalidate_aov_index, clear_aov_index_on_load
 from .handy_functions import IDS_OT_Open_Preference, BlenderCompat
 from .core import IDS_AddonPrefs, register_properties, unregister_properties
 from .operators import (
     Compositor_OT_enable_use_nodes,
     IDS_OT_Turn_Denoise,
     IDS_OT_Make_Tree,
+    IDS_OT_Make_Tree_Scenes,
     IDS_OT_Update_Tree,
     IDS_OT_Arr_Tree,
+    IDS_OT_Export_Manifest,
     IDS_OT_CloudMode,
     IDS_OT_Delete_Trash,
+    IDS_OT_Scan_Outputs,
+    IDS_OT_Benchmark_Codecs,
+    IDS_OT_Apply_Codec_Recommendation,
     IDS_OT_Set_Material_AOV,
     IDS_OT_Make_DatalayerNew,
     IDS_OT_Make_DatalayerCopy,
@@ -47,9 +54,14 @@ reg_clss = [
     IDS_OT_Turn_Denoise,
     Compositor_OT_enable_use_nodes,
     IDS_OT_Make_Tree,
+    IDS_OT_Make_Tree_Scenes,
     IDS_OT_Arr_Tree,
     IDS_OT_Update_Tree,
+    IDS_OT_Export_Manifest,
     IDS_OT_Delete_Trash,
+    IDS_OT_Scan_Outputs,
+    IDS_OT_Benchmark_Codecs,
+    IDS_OT_Apply_Codec_Recommendation,
     IDS_OT_Make_DatalayerNew,
     IDS_OT_Make_DatalayerCopy,
     IDS_MT_Make_DatalayerMenu,
@@ -73,6 +85,11 @@ def register():
     bpy.app.handlers.render_init.append(replaceTokens)
     bpy.app.handlers.render_cancel.append(restoreTokens)
     bpy.app.handlers.render_complete.append(restoreTokens)
+    bpy.app.handlers.frame_change_pre.append(updateFrameTokens)
+    bpy.app.handlers.load_post.append(clearFrameTokens)
+    bpy.app.handlers.load_post.append(clear_pass_cache_on_load)
+    bpy.app.handlers.load_post.append(clear_aov_index_on_load)
+    bpy.app.handlers.depsgraph_update_post.append(invalidate_aov_index)
 
 
 def unregister():
@@ -83,6 +100,11 @@ def unregister():
     bpy.app.handlers.render_init.remove(replaceTokens)
     bpy.app.handlers.render_cancel.remove(restoreTokens)
     bpy.app.handlers.render_complete.remove(restoreTokens)
+    bpy.app.handlers.frame_change_pre.remove(updateFrameTokens)
+    bpy.app.handlers.load_post.remove(clearFrameTokens)
+    bpy.app.handlers.load_post.remove(clear_pass_cache_on_load)
+    bpy.app.handlers.load_post.remove(clear_aov_index_on_load)
+    bpy.app.handlers.depsgraph_update_post.remove(invalidate_aov_index)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,144 @@
+# SPDX-License-Identifier: GPL-3.0-or-later
+# Copyright (C) Roland Vyens
+"""材质 AOV 索引模块
+
+记录每个材质中的 AOV Output 节点（名称与类型），包括嵌套的着色器节点组。
+索引在第一次查询时建立，之后通过 depsgraph_update_post 处理器按材质/节点组
+失效，重复调用时只重新扫描被编辑过的材质。
+"""
+
+from typing import Dict, FrozenSet, Set, Tuple
+
+import bpy
+from bpy.app.handlers import persistent
+
+from .constants import AOV_SUFFIX_EXCLUDE
+
+# (AOV 名称, 类型 "COLOR" / "VALUE")
+AovEntry = Tuple[str, str]
+
+# 材质索引：{材质指针: (材质名, 该材质的 AOV 集合)}
+_MATERIAL_AOVS: Dict[int, Tuple[str, FrozenSet[AovEntry]]] = {}
+# 节点组索引：{节点组指针: (节点组名, 该组及其嵌套组的 AOV 集合)}
+_GROUP_AOVS: Dict[int, Tuple[str, FrozenSet[AovEntry]]] = {}
+# 反向索引：{节点组指针: 直接或间接使用该组的材质/节点组指针}
+_GROUP_USERS: Dict[int, Set[int]] = {}
+
+# AOV 名称中不参与视图层同步的名称
+AOV_NAMES_EXCLUDE = ("", "Pref")
+
+
+def _aov_type(node) -> str:
+    """根据连接的输入判断 AOV 类型，只连接了 Value 时为 VALUE"""
+    color = node.inputs.get("Color")
+    value = node.inputs.get("Value")
+    if value is not None and value.is_linked and not (color is not None and color.is_linked):
+        return "VALUE"
+    return "COLOR"
+
+
+def _scan_tree(node_tree, owner: int, visiting: Set[int]) -> FrozenSet[AovEntry]:
+    """扫描节点树中的 AOV Output 节点，节点组只扫描一次
+
+    Args:
+        node_tree: 材质或节点组的节点树
+        owner: 该节点树所属材质/节点组的指针，用于记录反向索引
+        visiting: 正在扫描的节点组指针，防止循环引用
+    """
+    aovs = set()
+    for node in node_tree.nodes:
+        if node.type == "OUTPUT_AOV":
+            aovs.add((node.name, _aov_type(node)))
+        elif node.type == "GROUP" and node.node_tree is not None:
+            aovs.update(_group_aovs(node.node_tree, visiting))
+            _GROUP_USERS.setdefault(node.node_tree.as_pointer(), set()).add(owner)
+    return frozenset(aovs)
+
+
+def _group_aovs(group, visiting: Set[int]) -> FrozenSet[AovEntry]:
+    """返回节点组（含嵌套组）的 AOV 集合，结果按节点组缓存"""
+    key = group.as_pointer()
+    cached = _GROUP_AOVS.get(key)
+    if cached is not None and cached[0] == group.name:
+        return cached[1]
+    if key in visiting:
+        return frozenset()
+    visiting.add(key)
+    aovs = _scan_tree(group, key, visiting)
+    visiting.discard(key)
+    _GROUP_AOVS[key] = (group.name, aovs)
+    return aovs
+
+
+def material_aovs(material) -> FrozenSet[AovEntry]:
+    """返回材质中的 AOV 集合 {(名称, 类型)}，未使用节点的材质返回空集合"""
+    if not material.use_nodes or material.node_tree is None:
+        return frozenset()
+    key = material.as_pointer()
+    cached = _MATERIAL_AOVS.get(key)
+    if cached is not None and cached[0] == material.name:
+        return cached[1]
+    aovs = _scan_tree(material.node_tree, key, set())
+    _MATERIAL_AOVS[key] = (material.name, aovs)
+    return aovs
+
+
+def collect_aov_names(materials=None) -> Set[str]:
+    """收集所有材质中需要同步到视图层的 AOV 名称
+
+    排除空名称、"Pref" 以及以 AOV_SUFFIX_EXCLUDE 结尾的名称。
+
+    Args:
+        materials: 要扫描的材质，默认使用 bpy.data.materials
+    """
+    names = set()
+    for material in bpy.data.materials if materials is None else materials:
+        for name, _aov_type in material_aovs(material):
+            if name not in AOV_NAMES_EXCLUDE and not name.endswith(AOV_SUFFIX_EXCLUDE):
+                names.add(name)
+    return names
+
+
+def _invalidate(key: int) -> None:
+    """使一个材质或节点组失效，同时使所有使用它的材质/节点组失效"""
+    pending = [key]
+    seen = set()
+    while pending:
+        key = pending.pop()
+        if key in seen:
+            continue
+        seen.add(key)
+        _MATERIAL_AOVS.pop(key, None)
+        if _GROUP_AOVS.pop(key, None) is not None:
+            pending.extend(_GROUP_USERS.pop(key, ()))
+
+
+def clear_aov_index(id_data=None) -> None:
+    """清除 AOV 索引
+
+    Args:
+        id_data: 只清除该材质或节点组（及其使用者），默认清除全部
+    """
+    if id_data is None:
+        _MATERIAL_AOVS.clear()
+        _GROUP_AOVS.clear()
+        _GROUP_USERS.clear()
+    else:
+        _invalidate(id_data.as_pointer())
+
+
+@persistent
+def invalidate_aov_index(scene, depsgraph):
+    """材质或着色器节点组更新后使对应索引失效"""
+    if not _MATERIAL_AOVS and not _GROUP_AOVS:
+        return
+    for update in depsgraph.updates:
+        id_data = update.id
+        if isinstance(id_data, (bpy.types.Material, bpy.types.ShaderNodeTree)):
+            _invalidate(id_data.original.as_pointer())
+
+
+@persistent
+def clear_aov_index_on_load(dummy):
+    """打开文件后材质指针可能被复用，清空索引"""
+    clear_aov_index()
@@ -13,6 +13,7 @@ NODE_LOCATION_OUTPUT = (1200, 0)
 NODE_LOCATION_NORMALIZE = (660, 0)
 NODE_LOCATION_VECTOR_IN = (550, 0)
 NODE_LOCATION_VECTOR_OUT = (780, 0)
+NODE_LOCATION_CONVERT = (660, 0)
 
 # DATA层布局常量
 DATA_LAYER_HORIZONTAL_GAP = 450
@@ -21,12 +22,54 @@ DATA_LAYER_HORIZONTAL_GAP = 450
 NODE_SPACING_LEGACY = 120
 NODE_SPACING_BLENDER_5 = 360
 
+# 解析式布局：高度模型（节点空间单位），不再读取 node.dimensions
+LAYOUT_HEADER_HEIGHT = 30
+LAYOUT_SOCKET_HEIGHT = 22
+LAYOUT_ROW_HEIGHT = 24
+LAYOUT_HIDDEN_HEIGHT = 30
+# 各节点类型在插槽之外绘制的属性行数
+LAYOUT_NODE_ROWS = {
+    "R_LAYERS": 2,
+    "OUTPUT_FILE": 2,
+    "DENOISE": 3,
+    "MATH": 2,
+    "SEPARATE_COLOR": 1,
+    "COMBINE_COLOR": 1,
+    "GROUP": 1,
+}
+LAYOUT_NODE_ROWS_BLENDER_5 = dict(LAYOUT_NODE_ROWS, OUTPUT_FILE=4)
+LAYOUT_ROW_GAP = 20
+LAYOUT_DENOISE_GAP = 10
+LAYOUT_WIDTH_OUTPUT = 420
+LAYOUT_WIDTH_DENOISE = 260
+DATA_LAYER_HORIZONTAL_X = 2070
+
 # =============================================================================
 # EXR格式常量
 # =============================================================================
 EXR_CODEC_DEFAULT = "ZIPS"
 EXR_COLOR_DEPTH_RGBA = "16"
 EXR_COLOR_DEPTH_DATA = "32"
+EXR_COLOR_DEPTH_DATA_HALF = "16"
+# 拆分半精度DATA时各pass的位深，未列出的pass使用 EXR_COLOR_DEPTH_DATA
+# 世界坐标和深度需要完整精度；法线、UV和运动矢量用半精度即可
+EXR_DATA_PASS_PRECISION = {
+    "Depth": "32",
+    "Deep_From_Image_z": "32",
+    "Depth_AA$$aoP": "32",
+    "Position": "32",
+    "Position_AA$$aoP": "32",
+    "Pref": "32",
+    "Normal": "16",
+    "UV": "16",
+    "Vector": "16",
+}
+# 各输出类型可推荐的无损编码（PXR24 对16位半精度无损，对32位浮点有损）
+EXR_LOSSLESS_CODECS = {
+    "RGBA": ("NONE", "RLE", "ZIPS", "ZIP", "PIZ", "PXR24"),
+    "DATA": ("NONE", "RLE", "ZIPS", "ZIP", "PIZ"),
+    "CRYPTO": ("NONE", "RLE", "ZIPS", "ZIP", "PIZ"),
+}
 
 # =============================================================================
 # 视图层标识常量
@@ -60,6 +103,52 @@ AOV_CATEGORY_DEBUG = ["Debug Sample Count"]
 
 # AOV排除列表
 DENOISE_EXCLUDE_PASSES = ["Image", "Shadow Catcher"]
+
+# 降噪策略：各预设下每类pass是否降噪，以及prefilter/quality设置
+# 共享预过滤的降噪辅助pass：渲染层输出名 -> 节点角色前缀
+DENOISE_AUX_PASSES = {"Denoising Normal": "Normal", "Denoising Albedo": "Albedo"}
+# 降噪节点把输入当颜色处理并截断负值，法线在共享降噪前映射到 [0, 1]，降噪后再映射回来
+# 渲染层输出名 -> (编码节点组, 解码节点组)
+DENOISE_AUX_REMAP = {"Denoising Normal": ("IAC_NormalEncode", "IAC_NormalDecode")}
+
+DENOISE_POLICY_COLOR_PASSES = [
+    "DiffCol", "GlossCol", "TransCol",
+    "Diffuse Color", "Glossy Color", "Transmission Color",
+]
+DENOISE_POLICY_FLAT_PASSES = ["Emit", "Env", "Emission", "Environment"]
+DENOISE_POLICIES = {
+    "FINAL": {
+        "LIGHTING": {"denoise": True, "prefilter": "ACCURATE", "quality": "HIGH"},
+        "LIGHTGROUP": {"denoise": True, "prefilter": "ACCURATE", "quality": "HIGH"},
+        "COLOR": {"denoise": True, "prefilter": "ACCURATE", "quality": "HIGH"},
+        "FLAT": {"denoise": True, "prefilter": "ACCURATE", "quality": "HIGH"},
+        "AUX": {"denoise": True, "prefilter": "NONE", "quality": "HIGH"},
+    },
+    "PREVIEW": {
+        "LIGHTING": {"denoise": True, "prefilter": "FAST", "quality": "FAST"},
+        "LIGHTGROUP": {"denoise": True, "prefilter": "FAST", "quality": "FAST"},
+        "COLOR": {"denoise": False},
+        "FLAT": {"denoise": False},
+        "AUX": {"denoise": True, "prefilter": "NONE", "quality": "FAST"},
+    },
+    "NONE": {
+        "LIGHTING": {"denoise": False},
+        "LIGHTGROUP": {"denoise": False},
+        "COLOR": {"denoise": False},
+        "FLAT": {"denoise": False},
+        "AUX": {"denoise": False},
+    },
+}
+# Blender 5.0 起prefilter/quality为菜单输入接口，按显示名称赋值
+DENOISE_OPTION_SOCKETS = {"prefilter": "Prefilter", "quality": "Quality", "use_hdr": "HDR"}
+DENOISE_MENU_LABELS = {
+    "NONE": "None",
+    "FAST": "Fast",
+    "ACCURATE": "Accurate",
+    "HIGH": "High",
+    "BALANCED": "Balanced",
+    "FOLLOW_SCENE": "Follow Scene",
+}
 AOV_SUFFIX_EXCLUDE = "$$aoP"
 
 # =============================================================================
@@ -69,12 +158,21 @@ NODE_NAME_SEPARATOR = "--"
 
 # 节点后缀
 NODE_SUFFIX_DENOISE = "_Dn"
+NODE_SUFFIX_DENOISE_AUX = "_DnAux"
+NODE_SUFFIX_DENOISE_ENCODE = "_DnEncode"
+NODE_SUFFIX_DENOISE_DECODE = "_DnDecode"
 NODE_SUFFIX_BREAK = "_Break"
 NODE_SUFFIX_COMBINE = "_Combine"
 NODE_SUFFIX_INVERT = "_Inv"
 NODE_SUFFIX_NORMALIZE = "_Normalize"
 NODE_SUFFIX_VECTOR_IN = "_VectorIn"
 NODE_SUFFIX_VECTOR_OUT = "_VectorOut"
+NODE_SUFFIX_CONVERT = "_Convert"
+
+# 向量转换节点组（bpy.data.node_groups 中共享，每个pass一个组节点）
+VECTOR_GROUP_TO_NUKE = "IAC_VectorToNuke"
+VECTOR_GROUP_XYZ = "IAC_VectorXYZ"
+VECTOR_GROUP_MOTION = "IAC_MotionVectorToNuke"
 
 # 输出节点后缀
 OUTPUT_SUFFIX_RGBA = "RgBA"
@@ -82,6 +180,8 @@ OUTPUT_SUFFIX_DATA = "DaTA"
 OUTPUT_SUFFIX_CRYPTO = "CryptoMaTTe"
 OUTPUT_SUFFIX_ALL = "AlL"
 OUTPUT_SUFFIX_DEEP = "Deep"
+# 半精度DATA输出，不能包含其他输出后缀（如 "DaTA"）
+OUTPUT_SUFFIX_DATA_HALF = "HaLF"
 
 # 标签后缀
 LABEL_SUFFIX_RGBA = "RGBA"
@@ -89,6 +189,16 @@ LABEL_SUFFIX_DATA = "DATA"
 LABEL_SUFFIX_CRYPTO = "CryptoMatte"
 LABEL_SUFFIX_ALL = "ALL"
 LABEL_SUFFIX_DEEP = "DEEP"
+LABEL_SUFFIX_DATA_HALF = "DATA_HALF"
+
+# RGBA拆分组：(组标识, 输出节点后缀, 标签后缀, 输出类型)，后缀不能互相包含
+RGBA_SPLIT_GROUPS = (
+    ("LIGHTGROUPS", "LiGHTs", "LIGHTGROUPS", "RGBA_lightgroups"),
+    ("SHADING", "ShADiNG", "SHADING", "RGBA_shading"),
+    ("AOVS", "AoVs", "AOVS", "RGBA_aovs"),
+)
+# 灯光组pass名称前缀
+LIGHTGROUP_PASS_PREFIX = "Combined_"
 
 # Deep输出布局（相对RGBA横向偏移）
 DEEP_OUTPUT_X_OFFSET = 450
@@ -0,0 +1,359 @@
+# SPDX-License-Identifier: GPL-3.0-or-later
+# Copyright (C) Roland Vyens
+"""EXR codec benchmark for Industrial AOV Connector.
+
+Renders a small test frame of one view layer (Cycles on CPU, single layer,
+reduced resolution and samples, compositing off so no File Output node
+writes) and saves the render result
+once as a full float multilayer EXR. A temporary scene then composites that
+file without rendering: it has an Image node and one File Output node per
+output type, holding only that type's passes (``pass_output_type``) at its
+color depth. Every output type is written through every available codec, timed
+for writing and for reading the file back into Blender, and its file size is
+recorded. The temporary scene, its nodes and the files are deleted afterwards.
+"""
+
+import json
+import os
+import shutil
+import tempfile
+import time
+from contextlib import contextmanager
+
+import bpy
+
+from ..constants import (
+    EXR_COLOR_DEPTH_DATA,
+    EXR_COLOR_DEPTH_RGBA,
+    EXR_LOSSLESS_CODECS,
+)
+from ..handy_functions import CompositorHelper
+from .output_scan import frame_file, frame_pattern
+from .tree_plan import is_data_layer
+
+REPORT_VERSION = 2
+
+BENCH_SCENE_NAME = "IAC Codec Bench"
+
+# Output type -> color depth its files are written with
+OUTPUT_DEPTHS = {
+    "RGBA": EXR_COLOR_DEPTH_RGBA,
+    "DATA": EXR_COLOR_DEPTH_DATA,
+    "CRYPTO": EXR_COLOR_DEPTH_DATA,
+}
+
+# Scene property holding the codec of each output type
+CODEC_PROPERTIES = {
+    "RGBA": "IDS_RGBACompression",
+    "DATA": "IDS_DATACompression",
+    "CRYPTO": "IDS_CryptoCompression",
+}
+
+# Storage throughput assumed for the recommendation, 1 GbE
+STORAGE_MB_PER_S = 125.0
+
+
+def available_codecs() -> list:
+    """EXR codecs both the scene properties and this Blender build support."""
+    offered = [
+        item.identifier
+        for item in bpy.types.Scene.bl_rna.properties["IDS_RGBACompression"].enum_items
+    ]
+    codec_prop = bpy.types.ImageFormatSettings.bl_rna.properties.get("exr_codec")
+    if codec_prop is None:
+        return offered
+    supported = {item.identifier for item in codec_prop.enum_items}
+    return [codec for codec in offered if codec in supported]
+
+
+def pass_output_type(socket):
+    """Output type a pass of the test frame is written to, None to skip it.
+
+    Follows the PassSorter split: Crypto passes, color passes and float or
+    vector data; Alpha and denoising passes are not written.
+    """
+    name = socket.name
+    if "Crypto" in name:
+        return "CRYPTO"
+    if name == "Alpha" or "Denoising" in name or "Noisy" in name:
+        return None
+    if socket.bl_idname == "NodeSocketColor":
+        return "RGBA"
+    return "DATA"
+
+
+def round_trip_ms(row, storage_mb_per_s=STORAGE_MB_PER_S) -> float:
+    """Write, transfer out, transfer back and read time of one file."""
+    transfer_ms = 2 * row["bytes"] / (storage_mb_per_s * 1e6) * 1000
+    return row["write_ms"] + row["read_ms"] + transfer_ms
+
+
+def recommend(results, output_type, storage_mb_per_s=STORAGE_MB_PER_S) -> str:
+    """Pick the codec for ``output_type`` from benchmark results.
+
+    Takes the lossless codec of the type with the shortest ``round_trip_ms``,
+    the smaller file on a tie.
+
+    Returns:
+        str: Codec identifier, or "" when no lossless codec was measured
+    """
+    candidates = [
+        r for r in results
+        if r["output_type"] == output_type and r["codec"] in EXR_LOSSLESS_CODECS[output_type]
+    ]
+    if not candidates:
+        return ""
+    best = min(candidates, key=lambda r: (round_trip_ms(r, storage_mb_per_s), r["bytes"]))
+    return best["codec"]
+
+
+def load_report(scene) -> dict:
+    """Return the stored benchmark report of ``scene``, None if there is none."""
+    text = scene.IDS_CodecBenchReport
+    if not text:
+        return None
+    try:
+        report = json.loads(text)
+    except ValueError:
+        return None
+    if report.get("version") != REPORT_VERSION:
+        return None
+    return report
+
+
+@contextmanager
+def _overridden(target, **values):
+    """Temporarily set attributes of ``target``, skipping missing ones."""
+    previous = {}
+    try:
+        for attr, value in values.items():
+            if hasattr(target, attr):
+                previous[attr] = getattr(target, attr)
+                setattr(target, attr, value)
+        yield
+    finally:
+        for attr, value in reversed(list(previous.items())):
+            setattr(target, attr, value)
+
+
+@contextmanager
+def _exr_output(settings):
+    """Switch image settings to multilayer EXR, restoring them afterwards.
+
+    Blender 5.0 only accepts OPEN_EXR_MULTILAYER with the multi-layer media
+    type, so the media type is set and restored before the file format.
+    """
+    attrs = ("media_type", "file_format", "color_depth", "exr_codec")
+    previous = [(attr, getattr(settings, attr)) for attr in attrs if hasattr(settings, attr)]
+    try:
+        if hasattr(settings, "media_type"):
+            settings.media_type = "MULTI_LAYER_IMAGE"
+        settings.file_format = "OPEN_EXR_MULTILAYER"
+        yield settings
+    finally:
+        for attr, value in previous:
+            setattr(settings, attr, value)
+
+
+@contextmanager
+def _bench_scene(source):
+    """Temporary scene compositing ``source`` into one File Output node per output type.
+
+    The scene has no Render Layers node, so rendering it only runs the
+    compositor. Up to Blender 4.5 compositing also needs a Composite node.
+
+    Yields:
+        tuple: (scene, {output type: File Output node}), only output types
+        the file has passes for
+    """
+    image = bpy.data.images.load(source, check_existing=False)
+    scene = bpy.data.scenes.new(BENCH_SCENE_NAME)
+    try:
+        # Accessing the size loads the layers the Image node exposes
+        width, height = image.size[:]
+        render = scene.render
+        render.resolution_x = width
+        render.resolution_y = height
+        render.resolution_percentage = 100
+        CompositorHelper.enable(scene)
+        tree = CompositorHelper.get_node_tree(scene)
+        image_node = tree.nodes.new("CompositorNodeImage")
+        image_node.image = image
+        if bpy.app.version < (5, 0, 0):
+            composite = tree.nodes.new("CompositorNodeComposite")
+            tree.links.new(image_node.outputs["Image"], composite.inputs["Image"])
+
+        passes = {}
+        for socket in image_node.outputs:
+            output_type = pass_output_type(socket) if socket.enabled else None
+            if output_type is not None:
+                passes.setdefault(output_type, []).append(socket)
+        outputs = {}
+        for output_type, sockets in passes.items():
+            node = tree.nodes.new("CompositorNodeOutputFile")
+            node.name = output_type
+            if hasattr(node.format, "media_type"):
+                node.format.media_type = "MULTI_LAYER_IMAGE"
+            node.format.file_format = "OPEN_EXR_MULTILAYER"
+            node.format.color_depth = OUTPUT_DEPTHS[output_type]
+            for i in reversed(range(len(CompositorHelper.get_slots(node)))):
+                CompositorHelper.remove_slot(node, i)
+            for socket in sockets:
+                CompositorHelper.add_slot(node, socket.name)
+                tree.links.new(socket, node.inputs[-1])
+            outputs[output_type] = node
+        yield scene, outputs
+    finally:
+        group = getattr(scene, "compositing_node_group", None)
+        bpy.data.scenes.remove(scene)
+        if group is not None:
+            bpy.data.node_groups.remove(group)
+        bpy.data.images.remove(image)
+
+
+class CodecBenchmark:
+    """负责测量各输出类型在各EXR编码下的写入、读取耗时和文件大小"""
+
+    def __init__(self, scene, resolution_percentage=25, samples=16, repeat=2,
+                 storage_mb_per_s=STORAGE_MB_PER_S):
+        """Args:
+            scene: Scene to render the test frame from
+            resolution_percentage: Render size of the test frame
+            samples: Cycles samples of the test frame
+            repeat: Writes/reads per codec, the fastest one is kept
+            storage_mb_per_s: Storage throughput used for the recommendation
+        """
+        self.scene = scene
+        self.resolution_percentage = resolution_percentage
+        self.samples = samples
+        self.repeat = max(1, repeat)
+        self.storage_mb_per_s = storage_mb_per_s
+
+    def test_view_layer(self):
+        """View layer the test frame renders: the active one when it is an
+        enabled, non-DATA layer, else the first such layer of the scene.
+
+        Raises:
+            RuntimeError: If the scene has no enabled regular view layer
+        """
+        layers = [
+            layer for layer in self.scene.view_layers
+            if layer.use and not is_data_layer(layer.name)
+        ]
+        if not layers:
+            raise RuntimeError("The scene has no enabled regular view layer to render")
+        active = bpy.context.view_layer
+        return active if active in layers else layers[0]
+
+    def render_test_frame(self):
+        """Render one view layer with Cycles on CPU and return the Render Result image."""
+        scene = self.scene
+        render = scene.render
+        view_layer = self.test_view_layer()
+        with _overridden(
+            render,
+            engine="CYCLES",
+            use_single_layer=True,
+            resolution_percentage=self.resolution_percentage,
+            use_compositing=False,
+            use_sequencer=False,
+        ), _overridden(
+            getattr(scene, "cycles", None), device="CPU", samples=self.samples, use_denoising=False
+        ), bpy.context.temp_override(scene=scene, view_layer=view_layer):
+            bpy.ops.render.render(write_still=False, scene=scene.name)
+        return bpy.data.images["Render Result"]
+
+    def _save_source(self, result, path) -> None:
+        """Save the Render Result with all passes as uncompressed full float EXR."""
+        with _exr_output(self.scene.render.image_settings) as settings:
+            settings.color_depth = EXR_COLOR_DEPTH_DATA
+            settings.exr_codec = "NONE"
+            result.save_render(path, scene=self.scene)
+
+    @staticmethod
+    def _composite_ms(scene) -> float:
+        start = time.perf_counter()
+        bpy.ops.render.render(write_still=False, scene=scene.name)
+        return (time.perf_counter() - start) * 1000
+
+    def _baseline_ms(self, scene, outputs) -> float:
+        """Compositing time of the bench scene with every File Output node muted."""
+        for node in outputs.values():
+            node.mute = True
+        return min(self._composite_ms(scene) for _ in range(self.repeat))
+
+    def _measure(self, scene, outputs, output_type, codec, folder, baseline_ms) -> dict:
+        node = outputs[output_type]
+        for other in outputs.values():
+            other.mute = other is not node
+        node.format.exr_codec = codec
+        base_path = os.path.join(folder, f"bench_{output_type}_{codec}_")
+        CompositorHelper.set_output_path(node, base_path)
+        path = frame_file(frame_pattern(base_path), scene.frame_current)
+
+        write_ms = read_ms = None
+        for _ in range(self.repeat):
+            elapsed = max(0.0, self._composite_ms(scene) - baseline_ms)
+            write_ms = elapsed if write_ms is None else min(write_ms, elapsed)
+
+            image = bpy.data.images.load(path, check_existing=False)
+            try:
+                start = time.perf_counter()
+                # Accessing the size makes Blender decode the file
+                image.size[:]
+                elapsed = (time.perf_counter() - start) * 1000
+            finally:
+                bpy.data.images.remove(image)
+            read_ms = elapsed if read_ms is None else min(read_ms, elapsed)
+        return {
+            "output_type": output_type,
+            "codec": codec,
+            "depth": OUTPUT_DEPTHS[output_type],
+            "bytes": os.path.getsize(path),
+            "write_ms": round(write_ms, 2),
+            "read_ms": round(read_ms, 2),
+        }
+
+    def run(self, result=None, codecs=None) -> dict:
+        """Measure every codec for every output type.
+
+        Args:
+            result: Render Result image to write; renders a test frame when None
+            codecs: Codecs to measure, default ``available_codecs()``
+
+        Returns:
+            dict: Report with ``results`` rows and ``recommended`` codec per
+            output type
+        """
+        if result is None:
+            result = self.render_test_frame()
+        codecs = available_codecs() if codecs is None else codecs
+        folder = tempfile.mkdtemp(prefix="iac_codec_")
+        results = []
+        try:
+            source = os.path.join(folder, "source.exr")
+            self._save_source(result, source)
+            with _bench_scene(source) as (scene, outputs):
+                baseline_ms = self._baseline_ms(scene, outputs)
+                for output_type in OUTPUT_DEPTHS:
+                    if output_type not in outputs:
+                        continue
+                    for codec in codecs:
+                        results.append(
+                            self._measure(scene, outputs, output_type, codec, folder, baseline_ms)
+                        )
+        finally:
+            shutil.rmtree(folder, ignore_errors=True)
+
+        render = self.scene.render
+        scale = self.resolution_percentage / 100
+        return {
+            "version": REPORT_VERSION,
+            "resolution": [int(render.resolution_x * scale), int(render.resolution_y * scale)],
+            "storage_mb_per_s": self.storage_mb_per_s,
+            "results": results,
+            "recommended": {
+                output_type: recommend(results, output_type, self.storage_mb_per_s)
+                for output_type in OUTPUT_DEPTHS
+            },
+        }
@@ -0,0 +1,131 @@
+# SPDX-License-Identifier: GPL-3.0-or-later
+# Copyright (C) Roland Vyens
+"""Scene-level cook for Industrial AOV Connector.
+
+``cook_scene`` runs the steps of the Cook Nodetree / Update operators for one
+scene: connect, DATA layer samples, denoise policy, arrange, rename outputs
+and the trash_output redirect. It does not read the screen, the active scene or the
+active view layer, so scripts and background sessions can call it directly.
+``cook_scenes`` cooks several scenes in one operation with a shared
+CookSession.
+"""
+
+import bpy
+
+from ..handy_functions import CompositorHelper, DataLayerHelper
+from ..path_modify_v2 import PathManager
+from .denoise_policy import apply_denoise_policy
+from .node_builder import (
+    NodeConnector,
+    NodeArranger,
+    get_addon_prefs,
+    get_material_aovs,
+)
+from .profiling import profile_phase
+
+
+class CookError(Exception):
+    """Raised when a scene cannot be cooked with the current settings.
+
+    The message is already translated.
+    """
+
+
+def validate_scene(scene) -> None:
+    """Check that ``scene`` can be cooked.
+
+    Raises:
+        CookError: If the compositor is off or Deep EXR is unsupported
+    """
+    if not CompositorHelper.is_enabled(scene):
+        raise CookError(
+            bpy.app.translations.pgettext('Compositor is not enabled in scene "{scene}"').format(
+                scene=scene.name
+            )
+        )
+    if scene.IDS_UseDeepEXR and not CompositorHelper.supports_deep_exr():
+        raise CookError(
+            bpy.app.translations.pgettext(
+                "Deep EXR output requires your custom Blender branch with DEEP_EXR compositor support"
+            )
+        )
+
+
+class CookSession:
+    """负责在一次操作中共享插件设置和材质AOV扫描结果
+
+    ``get_material_aovs()`` walks every view layer of every scene, so its
+    result is the same for all scenes cooked in one operation.
+    """
+
+    def __init__(self, addon_prefs=None, material_aovs=None):
+        self.addon_prefs = addon_prefs or get_addon_prefs()
+        self.material_aovs = get_material_aovs() if material_aovs is None else material_aovs
+
+
+def cook_scene(scene, view_layer=None, profiler=None, session=None):
+    """Cook the connector nodes of ``scene``.
+
+    Args:
+        scene: Scene to cook
+        view_layer: Name of the only view layer to update (Update operator),
+            None cooks every view layer (Cook Nodetree)
+        profiler: Optional CookProfiler receiving the phase timings
+        session: CookSession shared with other scenes, None for a new one
+
+    Returns:
+        NodeConnector: The connector of the run (plan, changed_layers)
+    """
+    session = session or CookSession()
+    connector = NodeConnector(scene, profiler, session.addon_prefs, session.material_aovs)
+    arranger = NodeArranger(scene, session.addon_prefs)
+    adv = scene.IDS_AdvMode is True and scene.IDS_UseDATALayer is True
+
+    if view_layer is None:
+        if adv:
+            connector.connect_all_adv()
+            DataLayerHelper.auto_sample(scene)
+        else:
+            connector.connect_all()
+    else:
+        if adv:
+            connector.connect_current_adv(view_layer)
+            DataLayerHelper.update_sample(scene.view_layers[view_layer])
+        else:
+            connector.connect_current(view_layer)
+    apply_denoise_policy(scene)
+
+    with profile_phase(profiler, "arrange"):
+        arranger.arrange_all(connector.changed_layers)
+    with profile_phase(profiler, "rename"):
+        arranger.rename_outputs()
+    with profile_phase(profiler, "trash"):
+        PathManager(scene).move_to_trash_output()
+    return connector
+
+
+def cook_scenes(scenes, profiler_factory=None, session=None):
+    """Cook several scenes with one shared CookSession.
+
+    A scene that fails ``validate_scene`` is skipped; the others are cooked.
+
+    Args:
+        scenes: Scenes to cook
+        profiler_factory: Optional callable(scene) returning a CookProfiler
+        session: CookSession to share, None for a new one
+
+    Returns:
+        list: (scene, profiler or None, CookError or None) per scene
+    """
+    session = session or CookSession()
+    results = []
+    for scene in scenes:
+        try:
+            validate_scene(scene)
+        except CookError as e:
+            results.append((scene, None, e))
+            continue
+        profiler = profiler_factory(scene) if profiler_factory else None
+        cook_scene(scene, profiler=profiler, session=session)
+        results.append((scene, profiler, None))
+    return results
@@ -0,0 +1,128 @@
+# SPDX-License-Identifier: GPL-3.0-or-later
+# Copyright (C) Roland Vyens
+"""Denoise policy presets for Industrial AOV Connector.
+
+The cook always builds the denoise nodes; a policy (``DENOISE_POLICIES``)
+decides per pass category whether a node denoises or is muted, and which
+prefilter and quality it uses. Muted denoise nodes pass their image through
+untouched and cost nothing, so switching the preset changes the denoise cost
+of the next render without re-cooking the tree.
+
+Denoise nodes fed by the shared auxiliary nodes of their layer
+(``Normal_DnAux``, ``Albedo_DnAux``, category AUX) get no prefilter of their own
+while the policy denoises the aux nodes: those already cleaned the normal and
+albedo once for the whole layer. Those layers are found from the node names,
+without walking links. The aux nodes run with HDR off, their inputs lie in
+[0, 1] (the normal is remapped by the planner).
+
+Prefilter and quality are node properties up to Blender 4.5 (quality since
+4.4) and menu inputs from 5.0; options a build does not have are skipped.
+"""
+
+from ..constants import (
+    DENOISE_AUX_PASSES,
+    DENOISE_MENU_LABELS,
+    DENOISE_OPTION_SOCKETS,
+    DENOISE_POLICIES,
+    DENOISE_POLICY_COLOR_PASSES,
+    DENOISE_POLICY_FLAT_PASSES,
+    LIGHTGROUP_PASS_PREFIX,
+    NODE_SUFFIX_DENOISE,
+    NODE_SUFFIX_DENOISE_AUX,
+)
+from ..handy_functions import CompositorHelper
+from .node_index import split_node_name
+
+AUX_ROLES = {f"{prefix}{NODE_SUFFIX_DENOISE_AUX}" for prefix in DENOISE_AUX_PASSES.values()}
+
+
+def denoise_category(socket) -> str:
+    """Return the policy category of a color pass."""
+    if socket.startswith(LIGHTGROUP_PASS_PREFIX):
+        return "LIGHTGROUP"
+    if socket in DENOISE_POLICY_COLOR_PASSES:
+        return "COLOR"
+    if socket in DENOISE_POLICY_FLAT_PASSES:
+        return "FLAT"
+    return "LIGHTING"
+
+
+def pass_rule(policy, socket) -> dict:
+    """Return the rule of ``policy`` for the color pass ``socket``."""
+    return DENOISE_POLICIES[policy][denoise_category(socket)]
+
+
+def _shared_aux_layers(scene, tree) -> set:
+    """Return the view layers whose denoise nodes use shared aux nodes."""
+    if not getattr(scene, "IDS_ShareDenoiseAux", False):
+        return set()
+    layers = set()
+    for node in tree.nodes:
+        view_layer, role = split_node_name(node.name)
+        if role in AUX_ROLES:
+            layers.add(view_layer)
+    return layers
+
+
+def _set_option(node, attr, value) -> bool:
+    """Set a denoise option through its property or its 5.0 menu input.
+
+    Returns:
+        bool: False when this Blender build has no such option
+    """
+    if hasattr(node, attr):
+        if getattr(node, attr) != value:
+            setattr(node, attr, value)
+        return True
+    socket = node.inputs.get(DENOISE_OPTION_SOCKETS[attr])
+    if socket is None or socket.is_linked:
+        return False
+    if isinstance(value, str):
+        value = DENOISE_MENU_LABELS[value]
+    if socket.default_value != value:
+        socket.default_value = value
+    return True
+
+
+def apply_denoise_policy(scene, policy=None) -> dict:
+    """Apply a denoise policy to the connector denoise nodes of ``scene``.
+
+    Args:
+        scene: Scene whose compositor tree is updated
+        policy: Key of ``DENOISE_POLICIES``, default ``scene.IDS_DenoisePolicy``
+
+    Returns:
+        dict: Numbers of ``denoised`` and ``muted`` nodes, shared aux nodes
+        included
+    """
+    policy = policy or scene.IDS_DenoisePolicy
+    counts = {"denoised": 0, "muted": 0}
+    tree = CompositorHelper.get_node_tree(scene)
+    if tree is None:
+        return counts
+    aux_denoised = DENOISE_POLICIES[policy]["AUX"]["denoise"]
+    aux_layers = _shared_aux_layers(scene, tree) if aux_denoised else set()
+    for node in tree.nodes:
+        if node.type != "DENOISE":
+            continue
+        view_layer, role = split_node_name(node.name)
+        if role in AUX_ROLES:
+            rule = DENOISE_POLICIES[policy]["AUX"]
+        elif role is not None and role.endswith(NODE_SUFFIX_DENOISE):
+            rule = pass_rule(policy, role[:-len(NODE_SUFFIX_DENOISE)])
+            if rule["denoise"] and view_layer in aux_layers:
+                rule = dict(rule, prefilter="NONE")
+        else:
+            continue
+        mute = not rule["denoise"]
+        if node.mute != mute:
+            node.mute = mute
+        if mute:
+            counts["muted"] += 1
+            continue
+        for attr in ("prefilter", "quality"):
+            _set_option(node, attr, rule[attr])
+        if role in AUX_ROLES:
+            _set_option(node, "use_hdr", False)
+        counts["denoised"] += 1
+    return counts
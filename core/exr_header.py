@@ -0,0 +1,199 @@
+# SPDX-License-Identifier: GPL-3.0-or-later
+# Copyright (C) Roland Vyens
+"""Minimal OpenEXR header reader.
+
+``read_header`` memory-maps a file and parses only the header attributes and
+the chunk offset table, never pixel data. Besides the channel list it checks
+that every chunk offset points inside the file: OpenEXR writes the offset
+table as zeros and fills it in when the file is closed, so an interrupted
+render leaves zero or out of range offsets.
+
+This module does not import bpy.
+"""
+
+import mmap
+import struct
+from dataclasses import dataclass, field
+
+EXR_MAGIC = 20000630
+
+# Version field flags
+FLAG_TILED = 0x200
+FLAG_LONG_NAMES = 0x400
+FLAG_NON_IMAGE = 0x800
+FLAG_MULTIPART = 0x1000
+
+PIXEL_TYPES = {0: "UINT", 1: "HALF", 2: "FLOAT"}
+
+COMPRESSIONS = ("NONE", "RLE", "ZIPS", "ZIP", "PIZ", "PXR24", "B44", "B44A", "DWAA", "DWAB")
+# Scanlines per chunk for each compression
+LINES_PER_CHUNK = {
+    "NONE": 1, "RLE": 1, "ZIPS": 1, "ZIP": 16, "PIZ": 32, "PXR24": 16,
+    "B44": 32, "B44A": 32, "DWAA": 32, "DWAB": 256,
+}
+
+
+class ExrHeaderError(Exception):
+    """Raised when a file is not a readable OpenEXR file."""
+
+
+@dataclass
+class ExrPart:
+    """Header attributes of one part of an EXR file"""
+    channels: dict = field(default_factory=dict)
+    compression: str = "NONE"
+    data_window: tuple = (0, 0, 0, 0)
+    name: str = ""
+    type: str = ""
+    chunk_count: int = None
+    tiled: bool = False
+
+
+@dataclass
+class ExrHeader:
+    """Parsed header of an EXR file"""
+    path: str
+    file_size: int
+    version: int
+    flags: int
+    parts: list = field(default_factory=list)
+    # True when every chunk offset points inside the file, None if unknown
+    complete: bool = None
+
+    @property
+    def multipart(self) -> bool:
+        return bool(self.flags & FLAG_MULTIPART)
+
+    @property
+    def deep(self) -> bool:
+        return bool(self.flags & FLAG_NON_IMAGE)
+
+    @property
+    def channels(self) -> dict:
+        """{channel name: pixel type} over all parts."""
+        channels = {}
+        for part in self.parts:
+            channels.update(part.channels)
+        return channels
+
+
+def _cstring(buf, pos, end):
+    stop = buf.find(b"\0", pos, end)
+    if stop == -1:
+        raise ExrHeaderError("unterminated string in header")
+    return buf[pos:stop].decode("utf-8", "replace"), stop + 1
+
+
+def _channels(value) -> dict:
+    """Parse a ``chlist`` attribute value."""
+    channels = {}
+    pos = 0
+    while pos < len(value) and value[pos] != 0:
+        stop = value.index(b"\0", pos)
+        name = value[pos:stop].decode("utf-8", "replace")
+        (pixel_type,) = struct.unpack_from("<i", value, stop + 1)
+        channels[name] = PIXEL_TYPES.get(pixel_type, str(pixel_type))
+        pos = stop + 1 + 16
+    return channels
+
+
+def _set_attribute(part, name, kind, value) -> None:
+    if kind == "chlist":
+        part.channels = _channels(value)
+    elif kind == "compression":
+        index = value[0]
+        part.compression = COMPRESSIONS[index] if index < len(COMPRESSIONS) else str(index)
+    elif name == "dataWindow" and kind == "box2i":
+        part.data_window = struct.unpack_from("<4i", value)
+    elif name == "chunkCount" and kind == "int":
+        (part.chunk_count,) = struct.unpack_from("<i", value)
+    elif name == "name" and kind == "string":
+        part.name = value.decode("utf-8", "replace")
+    elif name == "type" and kind == "string":
+        part.type = value.decode("utf-8", "replace")
+        part.tiled = "tile" in part.type
+    elif kind == "tiledesc":
+        part.tiled = True
+
+
+def _chunk_count(part):
+    """Number of chunks in the offset table of ``part``, None if unknown."""
+    if part.chunk_count is not None:
+        return part.chunk_count
+    if part.tiled:
+        return None
+    lines = part.data_window[3] - part.data_window[1] + 1
+    per_chunk = LINES_PER_CHUNK.get(part.compression)
+    if per_chunk is None or lines <= 0:
+        return None
+    return -(-lines // per_chunk)
+
+
+def parse_header(buf, path="", file_size=None) -> ExrHeader:
+    """Parse the header of an EXR file held in ``buf`` (bytes or mmap).
+
+    Raises:
+        ExrHeaderError: If ``buf`` does not hold an EXR header
+    """
+    size = len(buf) if file_size is None else file_size
+    if size < 8:
+        raise ExrHeaderError("file too small for an EXR header")
+    magic, version_field = struct.unpack_from("<ii", buf, 0)
+    if magic != EXR_MAGIC:
+        raise ExrHeaderError("not an OpenEXR file")
+    header = ExrHeader(path, size, version_field & 0xFF, version_field & ~0xFF)
+
+    pos = 8
+    part = ExrPart(tiled=bool(header.flags & FLAG_TILED) and not header.multipart)
+    while True:
+        if pos >= size:
+            raise ExrHeaderError("header ends before its terminator")
+        name, pos = _cstring(buf, pos, size)
+        if not name:
+            # End of one header; multipart files end the list with an empty header
+            header.parts.append(part)
+            if not header.multipart:
+                break
+            if pos >= size:
+                raise ExrHeaderError("header ends before its terminator")
+            if buf[pos] == 0:
+                pos += 1
+                break
+            part = ExrPart()
+            continue
+        kind, pos = _cstring(buf, pos, size)
+        if pos + 4 > size:
+            raise ExrHeaderError("header ends inside an attribute")
+        (length,) = struct.unpack_from("<i", buf, pos)
+        pos += 4
+        if length < 0 or pos + length > size:
+            raise ExrHeaderError(f"attribute {name} runs past the end of the file")
+        _set_attribute(part, name, kind, bytes(buf[pos:pos + length]))
+        pos += length
+
+    counts = [_chunk_count(p) for p in header.parts]
+    if any(count is None for count in counts):
+        return header
+    table_end = pos + 8 * sum(counts)
+    if table_end > size:
+        header.complete = False
+        return header
+    offsets = struct.unpack_from(f"<{sum(counts)}Q", buf, pos)
+    header.complete = all(table_end <= offset < size for offset in offsets)
+    return header
+
+
+def read_header(path) -> ExrHeader:
+    """Memory-map ``path`` and parse its EXR header.
+
+    Raises:
+        ExrHeaderError: If the file is empty or not an EXR file
+        OSError: If the file cannot be opened
+    """
+    with open(path, "rb") as f:
+        try:
+            buf = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            raise ExrHeaderError("empty file") from None
+        with buf:
+            return parse_header(buf, path)
@@ -0,0 +1,277 @@
+# SPDX-License-Identifier: GPL-3.0-or-later
+# Copyright (C) Roland Vyens
+"""Analytic node layout for Industrial AOV Connector.
+
+Node heights come from a model of the node type, its visible sockets and the
+property rows it draws, instead of ``node.dimensions``, which Blender only
+fills in after a node editor has drawn the tree. Layout is deterministic and
+also works in background mode. This module does not import bpy.
+"""
+
+from ..constants import (
+    DATA_LAYER_PREFIX,
+    DATA_LAYER_HORIZONTAL_X,
+    DEEP_OUTPUT_X_OFFSET,
+    LAYOUT_DENOISE_GAP,
+    LAYOUT_HEADER_HEIGHT,
+    LAYOUT_HIDDEN_HEIGHT,
+    LAYOUT_NODE_ROWS,
+    LAYOUT_ROW_GAP,
+    LAYOUT_ROW_HEIGHT,
+    LAYOUT_SOCKET_HEIGHT,
+    LAYOUT_WIDTH_DENOISE,
+    LAYOUT_WIDTH_OUTPUT,
+    NODE_LOCATION_BREAK,
+    NODE_LOCATION_COMBINE,
+    NODE_LOCATION_CONVERT,
+    NODE_LOCATION_DENOISE,
+    NODE_LOCATION_INVERT,
+    NODE_LOCATION_NORMALIZE,
+    NODE_LOCATION_OUTPUT,
+    NODE_LOCATION_VECTOR_IN,
+    NODE_LOCATION_VECTOR_OUT,
+    NODE_SPACING_LEGACY,
+    NODE_SUFFIX_CONVERT,
+    NODE_SUFFIX_DENOISE_AUX,
+    NODE_SUFFIX_DENOISE_DECODE,
+    NODE_SUFFIX_DENOISE_ENCODE,
+    OUTPUT_SUFFIX_ALL,
+    OUTPUT_SUFFIX_CRYPTO,
+    OUTPUT_SUFFIX_DATA,
+    OUTPUT_SUFFIX_DATA_HALF,
+    OUTPUT_SUFFIX_DEEP,
+    OUTPUT_SUFFIX_RGBA,
+    RGBA_SPLIT_GROUPS,
+)
+from .node_index import split_node_name
+from .tree_plan import is_data_layer
+
+# A render layer node already this close to its computed origin has not moved
+LOCATION_TOLERANCE = 0.5
+
+
+def visible_socket_count(sockets) -> int:
+    """Count the sockets a node draws (enabled and not hidden)."""
+    return sum(1 for socket in sockets if socket.enabled and not socket.hide)
+
+
+def node_height(node, node_rows=LAYOUT_NODE_ROWS) -> float:
+    """Model height of ``node`` in node space units.
+
+    Args:
+        node: Compositor node
+        node_rows: Property rows drawn per node type (BlenderCompat.layout_node_rows)
+    """
+    if node.hide:
+        return LAYOUT_HIDDEN_HEIGHT
+    sockets = visible_socket_count(node.inputs) + visible_socket_count(node.outputs)
+    return (
+        LAYOUT_HEADER_HEIGHT
+        + sockets * LAYOUT_SOCKET_HEIGHT
+        + node_rows.get(node.type, 0) * LAYOUT_ROW_HEIGHT
+    )
+
+
+class LayoutEngine:
+    """负责用高度模型一次性计算连接节点的位置
+
+    ``layout()`` computes the placement of every connector node of the
+    requested layers from the NodeIndex; ``apply()`` writes the locations and
+    widths that differ.
+    """
+
+    def __init__(self, index, scale=1.0, spacing=NODE_SPACING_LEGACY,
+                 node_rows=LAYOUT_NODE_ROWS, horizontal_data=False):
+        """Args:
+            index: NodeIndex of the compositor tree
+            scale: Arrange_Scale_Param, multiplies heights and gaps
+            spacing: Vertical gap between view layers (BlenderCompat.node_spacing)
+            node_rows: Property rows drawn per node type
+            horizontal_data: Put DATA layers in their own column on the right
+        """
+        self.index = index
+        self.scale = scale
+        self.spacing = spacing
+        self.node_rows = node_rows
+        self.horizontal_data = horizontal_data
+        self.placements = {}
+        self._heights = {}
+
+    def height(self, node) -> float:
+        """Scaled model height of ``node``, computed once per node."""
+        height = self._heights.get(node.name)
+        if height is None:
+            height = node_height(node, self.node_rows) * self.scale
+            self._heights[node.name] = height
+        return height
+
+    def origins(self, view_layers) -> dict:
+        """Return {view layer: (x, y)} for the render layer nodes.
+
+        Layers are stacked top to bottom, layers starting with the DATA
+        prefix last. With ``horizontal_data`` DATA layers form a second
+        column at DATA_LAYER_HORIZONTAL_X.
+        """
+        ordered = [vl for vl in view_layers if not vl.startswith(DATA_LAYER_PREFIX)]
+        ordered += [vl for vl in view_layers if vl.startswith(DATA_LAYER_PREFIX)]
+        gap = self.spacing * self.scale
+        main_y = data_y = 0.0
+        origins = {}
+        for view_layer in ordered:
+            node = self.index.render_layer(view_layer)
+            if node is None:
+                continue
+            if self.horizontal_data and is_data_layer(view_layer):
+                origins[view_layer] = (DATA_LAYER_HORIZONTAL_X, data_y)
+                data_y -= self.height(node) + gap
+            else:
+                origins[view_layer] = (0.0, main_y)
+                main_y -= self.height(node) + gap
+        return origins
+
+    def layout(self, view_layers, changed=None) -> list:
+        """Compute placements for the connector nodes of ``view_layers``.
+
+        Args:
+            view_layers: Scene view layer names in scene order
+            changed: Layers whose connector nodes changed, None for all.
+                Layers whose render layer node is not at its origin are laid
+                out as well, so layers below a grown layer follow it.
+
+        Returns:
+            list: View layers that were laid out
+        """
+        arranged = []
+        for view_layer, (x, y) in self.origins(view_layers).items():
+            node = self.index.render_layer(view_layer)
+            if changed is not None and view_layer not in changed:
+                location = node.location
+                if (
+                    abs(location.x - x) <= LOCATION_TOLERANCE
+                    and abs(location.y - y) <= LOCATION_TOLERANCE
+                ):
+                    continue
+            self._place(node, x, y)
+            self._layout_denoise(view_layer, x, y)
+            self._layout_outputs(view_layer, x, y)
+            self._layout_math(view_layer, x, y - self.height(node))
+            arranged.append(view_layer)
+        return arranged
+
+    def apply(self) -> int:
+        """Write the computed placements, returns the number of moved nodes."""
+        moved = 0
+        for node, x, y, width in self.placements.values():
+            location = node.location
+            if (
+                abs(location.x - x) > LOCATION_TOLERANCE
+                or abs(location.y - y) > LOCATION_TOLERANCE
+            ):
+                node.location = x, y
+                moved += 1
+            if width is not None and node.width != width:
+                node.width = width
+        return moved
+
+    def _place(self, node, x, y, width=None):
+        self.placements[node.name] = (node, x, y, width)
+
+    def _layout_denoise(self, view_layer, x, y):
+        """Stack Denoise nodes next to the render layer node.
+
+        The Normal encode and decode groups of a shared aux node are stacked
+        right above and below it.
+        """
+        index = self.index
+        column = []
+        for node in index.of_type(view_layer, "DENOISE"):
+            role = split_node_name(node.name)[1]
+            if not role.endswith(NODE_SUFFIX_DENOISE_AUX):
+                column.append(node)
+                continue
+            prefix = role[:-len(NODE_SUFFIX_DENOISE_AUX)]
+            column.append(index.get(view_layer, f"{prefix}{NODE_SUFFIX_DENOISE_ENCODE}"))
+            column.append(node)
+            column.append(index.get(view_layer, f"{prefix}{NODE_SUFFIX_DENOISE_DECODE}"))
+        gap = 0.0
+        stacked = 0.0
+        for node in column:
+            if node is None:
+                continue
+            self._place(node, x + NODE_LOCATION_DENOISE[0], y - gap - stacked, LAYOUT_WIDTH_DENOISE)
+            stacked += self.height(node)
+            gap += LAYOUT_DENOISE_GAP * self.scale
+
+    def _layout_outputs(self, view_layer, x, y):
+        """Stack RGBA (and its split groups, or all-in-one), DATA, half DATA and
+        Cryptomatte outputs; Deep beside RGBA."""
+        output_x = x + NODE_LOCATION_OUTPUT[0]
+        gap = LAYOUT_ROW_GAP * self.scale
+        by_role = {}
+        for node in self.index.of_type(view_layer, "OUTPUT_FILE"):
+            by_role.setdefault(split_node_name(node.name)[1], node)
+
+        next_y = y
+        rgba = by_role.get(OUTPUT_SUFFIX_RGBA) or by_role.get(OUTPUT_SUFFIX_ALL)
+        for role in (
+            OUTPUT_SUFFIX_RGBA, *(group[1] for group in RGBA_SPLIT_GROUPS),
+            OUTPUT_SUFFIX_ALL, OUTPUT_SUFFIX_DATA, OUTPUT_SUFFIX_DATA_HALF,
+            OUTPUT_SUFFIX_CRYPTO,
+        ):
+            node = by_role.get(role)
+            if node is None:
+                continue
+            self._place(node, output_x, next_y, LAYOUT_WIDTH_OUTPUT)
+            next_y -= self.height(node) + gap
+
+        deep = by_role.get(OUTPUT_SUFFIX_DEEP)
+        if deep is not None:
+            deep_y = self.placements[rgba.name][2] if rgba is not None else y
+            self._place(deep, output_x + DEEP_OUTPUT_X_OFFSET, deep_y, LAYOUT_WIDTH_OUTPUT)
+
+    def _layout_math(self, view_layer, x, bottom):
+        """Stack helper nodes upwards from the bottom of the render layer node.
+
+        Depth_AA_Re first, then the conversion group nodes, Separate/Combine
+        Color, then Separate XYZ rows with their Invert and Combine nodes;
+        Normalize nodes share the next row.
+        """
+        index = self.index
+        gap = LAYOUT_ROW_GAP * self.scale
+        offset = 0.0
+
+        node = index.get(view_layer, "Depth_AA_Re")
+        if node is not None:
+            self._place(node, x + NODE_LOCATION_INVERT[0], bottom + self.height(node) + offset)
+            offset += self.height(node) + gap
+
+        for conv_node in reversed(index.of_type(view_layer, "GROUP")):
+            if not split_node_name(conv_node.name)[1].endswith(NODE_SUFFIX_CONVERT):
+                continue
+            self._place(conv_node, x + NODE_LOCATION_CONVERT[0], bottom + self.height(conv_node) + offset)
+            offset += self.height(conv_node) + gap
+
+        combine_nodes = index.of_type(view_layer, "COMBINE_COLOR")
+        for sep_node in reversed(index.of_type(view_layer, "SEPARATE_COLOR")):
+            row_y = bottom + self.height(sep_node) + offset
+            self._place(sep_node, x + NODE_LOCATION_VECTOR_IN[0], row_y)
+            for comb_node in combine_nodes:
+                self._place(comb_node, x + NODE_LOCATION_VECTOR_OUT[0], row_y)
+            offset += self.height(sep_node) + gap
+
+        for sep_node in reversed(index.of_types(view_layer, ("SEPARATE_XYZ", "SEPXYZ"))):
+            row_y = bottom + self.height(sep_node) + offset
+            self._place(sep_node, x + NODE_LOCATION_BREAK[0], row_y)
+            role = split_node_name(sep_node.name)[1]
+            if role.endswith("_Break"):
+                socket = role[: -len("_Break")]
+                inv_node = index.get(view_layer, f"{socket}_Inv")
+                if inv_node is not None and inv_node.type == "MATH":
+                    self._place(inv_node, x + NODE_LOCATION_INVERT[0], row_y)
+                comb_node = index.get(view_layer, f"{socket}_Combine")
+                if comb_node is not None and comb_node.type in ("COMBINE_XYZ", "COMBXYZ"):
+                    self._place(comb_node, x + NODE_LOCATION_COMBINE[0], row_y)
+            offset += self.height(sep_node) + gap
+
+        for node in reversed(index.of_type(view_layer, "NORMALIZE")):
+            self._place(node, x + NODE_LOCATION_NORMALIZE[0], bottom + self.height(node) + offset)
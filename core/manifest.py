@@ -0,0 +1,206 @@
+# SPDX-License-Identifier: GPL-3.0-or-later
+# Copyright (C) Roland Vyens
+"""Render job manifest for Industrial AOV Connector.
+
+``build_manifest`` describes the File Output nodes of a cooked scene as plain
+data: the view layer feeding each node, its format, path pattern, frame
+range and the EXR layers and channels of every slot. Farm submitters and QC
+tools read the JSON written by ``write_manifest`` instead of opening the
+.blend file.
+"""
+
+import json
+import os
+import tempfile
+import time
+
+import bpy
+
+from ..handy_functions import CompositorHelper
+from .node_index import split_node_name
+from .output_scan import frame_file, frame_pattern
+
+MANIFEST_VERSION = 1
+
+# Channels Blender writes for a File Output input, by the linked socket type
+SOCKET_CHANNELS = {
+    "VALUE": ("V",),
+    "INT": ("V",),
+    "BOOLEAN": ("V",),
+    "VECTOR": ("X", "Y", "Z"),
+    "RGBA": ("R", "G", "B", "A"),
+}
+
+# File extension per file format, formats not listed use ".exr"
+FORMAT_EXTENSIONS = {
+    "PNG": ".png",
+    "JPEG": ".jpg",
+    "TIFF": ".tif",
+    "TARGA": ".tga",
+}
+
+
+def slot_name(slot) -> str:
+    """Name of a file slot (``path`` on 4.x file_slots, ``name`` otherwise)."""
+    name = getattr(slot, "name", None)
+    return name if name is not None else slot.path
+
+
+def input_links(tree) -> dict:
+    """Map the input socket pointers of ``tree`` to the link feeding them.
+
+    Built in one pass over ``tree.links``; in Blender every ``socket.links``
+    access scans all links of the tree.
+    """
+    return {link.to_socket.as_pointer(): link for link in tree.links}
+
+
+def trace_source(socket, links_by_input):
+    """Follow the links upstream of ``socket`` to a Render Layers output.
+
+    Args:
+        socket: Input socket to start from
+        links_by_input: ``input_links()`` of the socket's tree
+
+    Returns:
+        tuple: (view_layer, pass name), or (None, None) if no Render Layers
+        node feeds the socket
+    """
+    seen = set()
+    while socket is not None and socket.is_linked:
+        link = links_by_input.get(socket.as_pointer())
+        if link is None:
+            break
+        node = link.from_node
+        if node.type == "R_LAYERS":
+            return node.layer, link.from_socket.name
+        if node.name in seen:
+            break
+        seen.add(node.name)
+        socket = next((s for s in node.inputs if s.is_linked), None)
+    return None, None
+
+
+def _format(node) -> dict:
+    fmt = node.format
+    return {
+        attr: getattr(fmt, attr)
+        for attr in ("media_type", "file_format", "color_depth", "exr_codec", "color_mode")
+        if hasattr(fmt, attr)
+    }
+
+
+def describe_output(node, frames, links_by_input) -> dict:
+    """Describe one File Output node.
+
+    Args:
+        node: File Output node
+        frames: (start, end, step) of the scene
+        links_by_input: ``input_links()`` of the node's tree
+    """
+    view_layer, role = split_node_name(node.name)
+    fmt = _format(node)
+    extension = FORMAT_EXTENSIONS.get(fmt.get("file_format"), ".exr")
+    path = CompositorHelper.get_output_path(node)
+    pattern = frame_pattern(bpy.path.abspath(path))
+    multilayer = fmt.get("file_format") == "OPEN_EXR_MULTILAYER"
+
+    layers = []
+    slot_patterns = []
+    for slot, socket in zip(CompositorHelper.get_slots(node), node.inputs):
+        name = slot_name(slot)
+        if not multilayer and socket.is_linked:
+            # Single layer outputs write one file per slot
+            slot_path = CompositorHelper.get_slot_file_path(node, name)
+            slot_patterns.append({
+                "slot": name,
+                "path_pattern": frame_pattern(bpy.path.abspath(slot_path)),
+            })
+        source_layer, source_pass = trace_source(socket, links_by_input)
+        link = links_by_input.get(socket.as_pointer()) if socket.is_linked else None
+        from_type = link.from_socket.type if link is not None else None
+        layers.append({
+            "name": name,
+            "linked": socket.is_linked,
+            "source_layer": source_layer,
+            "source_pass": source_pass,
+            "channels": [
+                f"{name}.{channel}"
+                for channel in SOCKET_CHANNELS.get(from_type, ())
+            ],
+        })
+
+    start, end, _step = frames
+    first_pattern = slot_patterns[0]["path_pattern"] if slot_patterns else pattern
+    return {
+        "node": node.name,
+        "view_layer": view_layer,
+        "role": role,
+        "mute": node.mute,
+        "format": fmt,
+        "path": path,
+        "path_pattern": pattern,
+        "extension": extension,
+        "multilayer": multilayer,
+        "slot_patterns": slot_patterns,
+        "first_file": frame_file(first_pattern, start, extension),
+        "last_file": frame_file(first_pattern, end, extension),
+        "layers": layers,
+    }
+
+
+def build_manifest(scene) -> dict:
+    """Describe every File Output node of ``scene``'s compositor tree."""
+    render = scene.render
+    frames = (scene.frame_start, scene.frame_end, scene.frame_step)
+    tree = CompositorHelper.get_node_tree(scene)
+    outputs = []
+    if tree is not None:
+        links_by_input = input_links(tree)
+        outputs = [
+            describe_output(node, frames, links_by_input)
+            for node in tree.nodes
+            if node.type == "OUTPUT_FILE"
+        ]
+    return {
+        "manifest_version": MANIFEST_VERSION,
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "blender": bpy.app.version_string,
+        "blend": bpy.data.filepath,
+        "scene": scene.name,
+        "frames": {"start": frames[0], "end": frames[1], "step": frames[2]},
+        "resolution": [
+            render.resolution_x,
+            render.resolution_y,
+            render.resolution_percentage,
+        ],
+        "render_path": bpy.path.abspath(render.filepath),
+        "view_layers": [
+            {"name": vl.name, "use": vl.use} for vl in scene.view_layers
+        ],
+        "outputs": outputs,
+    }
+
+
+def default_manifest_path(scene) -> str:
+    """``<blend name>_<scene>_manifest.json`` next to the blend file.
+
+    Unsaved files use the temp folder.
+    """
+    blend = bpy.data.filepath
+    stem = os.path.splitext(os.path.basename(blend))[0] if blend else "untitled"
+    name = bpy.path.clean_name(f"{stem}_{scene.name}_manifest") + ".json"
+    folder = os.path.dirname(blend) if blend else tempfile.gettempdir()
+    return os.path.join(folder, name)
+
+
+def write_manifest(scene, path) -> dict:
+    """Write the manifest of ``scene`` to ``path`` and return it.
+
+    Raises:
+        OSError: If the file cannot be written
+    """
+    manifest = build_manifest(scene)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=1)
+    return manifest
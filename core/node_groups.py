@@ -0,0 +1,163 @@
+# SPDX-License-Identifier: GPL-3.0-or-later
+# Copyright (C) Roland Vyens
+"""Shared vector conversion node groups for Industrial AOV Connector.
+
+Each Blender to Nuke conversion is one compositor node group in
+``bpy.data.node_groups``, built on first use and shared by every view layer
+and scene of the file; the planner gives each vector pass one group node
+instead of its own Separate/Math/Combine nodes.
+
+- ``VECTOR_GROUP_TO_NUKE``: Normal and Position, X -> X, Z -> Y, Y -> -Z
+- ``VECTOR_GROUP_XYZ``: other vector passes, X, Y and Z unchanged
+- ``VECTOR_GROUP_MOTION``: motion Vector, channels remapped for Nuke
+- ``DENOISE_AUX_REMAP`` groups: the Normal fed to the shared aux denoise
+  node, mapped into [0, 1] (x * 0.5 + 0.5) and back (x * 2 - 1)
+
+Each group carries the version of its builder in the ``iac_group_version``
+custom property. An existing group is reused only when that version and its
+one input / one output interface match; a user edited, outdated or foreign
+group of the same name is renamed out of the way and rebuilt.
+"""
+
+import bpy
+
+from ..constants import (
+    DENOISE_AUX_REMAP,
+    VECTOR_GROUP_MOTION,
+    VECTOR_GROUP_TO_NUKE,
+    VECTOR_GROUP_XYZ,
+)
+from ..handy_functions import BlenderCompat
+
+
+# Custom property holding the builder version a group was built with
+GROUP_VERSION_PROPERTY = "iac_group_version"
+# Suffix given to a mismatching group before it is rebuilt
+OUTDATED_GROUP_SUFFIX = "_outdated"
+
+
+def _new_group(name, socket_name, socket_type):
+    """Create a group with one input and one output socket.
+
+    Returns:
+        tuple: (group, group input node, group output node)
+    """
+    group = bpy.data.node_groups.new(name, "CompositorNodeTree")
+    group.interface.new_socket(socket_name, in_out="INPUT", socket_type=socket_type)
+    group.interface.new_socket(socket_name, in_out="OUTPUT", socket_type=socket_type)
+    group_in = group.nodes.new("NodeGroupInput")
+    group_in.location = (-400, 0)
+    group_out = group.nodes.new("NodeGroupOutput")
+    group_out.location = (400, 0)
+    return group, group_in, group_out
+
+
+def _build_xyz(group, group_in, group_out, to_nuke):
+    nodes, links = group.nodes, group.links
+    brk = nodes.new(BlenderCompat.separate_xyz_node_id)
+    brk.location = (-200, 0)
+    comb = nodes.new(BlenderCompat.combine_xyz_node_id)
+    comb.location = (200, 0)
+    links.new(group_in.outputs["Vector"], brk.inputs["Vector"])
+    links.new(comb.outputs["Vector"], group_out.inputs["Vector"])
+    links.new(brk.outputs["X"], comb.inputs["X"])
+    if to_nuke:
+        inv = nodes.new(BlenderCompat.math_node_id)
+        inv.operation = "MULTIPLY"
+        inv.inputs[1].default_value = -1
+        links.new(brk.outputs["Z"], comb.inputs["Y"])
+        links.new(brk.outputs["Y"], inv.inputs[0])
+        links.new(inv.outputs[0], comb.inputs["Z"])
+    else:
+        links.new(brk.outputs["Y"], comb.inputs["Y"])
+        links.new(brk.outputs["Z"], comb.inputs["Z"])
+
+
+def _build_motion(group, group_in, group_out):
+    nodes, links = group.nodes, group.links
+    sep = nodes.new("CompositorNodeSeparateColor")
+    sep.location = (-200, 0)
+    comb = nodes.new("CompositorNodeCombineColor")
+    comb.location = (200, 0)
+    links.new(group_in.outputs["Image"], sep.inputs["Image"])
+    links.new(comb.outputs["Image"], group_out.inputs["Image"])
+    links.new(sep.outputs["Green"], comb.inputs["Blue"])
+    links.new(sep.outputs["Blue"], comb.inputs["Red"])
+    links.new(sep.outputs["Blue"], comb.inputs["Alpha"])
+    links.new(sep.outputs["Alpha"], comb.inputs["Green"])
+
+
+def _build_remap(group, group_in, group_out, scale, offset):
+    """Compute ``x * scale + offset`` on each vector component."""
+    nodes, links = group.nodes, group.links
+    brk = nodes.new(BlenderCompat.separate_xyz_node_id)
+    brk.location = (-200, 0)
+    comb = nodes.new(BlenderCompat.combine_xyz_node_id)
+    comb.location = (200, 0)
+    links.new(group_in.outputs["Vector"], brk.inputs["Vector"])
+    links.new(comb.outputs["Vector"], group_out.inputs["Vector"])
+    for i, axis in enumerate("XYZ"):
+        mad = nodes.new(BlenderCompat.math_node_id)
+        mad.operation = "MULTIPLY_ADD"
+        mad.location = (0, 150 - 150 * i)
+        mad.inputs[1].default_value = scale
+        mad.inputs[2].default_value = offset
+        links.new(brk.outputs[axis], mad.inputs[0])
+        links.new(mad.outputs[0], comb.inputs[axis])
+
+
+# Group name -> (version, socket name, socket type, builder). Bump the version
+# whenever a builder changes so groups saved by an older revision are rebuilt.
+_BUILDERS = {
+    VECTOR_GROUP_TO_NUKE: (
+        1, "Vector", "NodeSocketVector", lambda *nodes: _build_xyz(*nodes, True),
+    ),
+    VECTOR_GROUP_XYZ: (
+        1, "Vector", "NodeSocketVector", lambda *nodes: _build_xyz(*nodes, False),
+    ),
+    VECTOR_GROUP_MOTION: (1, "Image", "NodeSocketColor", _build_motion),
+}
+for _encode, _decode in DENOISE_AUX_REMAP.values():
+    _BUILDERS[_encode] = (
+        1, "Vector", "NodeSocketVector", lambda *nodes: _build_remap(*nodes, 0.5, 0.5),
+    )
+    _BUILDERS[_decode] = (
+        1, "Vector", "NodeSocketVector", lambda *nodes: _build_remap(*nodes, 2.0, -1.0),
+    )
+
+
+def _is_current(group, version, socket_name, socket_type) -> bool:
+    """True when ``group`` was built by this builder version with the expected interface."""
+    if group.get(GROUP_VERSION_PROPERTY) != version:
+        return False
+    sockets = sorted(
+        (item.in_out, item.name, item.socket_type)
+        for item in group.interface.items_tree
+        if item.item_type == "SOCKET"
+    )
+    return sockets == [
+        ("INPUT", socket_name, socket_type),
+        ("OUTPUT", socket_name, socket_type),
+    ]
+
+
+def ensure_node_group(name):
+    """Return the conversion group called ``name``, building it if missing.
+
+    A group of that name that does not match its builder version or
+    interface is renamed with ``OUTDATED_GROUP_SUFFIX`` and rebuilt under the
+    canonical name.
+
+    Raises:
+        KeyError: If ``name`` is not a conversion group of the addon
+    """
+    version, socket_name, socket_type, build = _BUILDERS[name]
+    group = bpy.data.node_groups.get(name)
+    if group is not None:
+        if _is_current(group, version, socket_name, socket_type):
+            return group
+        group.name = f"{name}{OUTDATED_GROUP_SUFFIX}"
+    group, group_in, group_out = _new_group(name, socket_name, socket_type)
+    build(group, group_in, group_out)
+    group[GROUP_VERSION_PROPERTY] = version
+    return group
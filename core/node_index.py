@@ -0,0 +1,111 @@
+# SPDX-License-Identifier: GPL-3.0-or-later
+# Copyright (C) Roland Vyens
+"""Node index for Industrial AOV Connector.
+
+Connector nodes are named ``{ViewLayer}--{Role}``. Looking them up by
+slicing every node name inside nested loops costs O(layers x nodes^2) on
+large trees, so operations build one ``NodeIndex`` up front and query it
+by (view layer, role) instead.
+"""
+
+from ..constants import NODE_NAME_SEPARATOR
+
+
+def split_node_name(name: str):
+    """Split a connector node name into (view_layer, role).
+
+    Returns:
+        tuple: (view_layer, role), or (None, None) if the name has no separator
+    """
+    pos = name.rfind(NODE_NAME_SEPARATOR)
+    if pos == -1:
+        return None, None
+    return name[:pos], name[pos + len(NODE_NAME_SEPARATOR):]
+
+
+class NodeIndex:
+    """负责一次性索引节点树，按 (视图层, 角色) 查询节点
+
+    Nodes are kept in insertion ordered dicts keyed by name, so ``discard``
+    is O(1) and removing many nodes stays linear.
+    """
+
+    def __init__(self, node_tree):
+        self.node_tree = node_tree
+        self.by_name = {}
+        self.render_layers = {}
+        self._by_layer = {}
+        self._by_type = {}
+        for node in node_tree.nodes:
+            self.add(node)
+
+    @property
+    def nodes(self):
+        """All indexed nodes in tree order, a live view of ``by_name``."""
+        return self.by_name.values()
+
+    def add(self, node) -> None:
+        """Register a node created after the index was built."""
+        self.by_name[node.name] = node
+        if node.type == "R_LAYERS":
+            self.render_layers.setdefault(node.layer, node)
+            return
+        view_layer, role = split_node_name(node.name)
+        if view_layer is None:
+            return
+        self._by_layer.setdefault(view_layer, {})[role] = node
+        self._by_type.setdefault((view_layer, node.type), {})[node.name] = node
+
+    def discard(self, node) -> None:
+        """Forget a node that is about to be removed from the tree."""
+        name = node.name
+        if self.by_name.get(name) is not node:
+            return
+        del self.by_name[name]
+        if node.type == "R_LAYERS":
+            if self.render_layers.get(node.layer) is node:
+                del self.render_layers[node.layer]
+            return
+        view_layer, role = split_node_name(name)
+        if view_layer is None:
+            return
+        self._by_layer.get(view_layer, {}).pop(role, None)
+        typed = self._by_type.get((view_layer, node.type))
+        if typed is not None:
+            typed.pop(name, None)
+
+    def render_layer(self, view_layer):
+        """Return the Render Layers node of a view layer, or None."""
+        return self.render_layers.get(view_layer)
+
+    def get(self, view_layer, role):
+        """Return the node named ``{view_layer}--{role}``, or None."""
+        return self._by_layer.get(view_layer, {}).get(role)
+
+    def layer_nodes(self, view_layer) -> dict:
+        """Return {role: node} for every connector node of a view layer."""
+        return self._by_layer.get(view_layer, {})
+
+    def of_type(self, view_layer, node_type) -> list:
+        """Return connector nodes of one type for a view layer, in tree order."""
+        return list(self._by_type.get((view_layer, node_type), {}).values())
+
+    def of_types(self, view_layer, node_types) -> list:
+        """Return connector nodes matching any of several type aliases.
+
+        Used for node types whose identifier differs between Blender versions
+        (e.g. "SEPXYZ" / "SEPARATE_XYZ"), so only one alias is ever populated.
+        """
+        nodes = []
+        for node_type in node_types:
+            nodes.extend(self.of_type(view_layer, node_type))
+        return nodes
+
+    def denoise_passes(self, view_layer) -> list:
+        """Return pass names that have a ``{pass}_Dn`` denoise node."""
+        passes = []
+        for node in self.of_type(view_layer, "DENOISE"):
+            role = split_node_name(node.name)[1]
+            if role.endswith("_Dn"):
+                passes.append(role[: -len("_Dn")])
+        return passes
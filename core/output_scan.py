@@ -0,0 +1,354 @@
+# SPDX-License-Identifier: GPL-3.0-or-later
+# Copyright (C) Roland Vyens
+"""Output completeness scan for Industrial AOV Connector.
+
+Checks the frames rendered for each output node against the frame range:
+missing files, zero-byte files, files much smaller than the other frames of
+the same output or with an unfinished chunk offset table (truncated) and
+files that are not EXR files. The channel audit compares the channels in
+the written EXR headers with the slots of the output node. Each output
+directory is listed once with ``os.scandir``; directory listings, ``stat``
+calls and header reads run in a thread pool, which hides the latency of
+network storage.
+
+This module does not import bpy, so ``tools/iac_output_scan.py`` can load it
+from a render manifest without Blender.
+"""
+
+import os
+import re
+import statistics
+from concurrent.futures import ThreadPoolExecutor
+
+from .exr_header import ExrHeaderError, read_header
+
+# A frame smaller than this fraction of the median frame size is truncated
+TRUNCATED_RATIO = 0.5
+# Paths stat'ed per thread pool task
+STAT_CHUNK = 256
+DEFAULT_JOBS = 16
+
+_FRAME_HASHES = re.compile(r"#+")
+
+
+def frame_file(pattern: str, frame: int, extension: str = ".exr") -> str:
+    """Resolve ``pattern`` for ``frame`` the way Blender names output files.
+
+    The last run of ``#`` is replaced by the zero padded frame number; a
+    pattern without ``#`` gets a four digit frame number appended. The
+    extension is appended when missing.
+    """
+    matches = list(_FRAME_HASHES.finditer(pattern))
+    if matches:
+        last = matches[-1]
+        path = (
+            pattern[:last.start()]
+            + str(frame).zfill(last.end() - last.start())
+            + pattern[last.end():]
+        )
+    else:
+        path = pattern + str(frame).zfill(4)
+    if not path.lower().endswith(extension):
+        path += extension
+    return path
+
+
+def frame_pattern(pattern: str) -> str:
+    """Return ``pattern`` with the frame number spelled as ``#`` characters."""
+    if _FRAME_HASHES.search(pattern):
+        return pattern
+    return pattern + "####"
+
+
+def compact_ranges(frames, step=1) -> str:
+    """Format frames as ranges, e.g. ``"1-4,7,10-20x2"``.
+
+    Args:
+        frames: Frame numbers
+        step: Scene frame step, runs of this step form one range
+    """
+    frames = sorted(set(frames))
+    parts = []
+    i = 0
+    while i < len(frames):
+        j = i
+        while j + 1 < len(frames) and frames[j + 1] - frames[j] == step:
+            j += 1
+        if j == i:
+            parts.append(str(frames[i]))
+        elif step == 1:
+            parts.append(f"{frames[i]}-{frames[j]}")
+        else:
+            parts.append(f"{frames[i]}-{frames[j]}x{step}")
+        i = j + 1
+    return ",".join(parts)
+
+
+def list_directory(path) -> set:
+    """Return the file names in ``path``, an empty set if it does not exist."""
+    try:
+        with os.scandir(path) as entries:
+            return {entry.name for entry in entries if not entry.is_dir()}
+    except (FileNotFoundError, NotADirectoryError):
+        return set()
+
+
+def output_files(output) -> list:
+    """(slot, path pattern) of every file an output writes per frame.
+
+    Multilayer outputs write one file, with slot None; single layer outputs
+    (e.g. Deep) list one pattern per slot in ``slot_patterns``.
+    """
+    slot_patterns = output.get("slot_patterns")
+    if slot_patterns:
+        return [(entry["slot"], entry["path_pattern"]) for entry in slot_patterns]
+    return [(None, output["path_pattern"])]
+
+
+def _stat_sizes(paths) -> list:
+    sizes = []
+    for path in paths:
+        try:
+            sizes.append(os.stat(path).st_size)
+        except OSError:
+            sizes.append(None)
+    return sizes
+
+
+def header_status(path) -> tuple:
+    """Read the EXR header of ``path``.
+
+    Returns:
+        tuple: (status, header) with status "ok", "incomplete" (chunk offset
+        table not filled in) or "corrupt" (no readable EXR header); header
+        is None unless it could be parsed
+    """
+    try:
+        header = read_header(path)
+    except (ExrHeaderError, OSError):
+        return "corrupt", None
+    return ("incomplete" if header.complete is False else "ok"), header
+
+
+def expected_channels(output) -> tuple:
+    """Channels an output should write, from its manifest description.
+
+    Returns:
+        tuple: (channels, ignored layer prefixes, pixel type or None). Unlinked
+        slots are ignored, their channels are neither expected nor unexpected.
+    """
+    channels = set()
+    ignored = []
+    for layer in output.get("layers", ()):
+        if layer["linked"]:
+            channels.update(layer["channels"])
+        else:
+            ignored.append(layer["name"] + ".")
+    depth = output.get("format", {}).get("color_depth")
+    pixel_type = {"16": "HALF", "32": "FLOAT"}.get(depth)
+    return channels, tuple(ignored), pixel_type
+
+
+class OutputScanner:
+    """负责并行检查输出文件的完整性"""
+
+    def __init__(self, jobs=DEFAULT_JOBS, verify_headers=False,
+                 truncated_ratio=TRUNCATED_RATIO):
+        """Args:
+            jobs: Threads for directory listings, stat calls and header reads
+            verify_headers: Read the header of every present frame; without
+                it only the truncated candidates are read
+            truncated_ratio: Size fraction of the median below which a
+                frame counts as truncated
+        """
+        self.jobs = max(1, jobs)
+        self.verify_headers = verify_headers
+        self.truncated_ratio = truncated_ratio
+
+    def scan(self, outputs, frames, step=1) -> list:
+        """Scan outputs for missing and broken frames.
+
+        Args:
+            outputs: Dicts with ``node``, ``path_pattern`` and optionally
+                ``extension`` (default ``.exr``) and ``slot_patterns``, e.g.
+                manifest outputs
+            frames: Frame numbers the outputs should hold
+            step: Scene frame step, used for the resubmit ranges
+
+        Returns:
+            list: One report dict per output file pattern (per slot for
+            single layer outputs), see ``_report``
+        """
+        frames = list(frames)
+        expected = []
+        for output in outputs:
+            extension = output.get("extension", ".exr")
+            for slot, pattern in output_files(output):
+                files = {frame: frame_file(pattern, frame, extension) for frame in frames}
+                expected.append((output, slot, pattern, files))
+
+        directories = {
+            os.path.dirname(path)
+            for _output, _slot, _pattern, files in expected
+            for path in files.values()
+        }
+        with ThreadPoolExecutor(max_workers=self.jobs) as pool:
+            listings = dict(zip(directories, pool.map(list_directory, directories)))
+
+            present = []
+            for _output, _slot, _pattern, files in expected:
+                for path in files.values():
+                    if os.path.basename(path) in listings[os.path.dirname(path)]:
+                        present.append(path)
+            chunks = [present[i:i + STAT_CHUNK] for i in range(0, len(present), STAT_CHUNK)]
+            sizes = {}
+            for chunk, chunk_sizes in zip(chunks, pool.map(_stat_sizes, chunks)):
+                sizes.update(zip(chunk, chunk_sizes))
+
+            reports = [
+                self._report(output, slot, pattern, files, sizes)
+                for output, slot, pattern, files in expected
+            ]
+
+            to_read = sorted({
+                path
+                for report in reports
+                for path in report.pop("_read")
+                if path.lower().endswith(".exr")
+            })
+            status = {
+                path: result[0]
+                for path, result in zip(to_read, pool.map(header_status, to_read))
+            }
+
+        for report in reports:
+            files = report.pop("_files")
+            corrupt = [f for f, path in files.items() if status.get(path) == "corrupt"]
+            incomplete = [f for f, path in files.items() if status.get(path) == "incomplete"]
+            report["corrupt"] = corrupt
+            report["truncated"] = sorted(
+                set(report["truncated"]).union(incomplete).difference(corrupt)
+            )
+            bad = report["missing"] + report["empty"] + report["truncated"] + corrupt
+            report["ok"] = not bad
+            report["resubmit"] = compact_ranges(bad, step)
+        return reports
+
+    def _report(self, output, slot, pattern, files, sizes) -> dict:
+        """Classify the frames of one output file pattern by file size."""
+        missing, empty, small = [], [], []
+        present = {}
+        for frame, path in files.items():
+            size = sizes.get(path)
+            if size is None:
+                missing.append(frame)
+            elif size == 0:
+                empty.append(frame)
+            else:
+                present[frame] = size
+        median = statistics.median(present.values()) if present else 0
+        for frame, size in present.items():
+            if size < median * self.truncated_ratio:
+                small.append(frame)
+        if self.verify_headers:
+            read = [files[f] for f in present]
+        else:
+            read = [files[f] for f in small]
+        return {
+            "node": output["node"],
+            "slot": slot,
+            "path_pattern": pattern,
+            "expected": len(files),
+            "present": len(present) + len(empty),
+            "median_bytes": median,
+            "missing": missing,
+            "empty": empty,
+            "truncated": small,
+            "_read": read,
+            "_files": {f: files[f] for f in present},
+        }
+
+    def audit(self, outputs, frames, step=1, limit=None) -> list:
+        """Compare the channels of written EXR files with the output slots.
+
+        Only frames that exist are read, so the audit can run while a render
+        is still landing. Outputs that are not multilayer EXR are skipped.
+
+        Args:
+            outputs: Manifest outputs (``node``, ``path_pattern``, ``format``,
+                ``layers``)
+            frames: Frame numbers to check
+            step: Scene frame step, used for the frame ranges
+            limit: Check at most this many existing frames per output
+
+        Returns:
+            list: One report dict per audited output
+        """
+        frames = list(frames)
+        audited = [
+            output for output in outputs
+            if output.get("format", {}).get("file_format", "OPEN_EXR_MULTILAYER")
+            == "OPEN_EXR_MULTILAYER"
+        ]
+        files = {
+            output["node"]: {
+                frame: frame_file(output["path_pattern"], frame, output.get("extension", ".exr"))
+                for frame in frames
+            }
+            for output in audited
+        }
+        directories = {
+            os.path.dirname(path) for by_frame in files.values() for path in by_frame.values()
+        }
+        with ThreadPoolExecutor(max_workers=self.jobs) as pool:
+            listings = dict(zip(directories, pool.map(list_directory, directories)))
+            to_read = {}
+            for node, by_frame in files.items():
+                present = [
+                    (frame, path) for frame, path in by_frame.items()
+                    if os.path.basename(path) in listings[os.path.dirname(path)]
+                ]
+                to_read[node] = present[:limit] if limit else present
+            paths = sorted({path for present in to_read.values() for _f, path in present})
+            headers = dict(zip(paths, pool.map(header_status, paths)))
+
+        reports = []
+        for output in audited:
+            expected, ignored, pixel_type = expected_channels(output)
+            missing, unexpected, wrong_type = set(), set(), set()
+            layout_frames, incomplete, corrupt = [], [], []
+            for frame, path in to_read[output["node"]]:
+                status, header = headers[path]
+                if header is None:
+                    corrupt.append(frame)
+                    continue
+                if status == "incomplete":
+                    incomplete.append(frame)
+                actual = {
+                    name: kind for name, kind in header.channels.items()
+                    if not name.startswith(ignored)
+                }
+                frame_missing = expected.difference(actual)
+                frame_unexpected = set(actual).difference(expected)
+                frame_wrong = {
+                    name for name in expected.intersection(actual)
+                    if pixel_type and actual[name] != pixel_type
+                }
+                if frame_missing or frame_unexpected or frame_wrong:
+                    layout_frames.append(frame)
+                missing |= frame_missing
+                unexpected |= frame_unexpected
+                wrong_type |= frame_wrong
+            reports.append({
+                "node": output["node"],
+                "checked": len(to_read[output["node"]]),
+                "ok": not (layout_frames or incomplete or corrupt),
+                "missing_channels": sorted(missing),
+                "unexpected_channels": sorted(unexpected),
+                "wrong_type_channels": sorted(wrong_type),
+                "expected_type": pixel_type,
+                "layout_frames": compact_ranges(layout_frames, step),
+                "incomplete_frames": compact_ranges(incomplete, step),
+                "corrupt_frames": compact_ranges(corrupt, step),
+            })
+        return reports
@@ -0,0 +1,329 @@
+# SPDX-License-Identifier: GPL-3.0-or-later
+# Copyright (C) Roland Vyens
+"""Apply a TreePlan to a compositor node tree.
+
+This is the only place where planned node and link specs become real nodes.
+Application is incremental: connector nodes that already match the plan are
+reused, properties are written only when they differ, and links or nodes
+that are no longer planned are removed.
+"""
+
+from ..handy_functions import CompositorHelper
+from .node_groups import ensure_node_group
+from .node_index import NodeIndex, split_node_name
+from .tree_plan import nuke_slot_name
+
+
+class NodeReconciler:
+    """负责把期望的节点状态增量同步到节点树
+
+    Reuses nodes that already carry the expected name and type, only writes
+    properties whose value changed, syncs file output slots by name and
+    removes connector nodes that were not requested this run. View layers
+    that gained or lost nodes or slots are collected in ``dirty``.
+    """
+
+    def __init__(self, tree, index):
+        self.tree = tree
+        self.index = index
+        self.kept = set()
+        self.created = 0
+        self.reused = 0
+        self.removed = 0
+        self.slots_added = 0
+        self.slots_removed = 0
+        self.dirty = set()
+
+    def node(self, bl_idname, name, label, location, hide=False):
+        """Return the node called ``name``, creating it only if needed.
+
+        Returns:
+            tuple: (node, created)
+        """
+        node = self.index.by_name.get(name)
+        if node is not None and node.bl_idname != bl_idname:
+            self.remove(node)
+            node = None
+        created = node is None
+        if created:
+            node = self.tree.nodes.new(bl_idname)
+            node.name = name
+            node.location = location
+            node.hide = hide
+            self.index.add(node)
+            self.created += 1
+            self.dirty.add(split_node_name(name)[0])
+        else:
+            self.reused += 1
+        self.set(node, "label", label)
+        self.kept.add(name)
+        return node, created
+
+    @staticmethod
+    def set(owner, attr, value):
+        """Assign an RNA property only when its value differs."""
+        if getattr(owner, attr) != value:
+            setattr(owner, attr, value)
+
+    @staticmethod
+    def path(node, path):
+        """Assign a file output path only when it differs."""
+        if CompositorHelper.get_output_path(node) != path:
+            CompositorHelper.set_output_path(node, path)
+
+    def slots(self, node, names):
+        """Sync the slots of a file output node to ``names``.
+
+        Slots already renamed by ``rename_outputs`` are matched through
+        ``nuke_slot_name`` and renamed back so links can target raw pass names.
+        """
+        wanted = {}
+        for name in names:
+            wanted.setdefault(name, name)
+            wanted.setdefault(nuke_slot_name(name), name)
+            wanted.setdefault(nuke_slot_name(name, True), name)
+        present = set()
+        slots = CompositorHelper.get_slots(node)
+        for i in reversed(range(len(slots))):
+            slot = slots[i]
+            raw = wanted.get(slot.name)
+            if raw is None or raw in present:
+                CompositorHelper.remove_slot(node, i)
+                self.slots_removed += 1
+                self.dirty.add(split_node_name(node.name)[0])
+                continue
+            present.add(raw)
+            if slot.name != raw:
+                slot.name = raw
+        for name in names:
+            if name not in present:
+                CompositorHelper.add_slot(node, name)
+                present.add(name)
+                self.slots_added += 1
+                self.dirty.add(split_node_name(node.name)[0])
+
+    def remove(self, node):
+        """Remove a node from the tree and the index."""
+        self.dirty.add(split_node_name(node.name)[0])
+        self.index.discard(node)
+        self.tree.nodes.remove(node)
+        self.removed += 1
+
+    def remove_foreign(self, view_layers):
+        """Remove every node that is neither a render layer nor a connector node."""
+        view_layers = set(view_layers)
+        for node in list(self.index.nodes):
+            if node.type == "R_LAYERS" or node.name == "DataFramE":
+                continue
+            if split_node_name(node.name)[0] not in view_layers:
+                self.remove(node)
+
+    def prune(self, view_layers):
+        """Remove connector nodes of ``view_layers`` that were not kept."""
+        for view_layer in view_layers:
+            for node in list(self.index.layer_nodes(view_layer).values()):
+                if node.name not in self.kept:
+                    self.remove(node)
+
+    def kept_nodes(self):
+        """Return the nodes that were requested this run."""
+        by_name = self.index.by_name
+        return [by_name[name] for name in self.kept if name in by_name]
+
+
+class IncrementalLinks:
+    """Stand-in for ``node_tree.links`` that only touches changed links.
+
+    ``new()`` skips links that already exist and remembers every input it was
+    asked to feed, so ``prune()`` can drop the links that are no longer wanted.
+    Existing links are looked up in ``by_input``, built from ``node_tree.links``
+    in one pass: in Blender every ``socket.links`` access scans all links of
+    the tree.
+    """
+
+    def __init__(self, node_tree):
+        self.links = node_tree.links
+        self.wanted = set()
+        self.by_input = None
+        self.created = 0
+        self.removed = 0
+
+    def index_links(self):
+        """Map every input socket pointer to the links feeding it."""
+        by_input = {}
+        for link in self.links:
+            by_input.setdefault(link.to_socket.as_pointer(), []).append(link)
+        self.by_input = by_input
+
+    def _existing(self, to_pointer, from_socket):
+        for link in self.by_input.get(to_pointer, ()):
+            if link.from_socket == from_socket:
+                return link
+        return None
+
+    def _create(self, from_socket, to_socket, to_pointer):
+        link = self.links.new(from_socket, to_socket)
+        # Blender replaces the link of a single input socket
+        self.by_input[to_pointer] = [link]
+        self.created += 1
+        return link
+
+    def new(self, from_socket, to_socket):
+        if self.by_input is None:
+            self.index_links()
+        to_pointer = to_socket.as_pointer()
+        self.wanted.add(to_pointer)
+        link = self._existing(to_pointer, from_socket)
+        if link is not None:
+            return link
+        return self._create(from_socket, to_socket, to_pointer)
+
+    def new_batch(self, pairs):
+        """Create the links of ``pairs`` that do not exist yet, in one pass.
+
+        Args:
+            pairs: (from_socket, to_socket) tuples; when several target the
+                same input the last one wins, as with repeated ``new()``
+        """
+        if self.by_input is None:
+            self.index_links()
+        wanted = {}
+        for from_socket, to_socket in pairs:
+            wanted[to_socket.as_pointer()] = (from_socket, to_socket)
+        self.wanted.update(wanted)
+        for to_pointer, (from_socket, to_socket) in wanted.items():
+            if self._existing(to_pointer, from_socket) is None:
+                self._create(from_socket, to_socket, to_pointer)
+
+    def prune(self, nodes):
+        """Remove links into ``nodes`` that were not requested this run."""
+        if self.by_input is None:
+            self.index_links()
+        for node in nodes:
+            for socket in node.inputs:
+                if not socket.is_linked:
+                    continue
+                pointer = socket.as_pointer()
+                if pointer in self.wanted:
+                    continue
+                for link in self.by_input.pop(pointer, ()):
+                    self.links.remove(link)
+                    self.removed += 1
+
+
+class SocketTable:
+    """Name and index lookup of node sockets, built once per node and side.
+
+    ``sockets.get(name)`` is a linear scan of the RNA collection; resolving
+    every socket of a layer through one dict per node keeps link resolution
+    linear in the number of links.
+    """
+
+    def __init__(self, by_name):
+        self.by_name = by_name
+        self._tables = {}
+
+    def _table(self, node_name, is_output):
+        key = (node_name, is_output)
+        table = self._tables.get(key)
+        if table is None and key not in self._tables:
+            node = self.by_name.get(node_name)
+            if node is not None:
+                sockets = list(node.outputs if is_output else node.inputs)
+                names = {}
+                for socket in sockets:
+                    names.setdefault(socket.name, socket)
+                table = (sockets, names)
+            self._tables[key] = table
+        return table
+
+    def socket(self, node_name, key, is_output):
+        """Return the socket ``key`` (name or index) of a node, or None."""
+        table = self._table(node_name, is_output)
+        if table is None:
+            return None
+        sockets, names = table
+        if isinstance(key, int):
+            return sockets[key] if key < len(sockets) else None
+        return names.get(key)
+
+
+class PlanApplier:
+    """负责把 TreePlan 应用到 compositor 节点树"""
+
+    def __init__(self, tree, index=None):
+        self.tree = tree
+        self.index = index if index is not None else NodeIndex(tree)
+        self.reconciler = NodeReconciler(tree, self.index)
+        self.links = IncrementalLinks(tree)
+        self.links_skipped = 0
+
+    def apply_nodes(self, plan, clear_foreign_layers=None):
+        """Create or update every planned node and prune the rest of the scope.
+
+        Args:
+            plan: TreePlan to apply
+            clear_foreign_layers: Scene view layer names; when given, nodes that
+                do not belong to any of them are removed first (IDS_DelNodE)
+        """
+        rec = self.reconciler
+        if clear_foreign_layers is not None:
+            rec.remove_foreign(clear_foreign_layers)
+        for spec in plan.nodes.values():
+            if self.index.render_layer(spec.view_layer) is None:
+                continue
+            node, created = rec.node(
+                spec.bl_idname, spec.name, spec.label, spec.location, spec.hide
+            )
+            if spec.node_group is not None:
+                group = ensure_node_group(spec.node_group)
+                if node.node_tree is not group:
+                    node.node_tree = group
+            for attr, value in spec.props.items():
+                rec.set(node, attr, value)
+            for key, value in spec.input_defaults.items():
+                rec.set(node.inputs[key], "default_value", value)
+            for attr, value in spec.format.items():
+                if hasattr(node.format, attr):
+                    rec.set(node.format, attr, value)
+            if spec.path is not None:
+                rec.path(node, spec.path)
+            if spec.slots is not None:
+                if created:
+                    node.inputs.clear()
+                rec.slots(node, spec.slots)
+        rec.prune(plan.scope)
+
+    def resolve_links(self, plan, view_layer):
+        """Resolve the planned links of one layer to (from, to) socket pairs.
+
+        Links whose node or socket does not exist are counted in
+        ``links_skipped``.
+        """
+        table = SocketTable(self.index.by_name)
+        pairs = []
+        for spec in plan.layer_links(view_layer):
+            from_socket = table.socket(spec.from_node, spec.from_socket, True)
+            to_socket = table.socket(spec.to_node, spec.to_socket, False)
+            if from_socket is None or to_socket is None:
+                self.links_skipped += 1
+                continue
+            pairs.append((from_socket, to_socket))
+        return pairs
+
+    def apply_links(self, plan):
+        """Create planned links and remove stale links into planned nodes.
+
+        The existing links are indexed once, sockets are resolved per layer
+        into a SocketTable, then the layer's links are created in one batch.
+        """
+        links = self.links
+        links.index_links()
+        for view_layer in plan.linked_layers():
+            links.new_batch(self.resolve_links(plan, view_layer))
+        links.prune(self.reconciler.kept_nodes())
+
+    def apply(self, plan, clear_foreign_layers=None):
+        """Apply nodes, then links, of a plan."""
+        self.apply_nodes(plan, clear_foreign_layers)
+        self.apply_links(plan)
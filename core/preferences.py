@@ -17,6 +17,11 @@ class IDS_AddonPrefs(AddonPreferences):
         description="Denoise DiffCol / GlossCol / TransCol (The flat color aovs), may increase divide precision",
         default=True,
     )  # type: ignore
+    Use_Vector_Node_Groups: BoolProperty(
+        name="Use Shared Vector Conversion Groups",
+        description="Convert Normal, Position and Vector passes for Nuke with one shared node group per conversion instead of separate nodes per pass. Keeps large node trees small and fast",
+        default=True,
+    )  # type: ignore
     Use_Old_Layer_Naming: BoolProperty(
         name="Use Old EXR Layer Naming Convention",
         description="Use old EXR layer naming which is the same with 2.4.x below. The new layer naming is easier to read in nuke",
@@ -89,6 +94,17 @@ class IDS_AddonPrefs(AddonPreferences):
         description="In advanced mode, arrange DATA layers to the right of RGBA layers instead of below them",
         default=True,
     )  # type: ignore
+    Log_Cook_Timings: BoolProperty(
+        name="Log Cook Timings",
+        description="Append the phase timing of every Cook Nodetree / Update run as a JSON line to the cook log file",
+        default=False,
+    )  # type: ignore
+    Cook_Log_Path: StringProperty(
+        name="Cook Log File",
+        description="JSON lines file the cook timings are appended to. // is relative to the blend file, unsaved files log to the temp folder",
+        default="//iac_cook_log.jsonl",
+        subtype="FILE_PATH",
+    )  # type: ignore
 
     def draw(self, context):
         layout = self.layout
@@ -96,6 +112,7 @@ class IDS_AddonPrefs(AddonPreferences):
         box1.label(text="Core Function:", icon="MODIFIER_ON")
         box1.prop(self, "Denoise_Col")
         box1.prop(self, "Use_Old_Layer_Naming")
+        box1.prop(self, "Use_Vector_Node_Groups")
         box1.prop(self, "Only_Create_Enabled_Viewlayer")
         box1.prop(self, "Auto_Data_Sample")
         if self.Auto_Data_Sample is True:
@@ -113,3 +130,8 @@ class IDS_AddonPrefs(AddonPreferences):
         box3.prop(self, "Use_Icon_Only_Preference_Button")
         box3.prop(self, "Preference_Button_On_The_Right")
         box3.prop(self, "Preference_Button_Show_Alert")
+        box4 = layout.box()
+        box4.label(text="Diagnostics:", icon="MODIFIER_ON")
+        box4.prop(self, "Log_Cook_Timings")
+        if self.Log_Cook_Timings is True:
+            box4.prop(self, "Cook_Log_Path")
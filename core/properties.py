@@ -5,6 +5,12 @@
 import bpy
 
 
+def _update_denoise_policy(self, context):
+    from .denoise_policy import apply_denoise_policy
+
+    apply_denoise_policy(self)
+
+
 def register_properties():
     """Register all scene properties used by the addon."""
     
@@ -40,17 +46,40 @@ def register_properties():
         default=True,
     )
 
+    # One prefiltered normal/albedo pair per view layer for all its denoise nodes
+    bpy.types.Scene.IDS_ShareDenoiseAux = bpy.props.BoolProperty(
+        name="Shared Denoise Normal/Albedo",
+        description="Denoise the normal and albedo passes once per view layer and feed them to every denoise node of the layer without prefiltering. Faster with many passes, results differ slightly from per-node prefiltering",
+        default=False,
+    )
+
+    # Denoise policy, applied to existing denoise nodes without re-cooking
+    bpy.types.Scene.IDS_DenoisePolicy = bpy.props.EnumProperty(
+        name="Denoise Policy",
+        items=[
+            ("FINAL", "Final", "Denoise every pass with accurate prefilter and high quality"),
+            (
+                "PREVIEW",
+                "Preview",
+                "Denoise lighting and light group passes with fast prefilter and quality, skip color, emission and environment passes",
+            ),
+            ("NONE", "No Denoise", "Mute every denoise node"),
+        ],
+        default="FINAL",
+        update=_update_denoise_policy,
+    )
+
     # Auto arrange nodes
     bpy.types.Scene.IDS_Autoarr = bpy.props.BoolProperty(
         name="Auto Arrange Nodes at generating",
-        description="Auto arrange nodes when generating node tree, only if the compositor is visible in UI. Be careful if your scene is very heavy",
+        description="Auto arrange nodes when generating node tree. Only view layers whose connector nodes changed are re-arranged, also in background mode",
         default=True,
     )
 
     # Clear nodes when cooking
     bpy.types.Scene.IDS_DelNodE = bpy.props.BoolProperty(
         name='Clear Nodes When Running "Cook Nodetree"',
-        description="Delete nodes that already in compositor",
+        description="Delete nodes that already in compositor and were not generated by this addon. Generated nodes are always updated in place",
         default=True,
     )
 
@@ -68,6 +97,12 @@ def register_properties():
         default=False,
     )
 
+    bpy.types.Scene.IDS_SplitHalfData = bpy.props.BoolProperty(
+        name="Half Float DATA Split",
+        description="Write Normal, UV and Vector into a second, half float DATA file per view layer. Position, Pref and Depth stay full float",
+        default=False,
+    )
+
     bpy.types.Scene.IDS_UseDeepEXR = bpy.props.BoolProperty(
         name="Output Deep",
         description="Enable alpha-only deep output, use with my custom blender on my github",
@@ -165,6 +200,55 @@ def register_properties():
         default="ZIPS",
     )
 
+    # RGBA pass groups written to their own files
+    bpy.types.Scene.IDS_RGBASplitGroups = bpy.props.EnumProperty(
+        name="Split RGBA",
+        description="Write these pass groups into their own RGBA files, the main RGBA file keeps the beauty and the passes of the groups not selected",
+        items=[
+            ("LIGHTGROUPS", "Light Group Passes", "Light group passes (Combined_*)"),
+            ("SHADING", "Shading Passes", "Diffuse, glossy, transmission, volume, emission, environment and AO passes"),
+            ("AOVS", "Material AOV Passes", "Color shader AOVs"),
+        ],
+        options={"ENUM_FLAG"},
+        default=set(),
+    )
+
+    split_codec_items = [
+        ("RGBA", "Same as RGBA", "Use the RGBA codec"),
+        (
+            "ZIP",
+            "ZIP",
+            "Lossless. Provides Decently high compression rate, also playbacks fast. The balanced choice",
+        ),
+        (
+            "PIZ",
+            "PIZ",
+            "Lossless. Compression rate is the highest for grainy images, but slower to read than other Lossless method",
+        ),
+        (
+            "RLE",
+            "RLE",
+            "Lossless. Fastest for read & write, but significantly larger than other lossless method",
+        ),
+        (
+            "ZIPS",
+            "ZIPS",
+            "Lossless. Provides identical compression rate with ZIP, but nearly 40% faster to playback in Nuke (tested by me with a decent machine). The recommended method",
+        ),
+        ("DWAA", "DWAA", "Lossy. Small"),
+        ("DWAB", "DWAB", "Lossy. Small"),
+        ("NONE", "NONE", "No compress"),
+    ]
+    bpy.types.Scene.IDS_LightgroupCompression = bpy.props.EnumProperty(
+        name="Light Group Passes", items=split_codec_items, default="RGBA",
+    )
+    bpy.types.Scene.IDS_ShadingCompression = bpy.props.EnumProperty(
+        name="Shading Passes", items=split_codec_items, default="RGBA",
+    )
+    bpy.types.Scene.IDS_AOVCompression = bpy.props.EnumProperty(
+        name="Material AOV Passes", items=split_codec_items, default="RGBA",
+    )
+
     # Cryptomatte compression settings
     bpy.types.Scene.IDS_CryptoCompression = bpy.props.EnumProperty(
         name="Cryptomatte",
@@ -234,6 +318,44 @@ def register_properties():
         default=False,
     )
 
+    # Original output paths replaced by TokenReplacer (versioned JSON)
+    bpy.types.Scene.IDS_PathSnapshot = bpy.props.StringProperty(
+        name="Path Snapshot",
+        description="Original File Output paths stored by Renderfarm Prepare",
+        default="",
+        options={"HIDDEN"},
+    )
+
+    # Last EXR codec benchmark (versioned JSON)
+    bpy.types.Scene.IDS_CodecBenchReport = bpy.props.StringProperty(
+        name="Codec Benchmark",
+        description="Results of the last EXR codec benchmark",
+        default="",
+        options={"HIDDEN"},
+    )
+
+    # Frames per $chunk$ path token
+    bpy.types.Scene.IDS_TokenChunkSize = bpy.props.IntProperty(
+        name="Chunk Size",
+        description="Frames per render farm chunk, used by the $chunk$ path token",
+        default=10,
+        min=1,
+    )
+
+    # Phase timing summary of the last Cook / Update run
+    bpy.types.Scene.IDS_LastCookReport = bpy.props.StringProperty(
+        name="Last Cook Timing",
+        description="Phase timing and node counts of the last Cook Nodetree or Update run",
+        default="",
+    )
+
+    # Multi-scene cook selection
+    bpy.types.Scene.IDS_CookInBatch = bpy.props.BoolProperty(
+        name="Cook With Selected Scenes",
+        description="Include this scene when running Cook Selected Scenes",
+        default=False,
+    )
+
 
 def unregister_properties():
     """Unregister all scene properties."""
@@ -241,10 +363,17 @@ def unregister_properties():
         "IDS_ConfIg",
         "IDS_FileloC",
         "IDS_UsedN",
+        "IDS_DenoisePolicy",
+        "IDS_ShareDenoiseAux",
         "IDS_Autoarr",
         "IDS_DelNodE",
         "IDS_SepCryptO",
         "IDS_ArtDepth",
+        "IDS_SplitHalfData",
+        "IDS_RGBASplitGroups",
+        "IDS_LightgroupCompression",
+        "IDS_ShadingCompression",
+        "IDS_AOVCompression",
         "IDS_UseDeepEXR",
         "IDS_AdvMode",
         "IDS_UseDATALayer",
@@ -255,6 +384,11 @@ def unregister_properties():
         "IDS_DataMatType",
         "IDS_fakeDeep",
         "IDS_CloudModeActive",
+        "IDS_TokenChunkSize",
+        "IDS_PathSnapshot",
+        "IDS_CodecBenchReport",
+        "IDS_LastCookReport",
+        "IDS_CookInBatch",
     ]
     for prop in props:
         if hasattr(bpy.types.Scene, prop):
@@ -0,0 +1,118 @@
+# SPDX-License-Identifier: GPL-3.0-or-later
+# Copyright (C) Roland Vyens
+"""Background deletion of the trash_output folder.
+
+``scan_trash(folder)`` lists the folder once with ``os.scandir``, summing
+the file sizes and refusing folders that contain subfolders: valid addon
+outputs never land inside trash_output, so a subfolder means the render path
+points somewhere it should not. ``TrashCleaner`` deletes the listed files in
+a worker thread and exposes its progress, so the operator can poll it from a
+modal timer without blocking the UI on slow network storage.
+
+This module does not import bpy.
+"""
+
+import os
+import threading
+from dataclasses import dataclass, field
+
+
+class TrashFolderError(Exception):
+    """Raised when a folder must not be deleted."""
+
+
+@dataclass
+class TrashListing:
+    """Files found in a trash folder"""
+    folder: str
+    files: list = field(default_factory=list)
+    total_bytes: int = 0
+
+
+def scan_trash(folder) -> TrashListing:
+    """List the files of ``folder`` in one ``os.scandir`` pass.
+
+    Raises:
+        TrashFolderError: If the folder contains a subfolder
+        OSError: If the folder cannot be listed
+    """
+    listing = TrashListing(folder)
+    with os.scandir(folder) as entries:
+        for entry in entries:
+            if entry.is_dir(follow_symlinks=False):
+                raise TrashFolderError(f"subfolder found: {entry.path}")
+            try:
+                size = entry.stat(follow_symlinks=False).st_size
+            except OSError:
+                size = 0
+            listing.files.append((entry.path, size))
+            listing.total_bytes += size
+    return listing
+
+
+def format_bytes(size) -> str:
+    """Human readable size, e.g. ``"1.5 GB"``."""
+    for unit in ("B", "KB", "MB", "GB"):
+        if size < 1024 or unit == "GB":
+            break
+        size /= 1024
+    return f"{size:.0f} {unit}" if unit == "B" else f"{size:.1f} {unit}"
+
+
+class TrashCleaner:
+    """负责在后台线程中删除 trash_output 文件夹"""
+
+    def __init__(self, listing: TrashListing):
+        self.listing = listing
+        self.deleted_files = 0
+        self.deleted_bytes = 0
+        self.errors = []
+        self._cancel = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def start(self) -> None:
+        self._thread.start()
+
+    def cancel(self) -> None:
+        """Stop after the file being deleted; files already removed stay removed."""
+        self._cancel.set()
+
+    @property
+    def done(self) -> bool:
+        return not self._thread.is_alive()
+
+    @property
+    def cancelled(self) -> bool:
+        return self._cancel.is_set()
+
+    @property
+    def progress(self) -> float:
+        """Fraction of the bytes (or files, for empty files) deleted so far."""
+        if self.listing.total_bytes:
+            return self.deleted_bytes / self.listing.total_bytes
+        if self.listing.files:
+            return self.deleted_files / len(self.listing.files)
+        return 1.0
+
+    def _run(self) -> None:
+        for path, size in self.listing.files:
+            if self._cancel.is_set():
+                return
+            try:
+                os.unlink(path)
+            except FileNotFoundError:
+                pass
+            except OSError as e:
+                self.errors.append(f"{path}: {e}")
+                continue
+            self.deleted_files += 1
+            self.deleted_bytes += size
+        if not self.errors:
+            try:
+                os.rmdir(self.listing.folder)
+            except OSError as e:
+                # New files appeared while deleting (a render still running)
+                self.errors.append(f"{self.listing.folder}: {e}")
+
+    def wait(self, timeout=None) -> None:
+        self._thread.join(timeout)
@@ -0,0 +1,879 @@
+# SPDX-License-Identifier: GPL-3.0-or-later
+# Copyright (C) Roland Vyens
+"""Declarative compositor tree plan for Industrial AOV Connector.
+
+The planner turns sorted passes plus a snapshot of the scene settings into a
+list of node and link specs. It never touches ``bpy``, so a plan can be built,
+compared, cached or profiled outside Blender. ``plan_applier`` is the only
+place that turns a plan into real nodes.
+"""
+
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple, Union
+
+from ..constants import (
+    NODE_LOCATION_DENOISE,
+    NODE_LOCATION_BREAK,
+    NODE_LOCATION_COMBINE,
+    NODE_LOCATION_INVERT,
+    NODE_LOCATION_OUTPUT,
+    NODE_LOCATION_NORMALIZE,
+    NODE_LOCATION_VECTOR_IN,
+    NODE_LOCATION_VECTOR_OUT,
+    NODE_LOCATION_CONVERT,
+    NODE_SUFFIX_CONVERT,
+    VECTOR_GROUP_MOTION,
+    VECTOR_GROUP_TO_NUKE,
+    VECTOR_GROUP_XYZ,
+    EXR_CODEC_DEFAULT,
+    EXR_COLOR_DEPTH_RGBA,
+    EXR_COLOR_DEPTH_DATA,
+    EXR_COLOR_DEPTH_DATA_HALF,
+    EXR_DATA_PASS_PRECISION,
+    NODE_NAME_SEPARATOR,
+    DENOISE_EXCLUDE_PASSES,
+    DENOISE_AUX_PASSES,
+    DENOISE_AUX_REMAP,
+    NODE_SUFFIX_DENOISE_AUX,
+    NODE_SUFFIX_DENOISE_DECODE,
+    NODE_SUFFIX_DENOISE_ENCODE,
+    DATA_LAYER_PREFIX,
+    DATA_LAYER_SUFFIX,
+    OUTPUT_SUFFIX_RGBA,
+    OUTPUT_SUFFIX_DATA,
+    OUTPUT_SUFFIX_CRYPTO,
+    OUTPUT_SUFFIX_ALL,
+    OUTPUT_SUFFIX_DEEP,
+    OUTPUT_SUFFIX_DATA_HALF,
+    LABEL_SUFFIX_RGBA,
+    LABEL_SUFFIX_DATA,
+    LABEL_SUFFIX_CRYPTO,
+    LABEL_SUFFIX_ALL,
+    LABEL_SUFFIX_DEEP,
+    LABEL_SUFFIX_DATA_HALF,
+    RGBA_SPLIT_GROUPS,
+    LIGHTGROUP_PASS_PREFIX,
+    AOV_CATEGORY_DEPTH,
+    AOV_CATEGORY_POSITION,
+    AOV_CATEGORY_NORMAL,
+    AOV_CATEGORY_UV,
+    AOV_CATEGORY_INDEX,
+    AOV_CATEGORY_DEBUG,
+)
+from ..path_modify_v2 import compose_final_path
+
+
+SocketKey = Union[str, int]
+
+FAKE_DEEP_MATERIAL_TYPES = {
+    "Antialias Depth Material",
+    "Antialias Depth & Position Material",
+}
+
+
+def is_data_layer(layer_name: str) -> bool:
+    """Check if a view layer is a DATA/export layer.
+
+    Args:
+        layer_name: Name of the view layer to check
+
+    Returns:
+        bool: True if layer starts with DATA_LAYER_PREFIX or contains DATA_LAYER_SUFFIX
+    """
+    return layer_name.startswith(DATA_LAYER_PREFIX) or DATA_LAYER_SUFFIX in layer_name
+
+
+def nuke_slot_name(name, use_old_naming=False):
+    """Return the Nuke-compatible name ``rename_outputs`` gives a slot.
+
+    Args:
+        name: Raw pass/slot name
+        use_old_naming: Keep the legacy (2.4.x) EXR layer names
+
+    Returns:
+        str: Renamed slot name
+    """
+    if name != "Deep_From_Image_z":
+        name = name.replace("Image", "rgba")
+    name = name.replace("Combined", "RGBA")
+    name = name.replace("$$aoP", "")
+    if use_old_naming is False:
+        name = name.replace("Position", "Pworld")
+        if name != "Artistic_Depth":
+            name = name.replace("Depth", "z")
+    name = name.replace("Denoising z", "Artistic_Depth")
+    return name
+
+
+def pass_precision(socket) -> str:
+    """Return the EXR color depth a DATA pass needs ("16" or "32")."""
+    return EXR_DATA_PASS_PRECISION.get(socket, EXR_COLOR_DEPTH_DATA)
+
+
+def sorting_data(aov_list):
+    """按类型对AOV列表进行排序"""
+    aov_classes = {
+        "Depth and Z Buffers": [],
+        "Position and World Coordinates": [],
+        "Normal and Vector": [],
+        "UV Coordinates": [],
+        "Indexes": [],
+        "Debug and Denoising": [],
+        "others": [],
+    }
+    
+    for aov in aov_list:
+        if aov in AOV_CATEGORY_DEPTH:
+            aov_classes["Depth and Z Buffers"].append(aov)
+        elif aov in AOV_CATEGORY_POSITION:
+            aov_classes["Position and World Coordinates"].append(aov)
+        elif aov in AOV_CATEGORY_NORMAL:
+            aov_classes["Normal and Vector"].append(aov)
+        elif aov in AOV_CATEGORY_UV:
+            aov_classes["UV Coordinates"].append(aov)
+        elif aov in AOV_CATEGORY_INDEX:
+            aov_classes["Indexes"].append(aov)
+        elif aov in AOV_CATEGORY_DEBUG:
+            aov_classes["Debug and Denoising"].append(aov)
+        else:
+            aov_classes["others"].append(aov)
+    
+    arranged_aov_list = []
+    for category, items in aov_classes.items():
+        arranged_aov_list.extend(items)
+    
+    return arranged_aov_list
+
+
+@dataclass
+class PlanSettings:
+    """节点树规划所需的设置快照
+
+    Holds every scene property, addon preference and version-dependent id the
+    planner reads, so planning needs no ``bpy`` access.
+    """
+
+    config: str = "OPTION1"
+    adv_mode: bool = False
+    use_data_layer: bool = False
+    use_denoise: bool = False
+    is_cycles: bool = True
+    sep_crypto: bool = True
+    adv_crypto: bool = False
+    art_depth: bool = False
+    use_deep: bool = False
+    fake_deep: bool = False
+    data_mat_type: str = ""
+    rgba_codec: str = EXR_CODEC_DEFAULT
+    data_codec: str = EXR_CODEC_DEFAULT
+    crypto_codec: str = EXR_CODEC_DEFAULT
+    split_half_data: bool = False
+    share_denoise_aux: bool = False
+    use_vector_groups: bool = False
+    rgba_split: frozenset = frozenset()
+    # (group, codec) pairs, codec "RGBA" means the RGBA codec
+    split_codecs: Tuple[Tuple[str, str], ...] = ()
+    denoise_col: bool = False
+    material_aovs: frozenset = frozenset()
+    output_root: str = ""
+    use_subfolder: bool = False
+    custom_suffix: str = ""
+    scene_view_layers: Tuple[str, ...] = ()
+    math_node_id: str = "CompositorNodeMath"
+    separate_xyz_node_id: str = "CompositorNodeSeparateXYZ"
+    combine_xyz_node_id: str = "CompositorNodeCombineXYZ"
+    color_pass_names: Tuple[str, ...] = ("DiffCol", "GlossCol", "TransCol")
+
+    @classmethod
+    def from_scene(cls, scene, addon_prefs, material_aovs, output_root, compat):
+        """Snapshot the settings of a scene.
+
+        Args:
+            scene: Blender scene
+            addon_prefs: Addon preferences
+            material_aovs: Set of material AOV names of all scenes
+            output_root: Render output folder without trash_output
+            compat: BlenderCompat (or any object with the same attributes)
+        """
+        return cls(
+            config=scene.IDS_ConfIg,
+            adv_mode=scene.IDS_AdvMode is True,
+            use_data_layer=scene.IDS_UseDATALayer is True,
+            use_denoise=scene.IDS_UsedN is True,
+            is_cycles=scene.render.engine == "CYCLES",
+            sep_crypto=scene.IDS_SepCryptO is True,
+            adv_crypto=scene.IDS_UseAdvCrypto is True,
+            art_depth=scene.IDS_ArtDepth is True,
+            use_deep=bool(scene.IDS_UseDeepEXR),
+            fake_deep=scene.IDS_fakeDeep is True,
+            data_mat_type=scene.IDS_DataMatType,
+            rgba_codec=scene.IDS_RGBACompression,
+            data_codec=scene.IDS_DATACompression,
+            crypto_codec=scene.IDS_CryptoCompression,
+            split_half_data=scene.IDS_SplitHalfData is True,
+            share_denoise_aux=scene.IDS_ShareDenoiseAux is True,
+            rgba_split=frozenset(scene.IDS_RGBASplitGroups),
+            split_codecs=(
+                ("LIGHTGROUPS", scene.IDS_LightgroupCompression),
+                ("SHADING", scene.IDS_ShadingCompression),
+                ("AOVS", scene.IDS_AOVCompression),
+            ),
+            denoise_col=addon_prefs.Denoise_Col,
+            use_vector_groups=addon_prefs.Use_Vector_Node_Groups,
+            material_aovs=frozenset(material_aovs),
+            output_root=output_root,
+            use_subfolder=scene.IDS_FileloC is True,
+            custom_suffix=addon_prefs.Custom_Suffix,
+            scene_view_layers=tuple(vl.name for vl in scene.view_layers),
+            math_node_id=compat.math_node_id,
+            separate_xyz_node_id=compat.separate_xyz_node_id,
+            combine_xyz_node_id=compat.combine_xyz_node_id,
+            color_pass_names=(
+                compat.diffuse_color_name,
+                compat.glossy_color_name,
+                compat.transmission_color_name,
+            ),
+        )
+
+    @property
+    def use_adv_layers(self) -> bool:
+        """True when DATA layers are built with the advanced-mode rules."""
+        return self.adv_mode and self.use_data_layer
+
+    @property
+    def all_in_one(self) -> bool:
+        """True for Config 2 (everything in one file)."""
+        return self.config == "OPTION2" and not self.adv_mode
+
+    def final_path(self, view_layer, output_type, strip_prefix=False) -> str:
+        """Return the output path of one file output node."""
+        path = compose_final_path(
+            self.output_root, view_layer, output_type,
+            self.use_subfolder, self.custom_suffix,
+        )
+        if strip_prefix:
+            path = path.replace(DATA_LAYER_PREFIX, "")
+        return path
+
+
+@dataclass
+class NodeSpec:
+    """描述一个期望存在的节点"""
+
+    name: str
+    bl_idname: str
+    label: str
+    view_layer: str
+    role: str
+    location: Tuple[float, float] = (0, 0)
+    hide: bool = False
+    props: Dict[str, object] = field(default_factory=dict)
+    input_defaults: Dict[SocketKey, object] = field(default_factory=dict)
+    format: Dict[str, str] = field(default_factory=dict)
+    path: Optional[str] = None
+    slots: Optional[List[str]] = None
+    # Name of the shared node group of a group node
+    node_group: Optional[str] = None
+
+    @property
+    def is_output(self) -> bool:
+        return self.slots is not None
+
+    def key(self) -> tuple:
+        """Hashable summary used to compare plans."""
+        return (
+            self.name, self.bl_idname, self.label, self.hide,
+            tuple(sorted(self.props.items())),
+            tuple(sorted(self.input_defaults.items(), key=lambda kv: str(kv[0]))),
+            tuple(self.format.items()),
+            self.path,
+            tuple(self.slots) if self.slots is not None else None,
+            self.node_group,
+        )
+
+
+@dataclass(frozen=True)
+class LinkSpec:
+    """描述一条期望存在的连线（按节点名和 socket 名/序号定位）"""
+
+    from_node: str
+    from_socket: SocketKey
+    to_node: str
+    to_socket: SocketKey
+
+
+class TreePlan:
+    """负责保存一次规划得到的节点和连线"""
+
+    def __init__(self, scope=()):
+        self.scope = list(scope)
+        self.nodes: Dict[str, NodeSpec] = {}
+        self.links: List[LinkSpec] = []
+        self._layer_nodes: Dict[str, List[NodeSpec]] = {}
+        self._layer_links: Dict[str, List[LinkSpec]] = {}
+
+    def add_node(self, spec: NodeSpec) -> NodeSpec:
+        self.nodes[spec.name] = spec
+        self._layer_nodes.setdefault(spec.view_layer, []).append(spec)
+        return spec
+
+    def link(self, view_layer, from_node, from_socket, to_node, to_socket) -> None:
+        spec = LinkSpec(from_node, from_socket, to_node, to_socket)
+        self.links.append(spec)
+        self._layer_links.setdefault(view_layer, []).append(spec)
+
+    def layers(self) -> List[str]:
+        """View layers that received at least one node."""
+        return list(self._layer_nodes)
+
+    def layer_nodes(self, view_layer) -> List[NodeSpec]:
+        return self._layer_nodes.get(view_layer, [])
+
+    def layer_links(self, view_layer) -> List[LinkSpec]:
+        return self._layer_links.get(view_layer, [])
+
+    def linked_layers(self) -> List[str]:
+        """View layers that received at least one link, in planning order."""
+        return list(self._layer_links)
+
+    def layer_signature(self, view_layer) -> tuple:
+        """Hashable description of everything planned for one view layer."""
+        return (
+            tuple(spec.key() for spec in self.layer_nodes(view_layer)),
+            tuple(self.layer_links(view_layer)),
+        )
+
+    def changed_layers(self, previous) -> List[str]:
+        """Return the layers in scope whose plan differs from ``previous``."""
+        if previous is None:
+            return list(self.scope)
+        return [
+            layer for layer in self.scope
+            if self.layer_signature(layer) != previous.layer_signature(layer)
+        ]
+
+    def stats(self) -> dict:
+        return {
+            "layers": len(self.scope),
+            "nodes": len(self.nodes),
+            "links": len(self.links),
+            "slots": sum(len(s.slots) for s in self.nodes.values() if s.slots),
+        }
+
+
+class TreePlanner:
+    """负责根据 pass 信息和设置快照生成 TreePlan"""
+
+    def __init__(self, settings: PlanSettings):
+        self.settings = settings
+
+    def plan(self, viewlayer_full, viewlayers, scope=None) -> TreePlan:
+        """Plan nodes and links for ``viewlayers``.
+
+        Args:
+            viewlayer_full: Sorted pass dict from PassSorter
+            viewlayers: View layer names to plan
+            scope: View layers whose connector nodes the plan fully describes
+                (nodes of these layers missing from the plan get removed),
+                defaults to ``viewlayers``
+
+        Returns:
+            TreePlan
+        """
+        plan = TreePlan(viewlayers if scope is None else scope)
+        for view_layer in viewlayers:
+            self.plan_layer(plan, viewlayer_full, view_layer)
+        return plan
+
+    def plan_layer(self, plan, viewlayer_full, view_layer) -> None:
+        """Plan one view layer according to the current config."""
+        settings = self.settings
+        if settings.use_adv_layers:
+            if is_data_layer(view_layer):
+                self._plan_adv_data_layer(plan, viewlayer_full, view_layer)
+            else:
+                self._plan_adv_regular_layer(plan, viewlayer_full, view_layer)
+        elif settings.all_in_one:
+            self._plan_all_in_one(plan, viewlayer_full, view_layer)
+        else:
+            self._plan_separate(plan, viewlayer_full, view_layer)
+
+    # -------------------------------------------------------------------------
+    # Node helpers
+    # -------------------------------------------------------------------------
+
+    @staticmethod
+    def _name(view_layer, role):
+        return f"{view_layer}{NODE_NAME_SEPARATOR}{role}"
+
+    def _node(self, plan, view_layer, role, bl_idname, label, location, **kwargs):
+        return plan.add_node(NodeSpec(
+            name=self._name(view_layer, role),
+            bl_idname=bl_idname,
+            label=label,
+            view_layer=view_layer,
+            role=role,
+            location=location,
+            **kwargs,
+        ))
+
+    def _output(self, plan, view_layer, role, label_suffix, output_type,
+                color_depth, codec, slots, strip_prefix=False):
+        """Plan a multilayer EXR file output node."""
+        return self._node(
+            plan, view_layer, role, "CompositorNodeOutputFile",
+            f"{view_layer}_{label_suffix}", NODE_LOCATION_OUTPUT,
+            format={
+                "file_format": "OPEN_EXR_MULTILAYER",
+                "color_depth": color_depth,
+                "exr_codec": codec,
+            },
+            path=self.settings.final_path(view_layer, output_type, strip_prefix),
+            slots=list(slots),
+        )
+
+    def _deep_output(self, plan, view_layer):
+        """Plan the alpha-only Deep EXR output node."""
+        self._node(
+            plan, view_layer, OUTPUT_SUFFIX_DEEP, "CompositorNodeOutputFile",
+            f"{view_layer}_{LABEL_SUFFIX_DEEP}", NODE_LOCATION_OUTPUT,
+            # File Output defaults to MULTI_LAYER_IMAGE, which only allows
+            # OPEN_EXR_MULTILAYER. Switch media type first to unlock DEEP_EXR.
+            format={
+                "media_type": "IMAGE",
+                "file_format": "DEEP_EXR",
+                "exr_codec": EXR_CODEC_DEFAULT,
+                "color_depth": EXR_COLOR_DEPTH_RGBA,
+            },
+            path=self.settings.final_path(view_layer, "Deep"),
+            slots=["alpha"],
+        )
+        plan.link(view_layer, view_layer, "Alpha",
+                  self._name(view_layer, OUTPUT_SUFFIX_DEEP), "alpha")
+
+    def should_denoise(self, socket) -> bool:
+        """Determine if a color pass gets a denoise node."""
+        if socket in DENOISE_EXCLUDE_PASSES:
+            return False
+        if socket in self.settings.material_aovs:
+            return False
+        if not self.settings.denoise_col and socket in self.settings.color_pass_names:
+            return False
+        return True
+
+    def _denoise_passes(self, color_sockets):
+        settings = self.settings
+        if not (settings.use_denoise and settings.is_cycles):
+            return []
+        if color_sockets == ["Image"]:
+            return []
+        return [s for s in color_sockets if self.should_denoise(s)]
+
+    # -------------------------------------------------------------------------
+    # Pass groups
+    # -------------------------------------------------------------------------
+
+    def _denoise_aux(self, plan, view_layer):
+        """Return the (node, socket) sources of the denoise Normal and Albedo inputs.
+
+        With ``share_denoise_aux`` the layer gets one denoise node per
+        auxiliary pass, planned on first use, whose output feeds every
+        denoise node of the layer instead of the raw Render Layers pass.
+        Passes in ``DENOISE_AUX_REMAP`` (the Normal) are mapped into [0, 1]
+        by an encode group before that node and back by a decode group, as
+        the denoise node clamps negative values of its Image input.
+        """
+        if not self.settings.share_denoise_aux:
+            return [(view_layer, socket) for socket in DENOISE_AUX_PASSES]
+        sources = []
+        for socket, prefix in DENOISE_AUX_PASSES.items():
+            role = f"{prefix}{NODE_SUFFIX_DENOISE_AUX}"
+            name = self._name(view_layer, role)
+            remap = DENOISE_AUX_REMAP.get(socket)
+            decode = self._name(view_layer, f"{prefix}{NODE_SUFFIX_DENOISE_DECODE}")
+            if name not in plan.nodes:
+                self._node(
+                    plan, view_layer, role, "CompositorNodeDenoise",
+                    f"{view_layer}_{prefix}_DN_AUX", NODE_LOCATION_DENOISE, hide=True,
+                )
+                if remap is None:
+                    plan.link(view_layer, view_layer, socket, name, "Image")
+                else:
+                    encode = self._node(
+                        plan, view_layer, f"{prefix}{NODE_SUFFIX_DENOISE_ENCODE}",
+                        "CompositorNodeGroup", f"{view_layer}_{prefix}_DN_ENCODE",
+                        NODE_LOCATION_DENOISE, hide=True, node_group=remap[0],
+                    ).name
+                    self._node(
+                        plan, view_layer, f"{prefix}{NODE_SUFFIX_DENOISE_DECODE}",
+                        "CompositorNodeGroup", f"{view_layer}_{prefix}_DN_DECODE",
+                        NODE_LOCATION_DENOISE, hide=True, node_group=remap[1],
+                    )
+                    plan.link(view_layer, view_layer, socket, encode, "Vector")
+                    plan.link(view_layer, encode, "Vector", name, "Image")
+                    plan.link(view_layer, name, "Image", decode, "Vector")
+            sources.append((name, "Image") if remap is None else (decode, "Vector"))
+        return sources
+
+    def _plan_color(self, plan, view_layer, color_sockets, output_name):
+        """Plan denoise nodes and RGBA links of the color passes."""
+        denoised = self._denoise_passes(color_sockets)
+        if denoised and self.settings.is_cycles:
+            normal, albedo = self._denoise_aux(plan, view_layer)
+        for socket in denoised:
+            dn_name = self._name(view_layer, f"{socket}_Dn")
+            self._node(
+                plan, view_layer, f"{socket}_Dn", "CompositorNodeDenoise",
+                f"{view_layer}_{socket}_DN", NODE_LOCATION_DENOISE, hide=True,
+            )
+            plan.link(view_layer, view_layer, socket, dn_name, "Image")
+            if self.settings.is_cycles:
+                plan.link(view_layer, *normal, dn_name, "Normal")
+                plan.link(view_layer, *albedo, dn_name, "Albedo")
+            plan.link(view_layer, dn_name, "Image", output_name, socket)
+        denoised = set(denoised)
+        for socket in color_sockets:
+            if socket not in denoised:
+                plan.link(view_layer, view_layer, socket, output_name, socket)
+
+    def rgba_group(self, socket) -> Optional[str]:
+        """Return the selected RGBA split group of a color pass, None for the main file."""
+        split = self.settings.rgba_split
+        if not split or socket == "Image":
+            return None
+        if socket.startswith(LIGHTGROUP_PASS_PREFIX):
+            group = "LIGHTGROUPS"
+        elif socket in self.settings.material_aovs:
+            group = "AOVS"
+        else:
+            group = "SHADING"
+        return group if group in split else None
+
+    def _plan_rgba(self, plan, view_layer, color_sockets, codec):
+        """Plan the RGBA output and one output per selected pass group."""
+        grouped = {}
+        main = []
+        for socket in color_sockets:
+            group = self.rgba_group(socket)
+            if group is None:
+                main.append(socket)
+            else:
+                grouped.setdefault(group, []).append(socket)
+
+        rgba = self._output(
+            plan, view_layer, OUTPUT_SUFFIX_RGBA, LABEL_SUFFIX_RGBA, "RGBA",
+            EXR_COLOR_DEPTH_RGBA, codec, main,
+        ).name
+        self._plan_color(plan, view_layer, main, rgba)
+
+        group_codecs = dict(self.settings.split_codecs)
+        for group, role, label_suffix, output_type in RGBA_SPLIT_GROUPS:
+            sockets = grouped.get(group)
+            if not sockets:
+                continue
+            group_codec = group_codecs.get(group, "RGBA")
+            if group_codec == "RGBA" or not self.settings.adv_mode:
+                group_codec = codec
+            output = self._output(
+                plan, view_layer, role, label_suffix, output_type,
+                EXR_COLOR_DEPTH_RGBA, group_codec, sockets,
+            ).name
+            self._plan_color(plan, view_layer, sockets, output)
+        return rgba
+
+    def _plan_aux_nodes(self, plan, view_layer, data_sockets):
+        """Plan Normalize and Vector conversion helper nodes."""
+        if self.settings.art_depth:
+            self._node(
+                plan, view_layer, "Denoising Depth_Normalize", "CompositorNodeNormalize",
+                f"{view_layer}_Denoising Depth_Normalize", NODE_LOCATION_NORMALIZE,
+                hide=True,
+            )
+        if "Vector" in data_sockets:
+            self._plan_vector_in_out(plan, view_layer)
+
+    def _plan_vector_in_out(self, plan, view_layer):
+        if self.settings.use_vector_groups:
+            self._node(
+                plan, view_layer, f"Vector{NODE_SUFFIX_CONVERT}", "CompositorNodeGroup",
+                f"{view_layer}_Vector_CONVERT", NODE_LOCATION_CONVERT, hide=True,
+                node_group=VECTOR_GROUP_MOTION,
+            )
+            return
+        self._node(
+            plan, view_layer, "Vector_VectorIn", "CompositorNodeSeparateColor",
+            f"{view_layer}_Vector_VECTORIN", NODE_LOCATION_VECTOR_IN, hide=True,
+        )
+        self._node(
+            plan, view_layer, "Vector_VectorOut", "CompositorNodeCombineColor",
+            f"{view_layer}_Vector_VECTOROUT", NODE_LOCATION_VECTOR_OUT, hide=True,
+        )
+
+    def _plan_fake_deep_node(self, plan, view_layer, data_sockets):
+        settings = self.settings
+        if (
+            settings.fake_deep
+            and settings.data_mat_type in FAKE_DEEP_MATERIAL_TYPES
+            and "Depth_AA$$aoP" in data_sockets
+        ):
+            self._node(
+                plan, view_layer, "Depth_AA_Re", settings.math_node_id,
+                f"{view_layer}_Depth_AA_Re", NODE_LOCATION_INVERT, hide=True,
+                props={"operation": "DIVIDE"}, input_defaults={0: 1},
+            )
+
+    def _plan_data_links(self, plan, view_layer, data_sockets, vector_sockets,
+                         output_name, fake_deep=False):
+        """Plan links of the DATA passes into ``output_name``."""
+        rl = view_layer
+        vectors = set(vector_sockets)
+        for socket in data_sockets:
+            if socket in vectors:
+                continue
+            if socket == "Vector" and self.settings.use_vector_groups:
+                conv = self._name(view_layer, f"Vector{NODE_SUFFIX_CONVERT}")
+                plan.link(view_layer, rl, "Vector", conv, "Image")
+                plan.link(view_layer, conv, "Image", output_name, "Vector")
+            elif socket == "Vector":
+                vin = self._name(view_layer, "Vector_VectorIn")
+                vout = self._name(view_layer, "Vector_VectorOut")
+                plan.link(view_layer, rl, "Vector", vin, "Image")
+                plan.link(view_layer, vout, "Image", output_name, "Vector")
+                plan.link(view_layer, vin, "Green", vout, "Blue")
+                plan.link(view_layer, vin, "Blue", vout, "Red")
+                plan.link(view_layer, vin, "Blue", vout, "Alpha")
+                plan.link(view_layer, vin, "Alpha", vout, "Green")
+            elif socket == "Denoising Depth":
+                norm = self._name(view_layer, "Denoising Depth_Normalize")
+                plan.link(view_layer, rl, "Denoising Depth", norm, "Value")
+                plan.link(view_layer, norm, "Value", output_name, "Denoising Depth")
+            elif socket == "Deep_From_Image_z" and fake_deep:
+                re_node = self._name(view_layer, "Depth_AA_Re")
+                plan.link(view_layer, rl, "Depth_AA$$aoP", re_node, 1)
+                plan.link(view_layer, re_node, "Value", output_name, "Deep_From_Image_z")
+            else:
+                plan.link(view_layer, rl, socket, output_name, socket)
+
+    def _plan_vectors(self, plan, view_layer, vector_sockets, output_name):
+        """Plan Break/Combine/Invert nodes and their XYZ remapping links.
+
+        Performs coordinate system conversion from Blender to Nuke for
+        Normal and Position passes: X -> X, Z -> Y, Y -> -Z. With
+        ``use_vector_groups`` each pass gets one shared group node instead.
+        """
+        settings = self.settings
+        if settings.use_vector_groups:
+            self._plan_vector_groups(plan, view_layer, vector_sockets, output_name)
+            return
+        for socket in vector_sockets:
+            brk = self._node(
+                plan, view_layer, f"{socket}_Break", settings.separate_xyz_node_id,
+                f"{view_layer}_{socket}_BREAK", NODE_LOCATION_BREAK, hide=True,
+            ).name
+            comb = self._node(
+                plan, view_layer, f"{socket}_Combine", settings.combine_xyz_node_id,
+                f"{view_layer}_{socket}_COMBINE", NODE_LOCATION_COMBINE, hide=True,
+            ).name
+            inv = self._node(
+                plan, view_layer, f"{socket}_Inv", settings.math_node_id,
+                f"{view_layer}_{socket}_INVERT", NODE_LOCATION_INVERT, hide=True,
+                props={"operation": "MULTIPLY"}, input_defaults={1: -1},
+            ).name
+            if output_name is None:
+                continue
+            plan.link(view_layer, view_layer, socket, brk, "Vector")
+            plan.link(view_layer, comb, "Vector", output_name, socket)
+            if socket in AOV_CATEGORY_NORMAL or socket in AOV_CATEGORY_POSITION:
+                plan.link(view_layer, brk, "X", comb, "X")
+                plan.link(view_layer, brk, "Z", comb, "Y")
+                plan.link(view_layer, brk, "Y", inv, 0)
+                plan.link(view_layer, inv, 0, comb, "Z")
+            else:
+                plan.link(view_layer, brk, "X", comb, "X")
+                plan.link(view_layer, brk, "Y", comb, "Y")
+                plan.link(view_layer, brk, "Z", comb, "Z")
+
+    def _plan_vector_groups(self, plan, view_layer, vector_sockets, output_name):
+        """Plan one shared conversion group node per vector pass."""
+        for socket in vector_sockets:
+            if socket in AOV_CATEGORY_NORMAL or socket in AOV_CATEGORY_POSITION:
+                group = VECTOR_GROUP_TO_NUKE
+            else:
+                group = VECTOR_GROUP_XYZ
+            conv = self._node(
+                plan, view_layer, f"{socket}{NODE_SUFFIX_CONVERT}", "CompositorNodeGroup",
+                f"{view_layer}_{socket}_CONVERT", NODE_LOCATION_CONVERT, hide=True,
+                node_group=group,
+            ).name
+            if output_name is None:
+                continue
+            plan.link(view_layer, view_layer, socket, conv, "Vector")
+            plan.link(view_layer, conv, "Vector", output_name, socket)
+
+    def _split_precision(self, data_sockets):
+        """Split DATA passes into (full float, half float) lists.
+
+        Without ``split_half_data`` every pass stays full float.
+        """
+        if not self.settings.split_half_data:
+            return data_sockets, []
+        full, half = [], []
+        for socket in data_sockets:
+            if pass_precision(socket) == EXR_COLOR_DEPTH_DATA_HALF:
+                half.append(socket)
+            else:
+                full.append(socket)
+        return full, half
+
+    def _plan_half_data(self, plan, view_layer, half_sockets, vector_sockets, codec,
+                        strip_prefix=False):
+        """Plan the half float DATA output and its links, None if not needed."""
+        if not half_sockets:
+            return None
+        output = self._output(
+            plan, view_layer, OUTPUT_SUFFIX_DATA_HALF, LABEL_SUFFIX_DATA_HALF, "DATA_half",
+            EXR_COLOR_DEPTH_DATA_HALF, codec, ["Image"] + sorting_data(half_sockets),
+            strip_prefix,
+        ).name
+        plan.link(view_layer, view_layer, "Image", output, "Image")
+        self._plan_data_links(plan, view_layer, half_sockets, vector_sockets, output)
+        return output
+
+    def _plan_vector_outputs(self, plan, view_layer, vector_sockets, data_output, half_output):
+        """Plan the vector conversions into the output matching each pass precision."""
+        if half_output is None:
+            self._plan_vectors(plan, view_layer, vector_sockets, data_output)
+            return
+        half = [s for s in vector_sockets if pass_precision(s) == EXR_COLOR_DEPTH_DATA_HALF]
+        full = [s for s in vector_sockets if s not in half]
+        self._plan_vectors(plan, view_layer, full, data_output)
+        self._plan_vectors(plan, view_layer, half, half_output)
+
+    def _plan_crypto_output(self, plan, view_layer, crypto_sockets, strip_prefix):
+        settings = self.settings
+        codec = settings.crypto_codec if settings.adv_mode else EXR_CODEC_DEFAULT
+        output = self._output(
+            plan, view_layer, OUTPUT_SUFFIX_CRYPTO, LABEL_SUFFIX_CRYPTO, "Cryptomatte",
+            EXR_COLOR_DEPTH_DATA, codec, ["Image"] + crypto_sockets, strip_prefix,
+        ).name
+        self._plan_crypto_links(plan, view_layer, crypto_sockets, output)
+
+    @staticmethod
+    def _plan_crypto_links(plan, view_layer, crypto_sockets, output_name):
+        if crypto_sockets:
+            plan.link(view_layer, view_layer, "Image", output_name, "Image")
+        for socket in crypto_sockets:
+            plan.link(view_layer, view_layer, socket, output_name, socket)
+
+    @staticmethod
+    def _passes(viewlayer_full, view_layer):
+        color = list(viewlayer_full.get(f"{view_layer}Color", []))
+        data = list(viewlayer_full.get(f"{view_layer}Data", []))
+        crypto = list(viewlayer_full.get(f"{view_layer}Crypto", []))
+        vector = [
+            v for v in viewlayer_full.get(f"{view_layer}Vector", [])
+            if v != "Denoising Normal"
+        ]
+        return color, data, crypto, vector
+
+    # -------------------------------------------------------------------------
+    # Configs
+    # -------------------------------------------------------------------------
+
+    def _plan_separate(self, plan, viewlayer_full, view_layer):
+        """Config 1: Separate RGBA and DATA files."""
+        settings = self.settings
+        color, data, crypto, vector = self._passes(viewlayer_full, view_layer)
+        adv = settings.adv_mode
+
+        self._plan_rgba(plan, view_layer, color, settings.rgba_codec if adv else EXR_CODEC_DEFAULT)
+        if settings.use_deep and not is_data_layer(view_layer):
+            self._deep_output(plan, view_layer)
+
+        data_codec = settings.data_codec if adv else EXR_CODEC_DEFAULT
+        float_data, half_data = self._split_precision(data)
+        data_output = None
+        if float_data or (crypto and not settings.sep_crypto):
+            slots = ["Image"] + sorting_data(float_data)
+            if not settings.sep_crypto:
+                slots += crypto
+            data_output = self._output(
+                plan, view_layer, OUTPUT_SUFFIX_DATA, LABEL_SUFFIX_DATA, "DATA",
+                EXR_COLOR_DEPTH_DATA, data_codec, slots,
+            ).name
+            plan.link(view_layer, view_layer, "Image", data_output, "Image")
+        if data or data_output is not None:
+            self._plan_aux_nodes(plan, view_layer, data)
+        if data_output is not None:
+            self._plan_data_links(plan, view_layer, float_data, vector, data_output)
+        half_output = self._plan_half_data(plan, view_layer, half_data, vector, data_codec)
+        self._plan_vector_outputs(plan, view_layer, vector, data_output, half_output)
+
+        if crypto:
+            if settings.sep_crypto:
+                self._plan_crypto_output(plan, view_layer, crypto, strip_prefix=False)
+            else:
+                self._plan_crypto_links(plan, view_layer, crypto, data_output)
+
+    def _plan_all_in_one(self, plan, viewlayer_full, view_layer):
+        """Config 2: All passes in one file."""
+        settings = self.settings
+        color, data, crypto, vector = self._passes(viewlayer_full, view_layer)
+
+        slots = color + (sorting_data(data) if data else []) + crypto
+        output = self._output(
+            plan, view_layer, OUTPUT_SUFFIX_ALL, LABEL_SUFFIX_ALL, "All",
+            EXR_COLOR_DEPTH_DATA, EXR_CODEC_DEFAULT, slots,
+        ).name
+        self._plan_color(plan, view_layer, color, output)
+        if settings.use_deep and not is_data_layer(view_layer):
+            self._deep_output(plan, view_layer)
+        if data:
+            self._plan_aux_nodes(plan, view_layer, data)
+        for socket in crypto:
+            plan.link(view_layer, view_layer, socket, output, socket)
+        self._plan_data_links(plan, view_layer, data, vector, output)
+        self._plan_vectors(plan, view_layer, vector, output)
+
+    def _plan_adv_regular_layer(self, plan, viewlayer_full, view_layer):
+        """Advanced mode, regular layer: RGBA (and optional Cryptomatte)."""
+        settings = self.settings
+        color, _data, crypto, _vector = self._passes(viewlayer_full, view_layer)
+
+        self._plan_rgba(plan, view_layer, color, settings.rgba_codec)
+        if settings.use_deep:
+            self._deep_output(plan, view_layer)
+        if settings.adv_crypto and settings.sep_crypto and crypto:
+            self._plan_crypto_output(plan, view_layer, crypto, strip_prefix=True)
+
+    def _plan_adv_data_layer(self, plan, viewlayer_full, view_layer):
+        """Advanced mode, DATA/-_-exP_ layer: DATA (and optional Cryptomatte)."""
+        settings = self.settings
+        _color, data, crypto, vector = self._passes(viewlayer_full, view_layer)
+
+        float_data, half_data = self._split_precision(data)
+        data_output = None
+        if float_data or (crypto and not settings.sep_crypto):
+            slots = ["Image"] + sorting_data(float_data)
+            if not settings.sep_crypto:
+                slots += crypto
+            data_output = self._output(
+                plan, view_layer, OUTPUT_SUFFIX_DATA, LABEL_SUFFIX_DATA, "DATA",
+                EXR_COLOR_DEPTH_DATA, settings.data_codec, slots, strip_prefix=True,
+            ).name
+            plan.link(view_layer, view_layer, "Image", data_output, "Image")
+        if data or data_output is not None:
+            self._plan_aux_nodes(plan, view_layer, data)
+            self._plan_fake_deep_node(plan, view_layer, data)
+        if data_output is not None:
+            self._plan_data_links(plan, view_layer, float_data, vector, data_output, fake_deep=True)
+        half_output = self._plan_half_data(
+            plan, view_layer, half_data, vector, settings.data_codec, strip_prefix=True,
+        )
+        self._plan_vector_outputs(plan, view_layer, vector, data_output, half_output)
+
+        if crypto:
+            if not settings.sep_crypto:
+                self._plan_crypto_links(plan, view_layer, crypto, data_output)
+            elif not settings.adv_crypto:
+                self._plan_crypto_output(plan, view_layer, crypto, strip_prefix=True)
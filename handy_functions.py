@@ -9,16 +9,12 @@ import bpy
 from .constants import (
     DATA_LAYER_PREFIX,
     DATA_LAYER_SUFFIX,
-    AOV_CATEGORY_DEPTH,
-    AOV_CATEGORY_POSITION,
-    AOV_CATEGORY_NORMAL,
-    AOV_CATEGORY_UV,
-    AOV_CATEGORY_INDEX,
-    AOV_CATEGORY_DEBUG,
-    AOV_SUFFIX_EXCLUDE,
     NODE_SPACING_LEGACY,
     NODE_SPACING_BLENDER_5,
+    LAYOUT_NODE_ROWS,
+    LAYOUT_NODE_ROWS_BLENDER_5,
 )
+from .aov_index import collect_aov_names
 
 
 class BlenderCompat:
@@ -39,6 +35,7 @@ class BlenderCompat:
     addon_package: str = ""
     asset_path: str = ""
     node_spacing: int = NODE_SPACING_LEGACY
+    layout_node_rows: dict = LAYOUT_NODE_ROWS
     is_blender_5_plus: bool = False
     
     @classmethod
@@ -60,6 +57,7 @@ class BlenderCompat:
             cls.separate_xyz_node_id = "ShaderNodeSeparateXYZ"
             cls.combine_xyz_node_id = "ShaderNodeCombineXYZ"
             cls.node_spacing = NODE_SPACING_BLENDER_5
+            cls.layout_node_rows = LAYOUT_NODE_ROWS_BLENDER_5
         else:
             cls.diffuse_color_name = "DiffCol"
             cls.glossy_color_name = "GlossCol"
@@ -68,6 +66,7 @@ class BlenderCompat:
             cls.separate_xyz_node_id = "CompositorNodeSeparateXYZ"
             cls.combine_xyz_node_id = "CompositorNodeCombineXYZ"
             cls.node_spacing = NODE_SPACING_LEGACY
+            cls.layout_node_rows = LAYOUT_NODE_ROWS
         
         # 包名（来自根 __init__.py 的 __package__）
         cls.addon_package = package_name
@@ -148,6 +147,17 @@ class CompositorHelper:
         else:
             return node.base_path
     
+    @staticmethod
+    def get_slot_file_path(node, slot_name: str) -> str:
+        """获取非多层输出节点中某个槽位写出的文件路径（不含帧号和扩展名）
+
+        4.x 将 base_path 与槽位路径拼接为路径；5.0 将槽位名称接在文件名之后。
+        """
+        if bpy.app.version >= (5, 0, 0):
+            return os.path.join(node.directory, node.file_name + slot_name)
+        else:
+            return os.path.join(node.base_path, slot_name)
+
     @staticmethod
     def add_slot(node, name: str) -> None:
         """添加文件槽位"""
@@ -156,6 +166,15 @@ class CompositorHelper:
         else:
             node.file_slots.new(name)
     
+    @staticmethod
+    def remove_slot(node, index: int) -> None:
+        """移除文件槽位"""
+        if bpy.app.version >= (5, 0, 0):
+            node.file_output_items.remove(node.file_output_items[index])
+        else:
+            slots = node.layer_slots if hasattr(node, "layer_slots") else node.file_slots
+            slots.remove(node.inputs[index])
+
     @staticmethod
     def get_slots(node):
         """获取节点的文件槽位"""
@@ -179,12 +198,12 @@ class DataLayerHelper:
     """数据层相关的辅助功能"""
     
     @staticmethod
-    def auto_sample() -> dict:
+    def auto_sample(scene=None) -> dict:
         """自动设置数据层的采样数"""
         addon_prefs = bpy.context.preferences.addons[BlenderCompat.addon_package].preferences
         if addon_prefs.Auto_Data_Sample is True:
             viewlayers = []
-            for view_layer in bpy.context.scene.view_layers:
+            for view_layer in (scene or bpy.context.scene).view_layers:
                 viewlayers.append(view_layer)
             for viewlayer in viewlayers:
                 if (viewlayer.name[:len(DATA_LAYER_PREFIX)] == DATA_LAYER_PREFIX 
@@ -193,44 +212,56 @@ class DataLayerHelper:
         return {"FINISHED"}
     
     @staticmethod
-    def update_sample() -> dict:
+    def update_sample(viewlayer=None) -> dict:
         """更新当前数据层的采样数"""
         addon_prefs = bpy.context.preferences.addons[BlenderCompat.addon_package].preferences
         if addon_prefs.Auto_Data_Sample is True:
-            viewlayer = bpy.context.view_layer
+            viewlayer = viewlayer or bpy.context.view_layer
             if (viewlayer.name[:len(DATA_LAYER_PREFIX)] == DATA_LAYER_PREFIX 
                 and DATA_LAYER_SUFFIX in viewlayer.name):
                 viewlayer.samples = addon_prefs.Custom_Data_Sample
         return {"FINISHED"}
     
     @staticmethod
-    def auto_set_aov() -> dict:
-        """自动收集并设置材质AOV"""
-        aov_names = set()
-        for material in bpy.data.materials:
-            if material.use_nodes and material.node_tree:
-                for node in material.node_tree.nodes:
-                    if node.type == "OUTPUT_AOV":
-                        if (
-                            node.name != ""
-                            and not node.name.endswith(AOV_SUFFIX_EXCLUDE)
-                            and node.name != "Pref"
-                        ):
-                            aov_names.add(node.name)
+    def sync_view_layer_aovs(view_layers, aov_names) -> tuple:
+        """将视图层的AOV同步为 aov_names，只做最少的增删
+        
+        每个视图层先算出要删除和要添加的AOV，再一次性应用；已同步的视图层不做任何修改。
+        
+        Returns:
+            tuple: (added, removed) 添加和删除的AOV数量
+        """
+        wanted = set(aov_names)
+        added = removed = 0
+        for view_layer in view_layers:
+            aovs = view_layer.aovs
+            stale = [aov for aov in aovs if aov.name not in wanted]
+            missing = sorted(wanted.difference(aov.name for aov in aovs))
+            for aov in stale:
+                aovs.remove(aov)
+            for aov_name in missing:
+                new_aov = aovs.add()
+                new_aov.name = aov_name
+            added += len(missing)
+            removed += len(stale)
+        return added, removed
+    
+    @staticmethod
+    def auto_set_aov(scene=None) -> tuple:
+        """自动收集并设置材质AOV
         
-        real_aov_names = list(aov_names)
-        for view_layer in bpy.context.scene.view_layers:
+        材质中的 AOV 由 aov_index 缓存（含嵌套节点组），只有编辑过的材质会重新扫描。
+        
+        Returns:
+            tuple: (added, removed) 添加和删除的AOV数量
+        """
+        view_layers = [
+            view_layer
+            for view_layer in (scene or bpy.context.scene).view_layers
             if (view_layer.name[:len(DATA_LAYER_PREFIX)] != DATA_LAYER_PREFIX 
-                and DATA_LAYER_SUFFIX not in view_layer.name):
-                existing_aov_names = {aov.name for aov in view_layer.aovs}
-                for aov_name in existing_aov_names:
-                    if aov_name not in real_aov_names:
-                        view_layer.aovs.remove(view_layer.aovs[aov_name])
-                for aov_name in real_aov_names:
-                    if aov_name not in existing_aov_names:
-                        new_aov = view_layer.aovs.add()
-                        new_aov.name = aov_name
-        return {"FINISHED"}
+                and DATA_LAYER_SUFFIX not in view_layer.name)
+        ]
+        return DataLayerHelper.sync_view_layer_aovs(view_layers, collect_aov_names())
 
 
 # =============================================================================
@@ -247,16 +278,6 @@ def extract_string_between_patterns(input_string, start_pattern, end_pattern):
         return None
 
 
-def has_subfolder(folder) -> bool:
-    """判断文件夹内是否存在子文件夹"""
-    names = os.listdir(folder)
-    for name in names:
-        path = os.path.join(folder, name)
-        if os.path.isdir(path):
-            return True
-    return False
-
-
 def arrange_list(strings):
     """将以 DATA_LAYER_PREFIX 开头的字符串移到列表末尾"""
     matching_strings = [s for s in strings if s[:len(DATA_LAYER_PREFIX)] == DATA_LAYER_PREFIX]
@@ -265,41 +286,6 @@ def arrange_list(strings):
     return arranged_list
 
 
-def sorting_data(aov_list):
-    """按类型对AOV列表进行排序"""
-    aov_classes = {
-        "Depth and Z Buffers": [],
-        "Position and World Coordinates": [],
-        "Normal and Vector": [],
-        "UV Coordinates": [],
-        "Indexes": [],
-        "Debug and Denoising": [],
-        "others": [],
-    }
-    
-    for aov in aov_list:
-        if aov in AOV_CATEGORY_DEPTH:
-            aov_classes["Depth and Z Buffers"].append(aov)
-        elif aov in AOV_CATEGORY_POSITION:
-            aov_classes["Position and World Coordinates"].append(aov)
-        elif aov in AOV_CATEGORY_NORMAL:
-            aov_classes["Normal and Vector"].append(aov)
-        elif aov in AOV_CATEGORY_UV:
-            aov_classes["UV Coordinates"].append(aov)
-        elif aov in AOV_CATEGORY_INDEX:
-            aov_classes["Indexes"].append(aov)
-        elif aov in AOV_CATEGORY_DEBUG:
-            aov_classes["Debug and Denoising"].append(aov)
-        else:
-            aov_classes["others"].append(aov)
-    
-    arranged_aov_list = []
-    for category, items in aov_classes.items():
-        arranged_aov_list.extend(items)
-    
-    return arranged_aov_list
-
-
 # =============================================================================
 # Operator 类
 # =============================================================================
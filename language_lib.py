@@ -175,8 +175,8 @@ language_dict = {
         ): "整理由此插件生成的节点",
         (
             "*",
-            "Delete the folder called 'trash_output' which contains the default render of blender, safe to perform because valid output paths generated by the addon will always locate out of the 'trash_output' folder",
-        ): "删除包含默认渲染输出文件的“trash_output”文件夹，不会碰其他数据，安全可靠，插件自动生成的有效输出路径将永远位于“trash_output”以外",
+            "Delete the folder called 'trash_output' which contains the default render of blender, safe to perform because valid output paths generated by the addon will always locate out of the 'trash_output' folder. Runs in the background, press Esc to cancel",
+        ): "删除包含默认渲染输出文件的“trash_output”文件夹，不会碰其他数据，安全可靠，插件自动生成的有效输出路径将永远位于“trash_output”以外。在后台运行，按Esc取消",
         (
             "*",
             "All Outputs Updated",
@@ -227,8 +227,8 @@ language_dict = {
         ): "自动整理节点于生成时",
         (
             "*",
-            "Auto arrange nodes when generating node tree, only if the compositor is visible in UI. Be careful if your scene is very heavy",
-        ): "在生成节点树时自动排列，仅在合成器可见时有效。如果场景特别大请谨慎使用",
+            "Auto arrange nodes when generating node tree. Only view layers whose connector nodes changed are re-arranged, also in background mode",
+        ): "在生成节点树时自动排列。仅重新排列连接节点有变化的视图层，后台模式下同样有效",
         (
             "*",
             "Use A dedicated viewlayer only for data and cryptomatte, enable this will make plugin disable other viewlayers' data output",
@@ -345,7 +345,7 @@ language_dict = {
         ("*", "Antialias Depth & Position Material"): "抗锯齿depth & position材质",
         ("*", "Antialias Depth Addition:"): "抗锯齿depth附加:",
         ("*", 'Clear Nodes When Running "Cook Nodetree"'): '"烘焙节点树"时删除所有节点',
-        ("*", "Delete nodes that already in compositor"): "删除合成器中已经存在的节点",
+        ("*", "Delete nodes that already in compositor and were not generated by this addon. Generated nodes are always updated in place"): "删除合成器中已存在且非本插件生成的节点，插件生成的节点总是原地更新",
         ("*", "Show UI In Compositor N Panel"): "在合成器N面板显示UI",
         (
             "*",
@@ -480,6 +480,286 @@ language_dict["zh_CN"].update({
         "*",
         "Deep EXR output requires your custom Blender branch with DEEP_EXR compositor support",
     ): "Deep EXR输出需要你的自定义Blender分支（并支持DEEP_EXR合成器输出）",
+    (
+        "*",
+        "Last Cook Timing",
+    ): "上次生成耗时",
+    (
+        "*",
+        "Phase timing and node counts of the last Cook Nodetree or Update run",
+    ): "上次生成节点树或更新时各阶段的耗时与节点数量",
+    (
+        "*",
+        "Diagnostics:",
+    ): "诊断：",
+    (
+        "*",
+        "Log Cook Timings",
+    ): "记录生成耗时",
+    (
+        "*",
+        "Append the phase timing of every Cook Nodetree / Update run as a JSON line to the cook log file",
+    ): "每次生成节点树或更新时，将各阶段耗时以一行JSON追加到日志文件",
+    (
+        "*",
+        "Cook Log File",
+    ): "生成日志文件",
+    (
+        "*",
+        "JSON lines file the cook timings are appended to. // is relative to the blend file, unsaved files log to the temp folder",
+    ): "生成耗时追加写入的JSON Lines文件。// 表示相对blend文件，未保存的文件写入临时文件夹",
+    (
+        "Operator",
+        "Cook Selected Scenes",
+    ): "烘焙所选场景",
+    (
+        "*",
+        "make connector nodes in every scene ticked in the dialog, sharing one material AOV scan",
+    ): "为对话框中勾选的每个场景生成连接节点，共用一次材质AOV扫描",
+    (
+        "*",
+        "Cook With Selected Scenes",
+    ): "参与多场景烘焙",
+    (
+        "*",
+        "Include this scene when running Cook Selected Scenes",
+    ): "运行“烘焙所选场景”时包含此场景",
+    (
+        "*",
+        "No scene selected",
+    ): "未选择场景",
+    (
+        "*",
+        "Scenes cooked: {cooked}/{total}",
+    ): "已烘焙场景：{cooked}/{total}",
+    (
+        "*",
+        'Compositor is not enabled in scene "{scene}"',
+    ): '场景"{scene}"未启用合成器',
+    (
+        "*",
+        "Shader AOVs synced: {added} added, {removed} removed",
+    ): "着色器AOV已同步：添加 {added} 个，删除 {removed} 个",
+    (
+        "Operator",
+        "Export Render Manifest",
+    ): "导出渲染清单",
+    (
+        "*",
+        "write a JSON manifest of the file output nodes (paths, formats, layers, channels) for farm and QC tools",
+    ): "将文件输出节点信息（路径、格式、层、通道）写入JSON清单，供渲染农场和质检工具使用",
+    (
+        "*",
+        "Manifest with {count} outputs written to {path}",
+    ): "已写入包含 {count} 个输出的清单：{path}",
+    (
+        "Operator",
+        "Check Rendered Frames",
+    ): "检查已渲染帧",
+    (
+        "*",
+        "Find missing, empty and truncated frames of every connector output in the frame range, the frames to resubmit are copied to the clipboard",
+    ): "查找帧范围内各连接输出缺失、空白和截断的帧，需要重新提交的帧会复制到剪贴板",
+    (
+        "*",
+        "Verify Headers",
+    ): "校验文件头",
+    (
+        "*",
+        "Read the EXR header of every frame instead of only the suspiciously small ones",
+    ): "读取每一帧的EXR文件头，而不只是体积异常小的帧",
+    (
+        "*",
+        "All {count} outputs complete",
+    ): "全部 {count} 个输出完整",
+    (
+        "*",
+        "Frames to resubmit (copied): {frames}",
+    ): "需要重新提交的帧（已复制）：{frames}",
+    (
+        "*",
+        "Audit Channels",
+    ): "核对通道",
+    (
+        "*",
+        "Compare the channels of every rendered EXR with the slots of its output node",
+    ): "将每个已渲染EXR的通道与其输出节点的接口进行比对",
+    (
+        "*",
+        "{count} outputs do not match their slots, see the system console",
+    ): "{count} 个输出与其接口不一致，详见系统控制台",
+    (
+        "*",
+        "Deleted {count} files, {size} reclaimed",
+    ): "已删除 {count} 个文件，释放 {size}",
+    (
+        "*",
+        "{count} could not be deleted, see the system console",
+    ): "{count} 个无法删除，详见系统控制台",
+    (
+        "*",
+        "Deleting trash_output: {size} of {total} (Esc to cancel)",
+    ): "正在删除 trash_output：{size} / {total}（按Esc取消）",
+    (
+        "*",
+        "Chunk Size",
+    ): "分块帧数",
+    (
+        "*",
+        "Frames per render farm chunk, used by the $chunk$ path token",
+    ): "渲染农场每个分块的帧数，用于 $chunk$ 路径token",
+    (
+        "*",
+        "Restored {restored} paths, {missing} outputs removed and {added} added since prepare",
+    ): "已恢复 {restored} 个路径，预处理后删除了 {missing} 个输出、新增了 {added} 个输出",
+    (
+        "Operator",
+        "Benchmark EXR Codecs",
+    ): "EXR编码性能测试",
+    (
+        "*",
+        "Render a small test frame on CPU and measure write time, read time and file size of every EXR codec for RGBA, DATA and Cryptomatte outputs",
+    ): "用CPU渲染一张小测试帧，测量每种EXR编码在RGBA、DATA和Cryptomatte输出下的写入时间、读取时间和文件大小",
+    (
+        "*",
+        "Resolution %",
+    ): "分辨率 %",
+    (
+        "*",
+        "Render size of the test frame",
+    ): "测试帧的渲染尺寸",
+    (
+        "*",
+        "Cycles samples of the test frame, noisy frames compress differently from clean ones",
+    ): "测试帧的Cycles采样数，噪点多的画面与干净画面的压缩表现不同",
+    (
+        "*",
+        "Storage MB/s",
+    ): "存储速度 MB/s",
+    (
+        "*",
+        "Throughput of the render storage, the recommendation weighs file size by it",
+    ): "渲染存储的吞吐速度，推荐结果据此权衡文件大小",
+    (
+        "*",
+        "Use Existing Render",
+    ): "使用现有渲染结果",
+    (
+        "*",
+        "Measure the current Render Result instead of rendering a test frame",
+    ): "使用当前渲染结果测试，不再渲染测试帧",
+    (
+        "*",
+        "There is no render result",
+    ): "没有渲染结果",
+    (
+        "*",
+        "Recommended: RGBA {rgba}, DATA {data}, Cryptomatte {crypto}",
+    ): "推荐：RGBA {rgba}，DATA {data}，Cryptomatte {crypto}",
+    (
+        "Operator",
+        "Apply Recommended Codecs",
+    ): "应用推荐编码",
+    (
+        "*",
+        "Set the RGBA, DATA and Cryptomatte EXR codecs to the ones recommended by the last benchmark",
+    ): "将RGBA、DATA和Cryptomatte的EXR编码设为上次测试推荐的编码",
+    (
+        "*",
+        "Recommended codecs applied",
+    ): "已应用推荐编码",
+    (
+        "*",
+        "Codec Benchmark ({width}x{height}):",
+    ): "编码测试（{width}x{height}）：",
+    (
+        "*",
+        "Half Float DATA Split",
+    ): "拆分半精度DATA",
+    (
+        "*",
+        "Write Normal, UV and Vector into a second, half float DATA file per view layer. Position, Pref and Depth stay full float",
+    ): "将Normal、UV和Vector写入每个视图层的第二个半精度DATA文件，Position、Pref和Depth保持全精度",
+    (
+        "*",
+        "Split RGBA",
+    ): "拆分RGBA",
+    (
+        "*",
+        "Split RGBA:",
+    ): "拆分RGBA：",
+    (
+        "*",
+        "Write these pass groups into their own RGBA files, the main RGBA file keeps the beauty and the passes of the groups not selected",
+    ): "将这些通道组写入各自的RGBA文件，主RGBA文件保留beauty和未选中组的通道",
+    (
+        "*",
+        "Light Group Passes",
+    ): "灯光组通道",
+    (
+        "*",
+        "Light group passes (Combined_*)",
+    ): "灯光组通道（Combined_*）",
+    (
+        "*",
+        "Shading Passes",
+    ): "着色通道",
+    (
+        "*",
+        "Diffuse, glossy, transmission, volume, emission, environment and AO passes",
+    ): "漫射、光泽、透射、体积、自发光、环境和AO通道",
+    (
+        "*",
+        "Material AOV Passes",
+    ): "材质AOV通道",
+    (
+        "*",
+        "Color shader AOVs",
+    ): "颜色类型的着色器AOV",
+    (
+        "*",
+        "Same as RGBA",
+    ): "与RGBA相同",
+    (
+        "*",
+        "Use the RGBA codec",
+    ): "使用RGBA的编码",
+    (
+        "*",
+        "Denoise Policy",
+    ): "降噪策略",
+    (
+        "*",
+        "Denoise every pass with accurate prefilter and high quality",
+    ): "所有通道降噪，使用精确预过滤和高质量",
+    (
+        "*",
+        "Denoise lighting and light group passes with fast prefilter and quality, skip color, emission and environment passes",
+    ): "仅对光照和灯光组通道做快速降噪，跳过颜色、自发光和环境通道",
+    (
+        "*",
+        "No Denoise",
+    ): "不降噪",
+    (
+        "*",
+        "Mute every denoise node",
+    ): "禁用所有降噪节点",
+    (
+        "*",
+        "Shared Denoise Normal/Albedo",
+    ): "共享降噪法线/反照率",
+    (
+        "*",
+        "Denoise the normal and albedo passes once per view layer and feed them to every denoise node of the layer without prefiltering. Faster with many passes, results differ slightly from per-node prefiltering",
+    ): "每个视图层只对法线和反照率通道降噪一次，并接入该层所有降噪节点且不再预过滤。通道多时更快，结果与逐节点预过滤略有差异",
+    (
+        "*",
+        "Use Shared Vector Conversion Groups",
+    ): "使用共享的向量转换节点组",
+    (
+        "*",
+        "Convert Normal, Position and Vector passes for Nuke with one shared node group per conversion instead of separate nodes per pass. Keeps large node trees small and fast",
+    ): "用每种转换共享的一个节点组把Normal、Position和Vector通道转换为Nuke坐标，而不是每个通道单独的一组节点。让大型节点树保持精简、快速",
 })
 
 # Make zh_HANS reference the same dictionary as zh_CN
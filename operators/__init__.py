@@ -7,12 +7,17 @@ from .basic_ops import (
     IDS_OT_Turn_Denoise,
     IDS_OT_CloudMode,
     IDS_OT_Delete_Trash,
+    IDS_OT_Scan_Outputs,
+    IDS_OT_Benchmark_Codecs,
+    IDS_OT_Apply_Codec_Recommendation,
     IDS_OT_Set_Material_AOV,
 )
 from .tree_ops import (
     IDS_OT_Make_Tree,
+    IDS_OT_Make_Tree_Scenes,
     IDS_OT_Update_Tree,
     IDS_OT_Arr_Tree,
+    IDS_OT_Export_Manifest,
 )
 from .data_layer_ops import (
     IDS_OT_Make_DatalayerNew,
@@ -29,11 +34,16 @@ __all__ = [
     "IDS_OT_Turn_Denoise",
     "IDS_OT_CloudMode",
     "IDS_OT_Delete_Trash",
+    "IDS_OT_Scan_Outputs",
+    "IDS_OT_Benchmark_Codecs",
+    "IDS_OT_Apply_Codec_Recommendation",
     "IDS_OT_Set_Material_AOV",
     # Tree operators
     "IDS_OT_Make_Tree",
+    "IDS_OT_Make_Tree_Scenes",
     "IDS_OT_Update_Tree",
     "IDS_OT_Arr_Tree",
+    "IDS_OT_Export_Manifest",
     # Data layer operators
     "IDS_OT_Make_DatalayerNew",
     "IDS_OT_Make_DatalayerCopy",
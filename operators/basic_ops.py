@@ -3,17 +3,20 @@
 """Basic operators for Industrial AOV Connector."""
 
 import bpy
+import json
 import os
-import shutil
 
 from ..handy_functions import (
     BlenderCompat,
     CompositorHelper,
     DataLayerHelper,
-    has_subfolder,
 )
 from ..renderpath_preset import TokenReplacer
 from ..constants import TRASH_OUTPUT_FOLDER
+from ..core.manifest import build_manifest
+from ..core.output_scan import OutputScanner, compact_ranges
+from ..core.codec_bench import CODEC_PROPERTIES, CodecBenchmark, load_report
+from ..core.trash_cleanup import TrashCleaner, TrashFolderError, format_bytes, scan_trash
 
 
 
@@ -51,11 +54,23 @@ class IDS_OT_CloudMode(bpy.types.Operator):
     def execute(self, context):
         replacer = TokenReplacer()
         if context.scene.IDS_CloudModeActive:
-            replacer.restore()
+            result = replacer.restore()
             context.scene.IDS_CloudModeActive = False
-            self.report(
-                {"INFO"}, bpy.app.translations.pgettext("Restored all naming presets")
-            )
+            if result["missing"] or result["added"]:
+                self.report(
+                    {"WARNING"},
+                    bpy.app.translations.pgettext(
+                        "Restored {restored} paths, {missing} outputs removed and {added} added since prepare"
+                    ).format(
+                        restored=result["restored"],
+                        missing=len(result["missing"]),
+                        added=len(result["added"]),
+                    ),
+                )
+            else:
+                self.report(
+                    {"INFO"}, bpy.app.translations.pgettext("Restored all naming presets")
+                )
         else:
             replacer.replace()
             context.scene.IDS_CloudModeActive = True
@@ -69,7 +84,7 @@ class IDS_OT_CloudMode(bpy.types.Operator):
 class IDS_OT_Delete_Trash(bpy.types.Operator):
     bl_idname = "render.delete_trashoutput"
     bl_label = "Delete Useless Default Renders"
-    bl_description = "Delete the folder called 'trash_output' which contains the default render of blender, safe to perform because valid output paths generated by the addon will always locate out of the 'trash_output' folder"
+    bl_description = "Delete the folder called 'trash_output' which contains the default render of blender, safe to perform because valid output paths generated by the addon will always locate out of the 'trash_output' folder. Runs in the background, press Esc to cancel"
     bl_options = {"REGISTER"}
 
     @classmethod
@@ -79,31 +94,255 @@ class IDS_OT_Delete_Trash(bpy.types.Operator):
 
         return addon_prefs.Show_QuickDel
 
-    def execute(self, context):
-        current_render_path = bpy.context.scene.render.filepath
-        trash_folder_pattern = f"{TRASH_OUTPUT_FOLDER}\\\\"
+    _timer = None
+    _cleaner = None
+
+    @staticmethod
+    def _trash_folder(scene):
+        """The render folder if it is a trash_output folder, else None."""
+        current_render_path = bpy.path.abspath(scene.render.filepath)
+        trash_folder_pattern = f"{TRASH_OUTPUT_FOLDER}/"
         if (
-            trash_folder_pattern in current_render_path
-            and os.path.exists(current_render_path)
-            and has_subfolder(current_render_path) is False
-        ):
-            shutil.rmtree(current_render_path)
-            self.report({"INFO"}, bpy.app.translations.pgettext("Deleted"))
-        elif (
-            trash_folder_pattern in current_render_path
-            and os.path.exists(current_render_path)
-            and has_subfolder(current_render_path) is True
+            trash_folder_pattern in current_render_path.replace("\\", "/")
+            and os.path.isdir(current_render_path)
         ):
+            return current_render_path
+        return None
+
+    def _start(self, context):
+        """Scan the trash folder and start the worker, None if nothing to do."""
+        folder = self._trash_folder(context.scene)
+        if folder is None:
+            self.report(
+                {"INFO"},
+                bpy.app.translations.pgettext("There is no trash_output folder"),
+            )
+            return None
+        try:
+            listing = scan_trash(folder)
+        except TrashFolderError:
             self.report(
                 {"WARNING"},
                 "Danger file detected, interrupted",
             )
+            return None
+        except OSError as e:
+            self.report({"ERROR"}, str(e))
+            return None
+        self._cleaner = TrashCleaner(listing)
+        self._cleaner.start()
+        return self._cleaner
+
+    def _finish(self, context):
+        cleaner = self._cleaner
+        message = bpy.app.translations.pgettext(
+            "Deleted {count} files, {size} reclaimed"
+        ).format(count=cleaner.deleted_files, size=format_bytes(cleaner.deleted_bytes))
+        if cleaner.errors:
+            for error in cleaner.errors:
+                print(f"[IAC] {error}")
+            self.report({"WARNING"}, message + ", " + bpy.app.translations.pgettext(
+                "{count} could not be deleted, see the system console"
+            ).format(count=len(cleaner.errors)))
+        elif cleaner.cancelled:
+            self.report({"WARNING"}, bpy.app.translations.pgettext("Cancelled") + ": " + message)
         else:
+            self.report({"INFO"}, message)
+
+    def execute(self, context):
+        # Scripts and background mode wait for the worker
+        if self._start(context) is None:
+            return {"FINISHED"}
+        self._cleaner.wait()
+        self._finish(context)
+        return {"FINISHED"}
+
+    def invoke(self, context, event):
+        if self._start(context) is None:
+            return {"FINISHED"}
+        wm = context.window_manager
+        wm.progress_begin(0, 100)
+        self._timer = wm.event_timer_add(0.2, window=context.window)
+        wm.modal_handler_add(self)
+        return {"RUNNING_MODAL"}
+
+    def modal(self, context, event):
+        cleaner = self._cleaner
+        if event.type == "ESC":
+            cleaner.cancel()
+        if event.type == "TIMER" or cleaner.cancelled:
+            context.window_manager.progress_update(int(cleaner.progress * 100))
+            workspace = getattr(context, "workspace", None)
+            if workspace is not None:
+                workspace.status_text_set(
+                    bpy.app.translations.pgettext("Deleting trash_output: {size} of {total} (Esc to cancel)").format(
+                        size=format_bytes(cleaner.deleted_bytes),
+                        total=format_bytes(cleaner.listing.total_bytes),
+                    )
+                )
+        if not cleaner.done:
+            return {"PASS_THROUGH"}
+
+        wm = context.window_manager
+        wm.event_timer_remove(self._timer)
+        wm.progress_end()
+        workspace = getattr(context, "workspace", None)
+        if workspace is not None:
+            workspace.status_text_set(None)
+        self._finish(context)
+        return {"FINISHED"}
+
+
+class IDS_OT_Scan_Outputs(bpy.types.Operator):
+    bl_idname = "render.scan_outputs"
+    bl_label = "Check Rendered Frames"
+    bl_description = "Find missing, empty and truncated frames of every connector output in the frame range, the frames to resubmit are copied to the clipboard"
+    bl_options = {"REGISTER"}
+
+    verify_headers: bpy.props.BoolProperty(
+        name="Verify Headers",
+        description="Read the EXR header of every frame instead of only the suspiciously small ones",
+        default=False,
+    )
+    audit_channels: bpy.props.BoolProperty(
+        name="Audit Channels",
+        description="Compare the channels of every rendered EXR with the slots of its output node",
+        default=False,
+    )
+
+    def execute(self, context):
+        scene = context.scene
+        outputs = [o for o in build_manifest(scene)["outputs"] if not o["mute"]]
+        frames = range(scene.frame_start, scene.frame_end + 1, scene.frame_step)
+        scanner = OutputScanner(verify_headers=self.verify_headers)
+        reports = scanner.scan(outputs, frames, scene.frame_step)
+
+        if self.audit_channels:
+            mismatched = 0
+            for audit in scanner.audit(outputs, frames, scene.frame_step):
+                if audit["ok"]:
+                    continue
+                mismatched += 1
+                print(
+                    f"[IAC] {audit['node']}: channel mismatch in frames {audit['layout_frames']}, "
+                    f"missing {audit['missing_channels']}, unexpected {audit['unexpected_channels']}, "
+                    f"wrong type {audit['wrong_type_channels']}"
+                )
+            if mismatched:
+                self.report(
+                    {"WARNING"},
+                    bpy.app.translations.pgettext(
+                        "{count} outputs do not match their slots, see the system console"
+                    ).format(count=mismatched),
+                )
+
+        bad = set()
+        for report in reports:
+            if not report["ok"]:
+                label = report["node"] if report.get("slot") is None else f"{report['node']} [{report['slot']}]"
+                print(f"[IAC] {label}: resubmit {report['resubmit']}")
+                bad.update(report["missing"], report["empty"], report["truncated"], report["corrupt"])
+        if not bad:
             self.report(
                 {"INFO"},
-                bpy.app.translations.pgettext("There is no trash_output folder"),
+                bpy.app.translations.pgettext("All {count} outputs complete").format(count=len(reports)),
             )
+            return {"FINISHED"}
+
+        resubmit = compact_ranges(bad, scene.frame_step)
+        context.window_manager.clipboard = resubmit
+        self.report(
+            {"WARNING"},
+            bpy.app.translations.pgettext("Frames to resubmit (copied): {frames}").format(frames=resubmit),
+        )
+        return {"FINISHED"}
 
+
+class IDS_OT_Benchmark_Codecs(bpy.types.Operator):
+    bl_idname = "render.benchmark_exr_codecs"
+    bl_label = "Benchmark EXR Codecs"
+    bl_description = "Render a small test frame on CPU and measure write time, read time and file size of every EXR codec for RGBA, DATA and Cryptomatte outputs"
+    bl_options = {"REGISTER"}
+
+    resolution_percentage: bpy.props.IntProperty(
+        name="Resolution %",
+        description="Render size of the test frame",
+        default=25,
+        min=1,
+        max=100,
+        subtype="PERCENTAGE",
+    )
+    samples: bpy.props.IntProperty(
+        name="Samples",
+        description="Cycles samples of the test frame, noisy frames compress differently from clean ones",
+        default=16,
+        min=1,
+    )
+    storage_speed: bpy.props.FloatProperty(
+        name="Storage MB/s",
+        description="Throughput of the render storage, the recommendation weighs file size by it",
+        default=125.0,
+        min=1.0,
+    )
+    use_existing_render: bpy.props.BoolProperty(
+        name="Use Existing Render",
+        description="Measure the current Render Result instead of rendering a test frame",
+        default=False,
+    )
+
+    def invoke(self, context, event):
+        return context.window_manager.invoke_props_dialog(self)
+
+    def execute(self, context):
+        scene = context.scene
+        benchmark = CodecBenchmark(
+            scene, self.resolution_percentage, self.samples,
+            storage_mb_per_s=self.storage_speed,
+        )
+        result = None
+        if self.use_existing_render:
+            result = bpy.data.images.get("Render Result")
+            if result is None or not result.has_data:
+                self.report({"ERROR"}, bpy.app.translations.pgettext("There is no render result"))
+                return {"CANCELLED"}
+        try:
+            report = benchmark.run(result)
+        except (RuntimeError, OSError) as e:
+            self.report({"ERROR"}, str(e))
+            return {"CANCELLED"}
+        scene.IDS_CodecBenchReport = json.dumps(report)
+
+        for row in report["results"]:
+            print(
+                f"[IAC] {row['output_type']:6s} {row['codec']:6s} {row['depth']}bit {row['bytes'] / 1024:10.1f} KB "
+                f"write {row['write_ms']:8.2f} ms  read {row['read_ms']:8.2f} ms"
+            )
+        recommended = report["recommended"]
+        self.report(
+            {"INFO"},
+            bpy.app.translations.pgettext("Recommended: RGBA {rgba}, DATA {data}, Cryptomatte {crypto}").format(
+                rgba=recommended["RGBA"], data=recommended["DATA"], crypto=recommended["CRYPTO"]
+            ),
+        )
+        return {"FINISHED"}
+
+
+class IDS_OT_Apply_Codec_Recommendation(bpy.types.Operator):
+    bl_idname = "render.apply_codec_recommendation"
+    bl_label = "Apply Recommended Codecs"
+    bl_description = "Set the RGBA, DATA and Cryptomatte EXR codecs to the ones recommended by the last benchmark"
+    bl_options = {"REGISTER", "UNDO"}
+
+    @classmethod
+    def poll(cls, context):
+        return load_report(context.scene) is not None
+
+    def execute(self, context):
+        scene = context.scene
+        for output_type, codec in load_report(scene)["recommended"].items():
+            if codec:
+                setattr(scene, CODEC_PROPERTIES[output_type], codec)
+        self.report({"INFO"}, bpy.app.translations.pgettext("Recommended codecs applied"))
         return {"FINISHED"}
 
 
@@ -114,6 +353,12 @@ class IDS_OT_Set_Material_AOV(bpy.types.Operator):
     bl_options = {"REGISTER", "UNDO"}
 
     def execute(self, context):
-        DataLayerHelper.auto_set_aov()
+        added, removed = DataLayerHelper.auto_set_aov(context.scene)
+        self.report(
+            {"INFO"},
+            bpy.app.translations.pgettext("Shader AOVs synced: {added} added, {removed} removed").format(
+                added=added, removed=removed
+            ),
+        )
 
         return {"FINISHED"}
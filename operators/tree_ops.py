@@ -2,11 +2,16 @@
 # Copyright (C) Roland Vyens
 """Tree building operators for Industrial AOV Connector."""
 
+import os
+import tempfile
+
 import bpy
 
-from ..handy_functions import DataLayerHelper, BlenderCompat, CompositorHelper
-from ..path_modify_v2 import PathManager
-from ..core.node_builder import NodeConnector, NodeArranger
+from ..handy_functions import BlenderCompat, CompositorHelper
+from ..core.node_builder import NodeArranger
+from ..core.cook import CookSession, cook_scene, cook_scenes
+from ..core.manifest import default_manifest_path, write_manifest
+from ..core.profiling import CookProfiler
 
 
 def _validate_deep_exr_support(operator, scene) -> bool:
@@ -22,6 +27,44 @@ def _validate_deep_exr_support(operator, scene) -> bool:
     return True
 
 
+def _cook_log_path(addon_prefs) -> str:
+    """Resolve the cook log path, falling back to the temp dir for unsaved files."""
+    path = addon_prefs.Cook_Log_Path or "//iac_cook_log.jsonl"
+    if path.startswith("//") and not bpy.data.filepath:
+        return os.path.join(tempfile.gettempdir(), path[2:])
+    return bpy.path.abspath(path)
+
+
+def _store_profile(operator, scene, profiler, addon_prefs=None) -> str:
+    """Store the phase summary on the scene, log it and return it."""
+    summary = profiler.summary()
+    scene.IDS_LastCookReport = summary
+    if addon_prefs is None:
+        preferences = bpy.context.preferences
+        addon_prefs = preferences.addons[BlenderCompat.addon_package].preferences
+    if addon_prefs.Log_Cook_Timings is True:
+        path = _cook_log_path(addon_prefs)
+        try:
+            profiler.append_log(
+                path,
+                scene=scene.name,
+                blend=bpy.data.filepath,
+                blender=bpy.app.version_string,
+                view_layers=len(scene.view_layers),
+            )
+        except OSError as e:
+            operator.report({"WARNING"}, f"Cook log not written: {e}")
+    return summary
+
+
+def _report_profile(operator, scene, profiler, message) -> None:
+    """Store the phase summary on the scene, log it and report it."""
+    summary = _store_profile(operator, scene, profiler)
+    operator.report(
+        {"INFO"}, f"{bpy.app.translations.pgettext(message)} ({summary})"
+    )
+
+
 class IDS_OT_Make_Tree(bpy.types.Operator):
     bl_idname = "compositor.make_tree"
     bl_label = "Cook Nodetree"
@@ -32,22 +75,9 @@ class IDS_OT_Make_Tree(bpy.types.Operator):
         if not _validate_deep_exr_support(self, context.scene):
             return {"CANCELLED"}
 
-        connector = NodeConnector()
-        arranger = NodeArranger()
-        
-        if (
-            bpy.context.scene.IDS_AdvMode is True
-            and bpy.context.scene.IDS_UseDATALayer is True
-        ):
-            connector.connect_all_adv()
-            DataLayerHelper.auto_sample()
-        else:
-            connector.connect_all()
-        
-        arranger.arrange_all()
-        arranger.rename_outputs()
-        PathManager().move_to_trash_output()
-        self.report({"INFO"}, bpy.app.translations.pgettext("All Outputs Updated"))
+        profiler = CookProfiler(CompositorHelper.get_node_tree(context.scene), "cook")
+        cook_scene(context.scene, profiler=profiler)
+        _report_profile(self, context.scene, profiler, "All Outputs Updated")
 
         return {"FINISHED"}
 
@@ -62,25 +92,88 @@ class IDS_OT_Update_Tree(bpy.types.Operator):
         if not _validate_deep_exr_support(self, context.scene):
             return {"CANCELLED"}
 
-        connector = NodeConnector()
-        arranger = NodeArranger()
-        
-        if (
-            bpy.context.scene.IDS_AdvMode is True
-            and bpy.context.scene.IDS_UseDATALayer is True
-        ):
-            connector.connect_current_adv()
-            DataLayerHelper.update_sample()
-        else:
-            connector.connect_current()
-        
-        arranger.arrange_all()
-        arranger.rename_outputs()
-        PathManager().move_to_trash_output()
+        profiler = CookProfiler(CompositorHelper.get_node_tree(context.scene), "update")
+        cook_scene(context.scene, context.view_layer.name, profiler)
+        _report_profile(self, context.scene, profiler, "Viewlayer Outputs Updated")
+
+        return {"FINISHED"}
+
+
+class IDS_OT_Make_Tree_Scenes(bpy.types.Operator):
+    bl_idname = "compositor.make_tree_scenes"
+    bl_label = "Cook Selected Scenes"
+    bl_description = "make connector nodes in every scene ticked in the dialog, sharing one material AOV scan"
+    bl_options = {"REGISTER", "UNDO"}
+
+    def invoke(self, context, event):
+        if not any(scene.IDS_CookInBatch for scene in bpy.data.scenes):
+            context.scene.IDS_CookInBatch = True
+        return context.window_manager.invoke_props_dialog(self)
+
+    def draw(self, context):
+        col = self.layout.column(align=True)
+        for scene in bpy.data.scenes:
+            col.prop(scene, "IDS_CookInBatch", text=scene.name)
+
+    def execute(self, context):
+        scenes = [scene for scene in bpy.data.scenes if scene.IDS_CookInBatch]
+        if not scenes:
+            self.report({"WARNING"}, bpy.app.translations.pgettext("No scene selected"))
+            return {"CANCELLED"}
+
+        session = CookSession()
+        results = cook_scenes(
+            scenes,
+            lambda scene: CookProfiler(CompositorHelper.get_node_tree(scene), "cook"),
+            session,
+        )
+        cooked = 0
+        for scene, profiler, error in results:
+            if error is not None:
+                self.report({"WARNING"}, f"{scene.name}: {error}")
+                continue
+            _store_profile(self, scene, profiler, session.addon_prefs)
+            cooked += 1
+
         self.report(
-            {"INFO"}, bpy.app.translations.pgettext("Viewlayer Outputs Updated")
+            {"INFO"},
+            bpy.app.translations.pgettext("Scenes cooked: {cooked}/{total}").format(
+                cooked=cooked, total=len(scenes)
+            ),
         )
+        return {"FINISHED"}
+
+
+class IDS_OT_Export_Manifest(bpy.types.Operator):
+    bl_idname = "compositor.export_manifest"
+    bl_label = "Export Render Manifest"
+    bl_description = "write a JSON manifest of the file output nodes (paths, formats, layers, channels) for farm and QC tools"
+    bl_options = {"REGISTER"}
+
+    filepath: bpy.props.StringProperty(subtype="FILE_PATH")
+    filter_glob: bpy.props.StringProperty(default="*.json", options={"HIDDEN"})
+
+    def invoke(self, context, event):
+        if not self.filepath:
+            self.filepath = default_manifest_path(context.scene)
+        context.window_manager.fileselect_add(self)
+        return {"RUNNING_MODAL"}
 
+    def execute(self, context):
+        path = bpy.path.ensure_ext(
+            bpy.path.abspath(self.filepath or default_manifest_path(context.scene)), ".json"
+        )
+        try:
+            manifest = write_manifest(context.scene, path)
+        except OSError as e:
+            self.report({"ERROR"}, f"Manifest not written: {e}")
+            return {"CANCELLED"}
+        self.report(
+            {"INFO"},
+            bpy.app.translations.pgettext("Manifest with {count} outputs written to {path}").format(
+                count=len(manifest["outputs"]), path=path
+            ),
+        )
         return {"FINISHED"}
 
 
@@ -92,18 +185,7 @@ class IDS_OT_Arr_Tree(bpy.types.Operator):
 
     def execute(self, context):
         arranger = NodeArranger()
-        
-        arranger.frame_data_layers()
-        arranger.arrange_viewlayers()
-        arranger.arrange_denoise()
-        arranger.arrange_outputs()
-        arranger.arrange_math()
-        
-        # Horizontal DATA arrangement if enabled
-        preferences = bpy.context.preferences
-        addon_prefs = preferences.addons[BlenderCompat.addon_package].preferences
-        if addon_prefs.Horizontal_DATA_Arrange and bpy.context.scene.IDS_AdvMode:
-            arranger.arrange_data_horizontal()
+        arranger.arrange()
         
         self.report({"INFO"}, bpy.app.translations.pgettext("Arrange finished"))
 
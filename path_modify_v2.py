@@ -15,6 +15,30 @@ from .constants import (
 from .handy_functions import BlenderCompat
 
 
+def compose_final_path(
+    root: str, view_layer: str, output_type: str, use_subfolder: bool, suffix: str
+) -> str:
+    """拼接最终输出路径（纯函数，不访问 bpy）
+    
+    Args:
+        root: 移除 trash_output 后的渲染输出目录
+        view_layer: 视图层名称
+        output_type: 输出类型（如 "RGBA", "DATA", "Cryptomatte"）
+        use_subfolder: 是否按视图层/输出类型写入子文件夹
+        suffix: 自定义文件名后缀
+    
+    Returns:
+        str: 完整的输出路径
+    """
+    if use_subfolder:
+        base_path = os.path.join(
+            root, f"{view_layer}", f"{output_type}", f"{view_layer}_{output_type}_"
+        )
+    else:
+        base_path = os.path.join(root, f"{view_layer}_{output_type}_")
+    return base_path + suffix
+
+
 class PathManager:
     """管理渲染输出路径的创建和修改"""
     
@@ -94,13 +118,10 @@ class PathManager:
         """
         addon_prefs = bpy.context.preferences.addons[BlenderCompat.addon_package].preferences
         
-        if self.scene.IDS_FileloC is True:
-            current_render_path = self.get_single_folder_path()
-            base_path = os.path.join(
-                current_render_path, f"{view_layer}", f"{output_type}", f"{view_layer}_{output_type}_"
-            )
-        else:
-            base_path = os.path.join(self.get_single_folder_path(), f"{view_layer}_{output_type}_")
-        
-        final_path = base_path + addon_prefs.Custom_Suffix
-        return final_path
+        return compose_final_path(
+            self.get_single_folder_path(),
+            view_layer,
+            output_type,
+            self.scene.IDS_FileloC is True,
+            addon_prefs.Custom_Suffix,
+        )
@@ -8,11 +8,80 @@
 """
 
 import bpy
+import json
 import os
+import re
 from bpy.app.handlers import persistent
 
 from .handy_functions import CompositorHelper
 
+# 匹配 $name$ 形式的 token
+_TOKEN_PATTERN = re.compile(r"\$[A-Za-z]+\$")
+
+# 随帧变化的 token，只有包含这些 token 的节点需要在换帧时更新
+FRAME_TOKENS = ("$frame$", "$chunk$")
+
+# 已编译模板缓存：{原始路径: TokenTemplate}
+_TEMPLATES = {}
+
+# 场景级路径快照格式版本
+SNAPSHOT_VERSION = 1
+
+# 需要逐帧更新的节点：{场景指针: (静态 token 值, [(节点名称, 模板)])}
+_FRAME_NODES = {}
+
+
+class TokenTemplate:
+    """编译后的路径模板：文本片段与 token 交替排列，替换时只需一次拼接"""
+
+    __slots__ = ("parts", "tokens", "frame_dependent")
+
+    def __init__(self, path: str):
+        self.parts = []
+        self.tokens = set()
+        pos = 0
+        for match in _TOKEN_PATTERN.finditer(path):
+            self.parts.append((False, path[pos:match.start()]))
+            self.parts.append((True, match.group()))
+            self.tokens.add(match.group())
+            pos = match.end()
+        self.parts.append((False, path[pos:]))
+        self.frame_dependent = any(token in self.tokens for token in FRAME_TOKENS)
+
+    @property
+    def has_tokens(self) -> bool:
+        return bool(self.tokens)
+
+    def render(self, values: dict) -> str:
+        """用 token 值填充模板，未知 token 保持原样"""
+        return "".join(
+            values.get(text, text) if is_token else text
+            for is_token, text in self.parts
+        )
+
+
+def compile_template(path: str) -> TokenTemplate:
+    """编译路径模板，相同路径只编译一次"""
+    template = _TEMPLATES.get(path)
+    if template is None:
+        template = _TEMPLATES[path] = TokenTemplate(path)
+    return template
+
+
+def frame_token_values(scene, frame=None) -> dict:
+    """获取随帧变化的 token 值
+
+    - $frame$: 当前帧，补零到4位
+    - $chunk$: 当前帧所在的分块序号（从 frame_start 起每 IDS_TokenChunkSize 帧一块），补零到3位
+    """
+    frame = scene.frame_current if frame is None else frame
+    chunk_size = max(1, getattr(scene, "IDS_TokenChunkSize", 1))
+    chunk = max(0, frame - scene.frame_start) // chunk_size
+    return {
+        "$frame$": str(frame).zfill(4),
+        "$chunk$": str(chunk).zfill(3),
+    }
+
 
 class TokenReplacer:
     """管理渲染路径中的token替换和恢复
@@ -23,12 +92,16 @@ class TokenReplacer:
     - $viewlayer$: 当前视图层名称
     - $camera$: 相机名称（无相机时为 "NoCamera"）
     - $version$: 文件名最后4个字符（用于版本号如 v001）
+    - $frame$: 当前帧（换帧时更新）
+    - $chunk$: 当前帧的分块序号（换帧时更新）
     
     示例路径: //RENDER/$scene$/$file$/$viewlayer$/$camera$
     """
     
-    # 原始路径存储的自定义属性键
+    # 旧版本在每个节点上保存原始路径的自定义属性键，仅用于兼容读取
     ORIGINAL_PATH_KEY = "IDS_original_path"
+    # 场景级路径快照属性：{"version", "paths": {节点名: 原始路径}, "nodes": [替换时的全部输出节点]}
+    SNAPSHOT_PROP = "IDS_PathSnapshot"
     
     def __init__(self, scene=None):
         """初始化 TokenReplacer
@@ -39,7 +112,7 @@ class TokenReplacer:
         self.scene = scene or bpy.context.scene
     
     def _get_tokens(self) -> dict:
-        """获取当前上下文的token值"""
+        """获取当前上下文的静态token值"""
         return {
             "$scene$": self.scene.name,
             "$file$": os.path.basename(bpy.data.filepath).split(".")[0],
@@ -54,43 +127,132 @@ class TokenReplacer:
     
     def _apply_tokens(self, path: str, tokens: dict) -> str:
         """将token替换为实际值"""
-        result = path
-        for token, value in tokens.items():
-            result = result.replace(token, value)
-        return result
+        return compile_template(path).render(tokens)
+    
+    def _load_snapshot(self) -> dict:
+        """读取场景级路径快照，不存在或版本不符时返回空快照"""
+        text = getattr(self.scene, self.SNAPSHOT_PROP, "")
+        if text:
+            try:
+                snapshot = json.loads(text)
+            except ValueError:
+                snapshot = None
+            if isinstance(snapshot, dict) and snapshot.get("version") == SNAPSHOT_VERSION:
+                return snapshot
+        return {"version": SNAPSHOT_VERSION, "paths": {}, "nodes": []}
+    
+    def _save_snapshot(self, snapshot) -> None:
+        """写入快照；没有替换任何路径时清空属性"""
+        text = json.dumps(snapshot, separators=(",", ":")) if snapshot["paths"] else ""
+        if getattr(self.scene, self.SNAPSHOT_PROP, "") != text:
+            setattr(self.scene, self.SNAPSHOT_PROP, text)
     
     def replace(self) -> None:
-        """替换所有输出文件节点路径中的token"""
+        """替换所有输出文件节点路径中的token
+
+        原始路径记录在场景级快照中；已替换过的节点从快照中的原始路径重新替换。
+        不含 token 的节点直接跳过；含 $frame$/$chunk$ 的节点登记到逐帧更新列表。
+        """
         if not CompositorHelper.is_enabled(self.scene):
             return
         
-        tokens = self._get_tokens()
         node_tree = CompositorHelper.get_node_tree(self.scene)
+        snapshot = self._load_snapshot()
+        originals = snapshot["paths"]
+        paths = {}
+        nodes = []
+        tokens = None
+        frame_nodes = []
         
         for node in node_tree.nodes:
-            if node.type == "OUTPUT_FILE":
+            if node.type != "OUTPUT_FILE":
+                continue
+            nodes.append(node.name)
+            original_path = originals.get(node.name)
+            # 兼容旧版本：原始路径保存在节点自定义属性中
+            if self.ORIGINAL_PATH_KEY in node:
+                if original_path is None:
+                    original_path = node[self.ORIGINAL_PATH_KEY]
+                del node[self.ORIGINAL_PATH_KEY]
+            if original_path is None:
                 original_path = CompositorHelper.get_output_path(node)
-                
-                # 仅在未存储时保存原始路径（防止重复处理）
-                if self.ORIGINAL_PATH_KEY not in node:
-                    node[self.ORIGINAL_PATH_KEY] = original_path
-                
-                new_path = self._apply_tokens(original_path, tokens)
+            template = compile_template(original_path)
+            if not template.has_tokens:
+                continue
+            if tokens is None:
+                tokens = self._get_tokens()
+                tokens.update(frame_token_values(self.scene))
+            
+            paths[node.name] = original_path
+            new_path = template.render(tokens)
+            CompositorHelper.set_output_path(node, new_path)
+            if template.frame_dependent:
+                frame_nodes.append((node.name, template))
+            print(new_path)
+        
+        self._save_snapshot({"version": SNAPSHOT_VERSION, "paths": paths, "nodes": nodes})
+        if frame_nodes:
+            _FRAME_NODES[self.scene.as_pointer()] = (tokens, frame_nodes)
+        else:
+            _FRAME_NODES.pop(self.scene.as_pointer(), None)
+    
+    def update_frame(self, frame=None) -> None:
+        """只更新模板依赖帧号的节点路径"""
+        entry = _FRAME_NODES.get(self.scene.as_pointer())
+        if entry is None:
+            return
+        tokens, frame_nodes = entry
+        tokens.update(frame_token_values(self.scene, frame))
+        node_tree = CompositorHelper.get_node_tree(self.scene)
+        if node_tree is None:
+            return
+        for name, template in frame_nodes:
+            node = node_tree.nodes.get(name)
+            if node is None:
+                continue
+            new_path = template.render(tokens)
+            if CompositorHelper.get_output_path(node) != new_path:
                 CompositorHelper.set_output_path(node, new_path)
-                print(new_path)
     
-    def restore(self) -> None:
-        """从自定义属性恢复原始路径"""
+    def restore(self) -> dict:
+        """一次遍历从场景级快照恢复原始路径
+
+        Returns:
+            dict: {"restored": 恢复的节点数, "added": 快照之后新增的输出节点,
+            "missing": 快照之后被删除的节点}
+        """
+        _FRAME_NODES.pop(self.scene.as_pointer(), None)
+        result = {"restored": 0, "added": [], "missing": []}
         if not CompositorHelper.is_enabled(self.scene):
-            return
+            return result
         
         node_tree = CompositorHelper.get_node_tree(self.scene)
+        snapshot = self._load_snapshot()
+        originals = snapshot["paths"]
+        known = set(snapshot["nodes"])
+        seen = set()
         
         for node in node_tree.nodes:
-            if node.type == "OUTPUT_FILE":
-                if self.ORIGINAL_PATH_KEY in node:
-                    CompositorHelper.set_output_path(node, node[self.ORIGINAL_PATH_KEY])
-                    del node[self.ORIGINAL_PATH_KEY]
+            if node.type != "OUTPUT_FILE":
+                continue
+            seen.add(node.name)
+            original_path = originals.get(node.name)
+            # 兼容旧版本：原始路径保存在节点自定义属性中
+            if self.ORIGINAL_PATH_KEY in node:
+                if original_path is None:
+                    original_path = node[self.ORIGINAL_PATH_KEY]
+                del node[self.ORIGINAL_PATH_KEY]
+            if original_path is not None:
+                if CompositorHelper.get_output_path(node) != original_path:
+                    CompositorHelper.set_output_path(node, original_path)
+                result["restored"] += 1
+            elif known and node.name not in known:
+                result["added"].append(node.name)
+        
+        result["missing"] = sorted(set(originals).difference(seen))
+        snapshot["paths"] = {}
+        self._save_snapshot(snapshot)
+        return result
 
 
 # 保留装饰器函数用于Blender handler注册
@@ -102,5 +264,28 @@ def replaceTokens(dummy):
 
 @persistent
 def restoreTokens(dummy):
-    """Handler函数：恢复token（用于render_post/render_cancel handler）"""
-    TokenReplacer().restore()
+    """Handler函数：恢复token（用于render_post/render_cancel handler）
+
+    渲染农场模式下保留已替换的路径，只由 Renderfarm Prepare 恢复。
+    """
+    scene = bpy.context.scene
+    if getattr(scene, "IDS_CloudModeActive", False):
+        return
+    TokenReplacer(scene).restore()
+
+
+@persistent
+def updateFrameTokens(scene, depsgraph=None):
+    """Handler函数：换帧时更新 $frame$/$chunk$（用于frame_change_pre handler）
+
+    没有登记逐帧节点的场景直接返回，不遍历节点树。
+    """
+    if not _FRAME_NODES:
+        return
+    TokenReplacer(scene).update_frame()
+
+
+@persistent
+def clearFrameTokens(dummy):
+    """Handler函数：打开文件后场景指针可能被复用，清空逐帧节点登记（用于load_post handler）"""
+    _FRAME_NODES.clear()
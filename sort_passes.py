@@ -4,25 +4,76 @@
 
 from typing import Set, Dict, List, Tuple
 import bpy
+from bpy.app.handlers import persistent
 from collections import Counter
 
 from .constants import DATA_LAYER_PREFIX, DATA_LAYER_SUFFIX
 from .handy_functions import BlenderCompat, CompositorHelper
 
 
+# 分类结果缓存：{场景指针: {视图层名: (指纹, {类别: pass列表})}}
+_SORT_CACHE: Dict[int, Dict[str, tuple]] = {}
+# 每种 RNA 结构中与 pass 相关的属性名
+_PASS_PROPS: Dict[str, Tuple[str, ...]] = {}
+
+PASS_CATEGORIES = ("Color", "Data", "Vector", "Crypto")
+
+
+def _pass_props(owner) -> Tuple[str, ...]:
+    """返回 RNA 结构中名称含 "pass" 的属性（按结构类型缓存）"""
+    key = owner.bl_rna.identifier
+    props = _PASS_PROPS.get(key)
+    if props is None:
+        props = tuple(
+            prop.identifier
+            for prop in owner.bl_rna.properties
+            if "pass" in prop.identifier and prop.type in {"BOOLEAN", "INT", "ENUM"}
+        )
+        _PASS_PROPS[key] = props
+    return props
+
+
+def _pass_values(owner) -> tuple:
+    """读取 pass 相关属性的当前值"""
+    if owner is None:
+        return ()
+    return tuple(getattr(owner, name) for name in _pass_props(owner))
+
+
+def clear_pass_cache(scene=None) -> None:
+    """清除 PassSorter 缓存
+
+    Args:
+        scene: 只清除该场景的缓存，默认清除全部
+    """
+    if scene is None:
+        _SORT_CACHE.clear()
+    else:
+        _SORT_CACHE.pop(scene.as_pointer(), None)
+
+
+@persistent
+def clear_pass_cache_on_load(dummy):
+    """打开文件后场景指针可能被复用，清空缓存"""
+    _SORT_CACHE.clear()
+
+
 class PassSorter:
     """负责收集和整理视图层的pass信息
     
     获取所有可视层输出并返回整理好的字典，以备建立节点调用。
+    每个视图层的分类结果按指纹缓存，指纹未变的视图层不会重新分类。
     """
     
-    def __init__(self, scene=None):
+    def __init__(self, scene=None, addon_prefs=None):
         """初始化 PassSorter
         
         Args:
             scene: Blender 场景对象，默认使用当前场景
+            addon_prefs: 插件设置，默认从当前上下文读取
         """
         self.scene = scene or bpy.context.scene
+        self.addon_prefs = addon_prefs
         self._viewlayer_full: Dict[str, List] = {}
         self._viewlayers: List[str] = []
         self._material_aovs: Dict[str, List[str]] = {}
@@ -69,6 +120,7 @@ class PassSorter:
         if unexposed_viewlayers:
             for i in unexposed_viewlayers:
                 render_layers_node = node_tree.nodes.new("CompositorNodeRLayers")
+                render_layers_node.scene = self.scene
                 render_layers_node.layer = i
                 render_layers_node.name = i
                 render_layers_node.label = i
@@ -87,14 +139,21 @@ class PassSorter:
         
         self._viewlayers = viewlayers
     
-    def _collect_enabled_passes(self, node_tree) -> Dict[str, List[dict]]:
-        """收集所有启用的pass"""
+    def _collect_enabled_passes(self, node_tree, layers=None) -> Dict[str, List[dict]]:
+        """收集所有启用的pass
+        
+        Args:
+            node_tree: 合成器节点树
+            layers: 只收集这些视图层，默认收集全部
+        """
         enabled_passes = []
         all_passes = {}
         
         for node in node_tree.nodes:
             if node.type == "R_LAYERS":
                 node.select = True
+                if layers is not None and node.layer not in layers:
+                    continue
                 for output in node.outputs:
                     if output.enabled:
                         enabled_passes.append({output.bl_idname: output.name})
@@ -104,95 +163,150 @@ class PassSorter:
         
         return all_passes
     
-    def _categorize_passes(self, all_passes: Dict[str, List[dict]]) -> None:
-        """将pass按类型分类"""
+    def _settings_key(self) -> tuple:
+        """影响分类结果的场景设置"""
+        return (
+            self.scene.render.engine,
+            self.scene.IDS_ArtDepth,
+            self.scene.IDS_AdvMode,
+            self.scene.IDS_UseDATALayer,
+            self.scene.IDS_fakeDeep,
+            self.scene.IDS_DataMatType,
+        )
+    
+    def _layer_fingerprint(self, view_layer, settings_key) -> tuple:
+        """计算视图层指纹：启用的pass、AOV、灯光组和相关设置"""
+        return (
+            settings_key,
+            _pass_values(view_layer),
+            _pass_values(getattr(view_layer, "cycles", None)),
+            _pass_values(getattr(view_layer, "eevee", None)),
+            tuple((aov.name, aov.type) for aov in view_layer.aovs),
+            tuple(lg.name for lg in getattr(view_layer, "lightgroups", ())),
+        )
+    
+    def _categorize_layer(self, viewlayer: str, viewlayer_passes: List[dict]) -> Dict[str, List[str]]:
+        """将单个视图层的pass按类型分类
+        
+        Returns:
+            dict: {"Color": [...], "Data": [...], "Vector": [...], "Crypto": [...]}
+        """
+        colors = [
+            d["NodeSocketColor"] for d in viewlayer_passes if "NodeSocketColor" in d
+        ]
+        float_data = [
+            d["NodeSocketFloat"] for d in viewlayer_passes if "NodeSocketFloat" in d
+        ]
+        vector_data = [
+            d["NodeSocketVector"] for d in viewlayer_passes if "NodeSocketVector" in d
+        ]
+        vector4d_data = [
+            d["NodeSocketVector4D"]
+            for d in viewlayer_passes
+            if "NodeSocketVector4D" in d
+        ]
+        
+        real_data = []
+        for i in float_data + vector_data + vector4d_data:
+            if self.scene.IDS_ArtDepth is True:
+                if (
+                    "Alpha" not in i
+                    and "Denoising Normal" not in i
+                    and "Denoising Albedo" not in i
+                ):
+                    real_data.append(i)
+            else:
+                if "Alpha" not in i and "Denoising" not in i:
+                    real_data.append(i)
+        
+        if (
+            self.scene.IDS_AdvMode is True
+            and self.scene.IDS_UseDATALayer is True
+        ):
+            for aov in self._material_aovs[viewlayer]:
+                if aov in colors:
+                    colors.remove(aov)
+                    real_data.append(aov)
+        
+        if (
+            self.scene.IDS_AdvMode is True
+            and self.scene.IDS_UseDATALayer is True
+            and self.scene.IDS_fakeDeep == True
+            and self.scene.IDS_DataMatType
+            in {"Antialias Depth Material", "Antialias Depth & Position Material"}
+            and "Depth_AA$$aoP" in self._material_aovs[viewlayer]
+        ):
+            real_data.append("Deep_From_Image_z")
+        
+        if "UV" in vector_data:
+            vector_data.remove("UV")
+        if "Vector" in vector_data:
+            vector_data.remove("Vector")
+        if "Position_AA$$aoP" in real_data:
+            vector_data.append("Position_AA$$aoP")
+        if "Pref" in real_data:
+            vector_data.append("Pref")
+        
+        real_color = []
+        crypto = []
+        for i in colors:
+            if "Crypto" not in i and "Noisy" not in i and "Denoising Albedo" not in i:
+                real_color.append(i)
+            if "Crypto" in i:
+                crypto.append(i)
+        
+        if (
+            self.scene.IDS_AdvMode is True
+            and self.scene.IDS_UseDATALayer is True
+        ):
+            for aov in self._material_aovs[viewlayer]:
+                if aov not in real_color:
+                    real_color.append(aov)
+        
+        return {
+            "Color": real_color,
+            "Data": real_data,
+            "Vector": vector_data,
+            "Crypto": crypto,
+        }
+    
+    def _categorize_passes(self, node_tree) -> None:
+        """将pass按类型分类，只重新分类指纹变化的视图层"""
+        cache = _SORT_CACHE.setdefault(self.scene.as_pointer(), {})
+        settings_key = self._settings_key()
+        fingerprints = {
+            view_layer.name: self._layer_fingerprint(view_layer, settings_key)
+            for view_layer in self.scene.view_layers
+        }
+        stale = [
+            viewlayer for viewlayer in self._viewlayers
+            if viewlayer not in cache or cache[viewlayer][0] != fingerprints[viewlayer]
+        ]
+        
+        if stale:
+            all_passes = self._collect_enabled_passes(node_tree, set(stale))
+            for viewlayer in stale:
+                cache[viewlayer] = (
+                    fingerprints[viewlayer],
+                    self._categorize_layer(viewlayer, all_passes.get(viewlayer, [])),
+                )
+                print(viewlayer, cache[viewlayer][1])
+        
+        for viewlayer in list(cache):
+            if viewlayer not in fingerprints:
+                del cache[viewlayer]
+        
         for viewlayer in self._viewlayers:
-            viewlayer_passes = all_passes[viewlayer]
-            
-            colors = [
-                d["NodeSocketColor"] for d in viewlayer_passes if "NodeSocketColor" in d
-            ]
-            float_data = [
-                d["NodeSocketFloat"] for d in viewlayer_passes if "NodeSocketFloat" in d
-            ]
-            vector_data = [
-                d["NodeSocketVector"] for d in viewlayer_passes if "NodeSocketVector" in d
-            ]
-            vector4d_data = [
-                d["NodeSocketVector4D"]
-                for d in viewlayer_passes
-                if "NodeSocketVector4D" in d
-            ]
-            
-            real_data = []
-            for i in float_data + vector_data + vector4d_data:
-                if self.scene.IDS_ArtDepth is True:
-                    if (
-                        "Alpha" not in i
-                        and "Denoising Normal" not in i
-                        and "Denoising Albedo" not in i
-                    ):
-                        real_data.append(i)
-                else:
-                    if "Alpha" not in i and "Denoising" not in i:
-                        real_data.append(i)
-            
-            if (
-                self.scene.IDS_AdvMode is True
-                and self.scene.IDS_UseDATALayer is True
-            ):
-                for aov in self._material_aovs[viewlayer]:
-                    if aov in colors:
-                        colors.remove(aov)
-                        real_data.append(aov)
-            
-            if (
-                self.scene.IDS_AdvMode is True
-                and self.scene.IDS_UseDATALayer is True
-                and self.scene.IDS_fakeDeep == True
-                and self.scene.IDS_DataMatType
-                in {"Antialias Depth Material", "Antialias Depth & Position Material"}
-                and "Depth_AA$$aoP" in self._material_aovs[viewlayer]
-            ):
-                real_data.append("Deep_From_Image_z")
-            
-            self._viewlayer_full[viewlayer + "Data"] = real_data
-            
-            if "UV" in vector_data:
-                vector_data.remove("UV")
-            if "Vector" in vector_data:
-                vector_data.remove("Vector")
-            if "Position_AA$$aoP" in real_data:
-                vector_data.append("Position_AA$$aoP")
-            if "Pref" in real_data:
-                vector_data.append("Pref")
-            
-            self._viewlayer_full[viewlayer + "Vector"] = vector_data
-            
-            real_color = []
-            crypto = []
-            for i in colors:
-                if "Crypto" not in i and "Noisy" not in i and "Denoising Albedo" not in i:
-                    real_color.append(i)
-                if "Crypto" in i:
-                    crypto.append(i)
-            
-            if (
-                self.scene.IDS_AdvMode is True
-                and self.scene.IDS_UseDATALayer is True
-            ):
-                for aov in self._material_aovs[viewlayer]:
-                    if aov not in real_color:
-                        real_color.append(aov)
-            
-            self._viewlayer_full[viewlayer + "Color"] = real_color
-            self._viewlayer_full[viewlayer + "Crypto"] = crypto
-        
-        print(self._viewlayer_full)
+            categories = cache[viewlayer][1]
+            for category in PASS_CATEGORIES:
+                self._viewlayer_full[viewlayer + category] = categories[category][:]
     
     def _filter_enabled_viewlayers(self) -> None:
         """过滤只输出启用的视图层"""
-        addon_prefs = bpy.context.preferences.addons[BlenderCompat.addon_package].preferences
+        addon_prefs = (
+            self.addon_prefs
+            or bpy.context.preferences.addons[BlenderCompat.addon_package].preferences
+        )
         if addon_prefs.Only_Create_Enabled_Viewlayer is True:
             viewlayersenable = self._viewlayers[:]
             for viewlayer in viewlayersenable:
@@ -210,8 +324,7 @@ class PassSorter:
         
         self._collect_material_aovs()
         self._ensure_render_layer_nodes(node_tree)
-        all_passes = self._collect_enabled_passes(node_tree)
-        self._categorize_passes(all_passes)
+        self._categorize_passes(node_tree)
         self._filter_enabled_viewlayers()
         
         return self._viewlayer_full, self._viewlayers
@@ -0,0 +1,21 @@
+# SPDX-License-Identifier: GPL-3.0-or-later
+# Copyright (C) Roland Vyens
+"""Fake ``addon_utils``: import a module and call its ``register()``."""
+
+import importlib
+import sys
+
+
+def enable(module_name, default_set=False, persistent=False, handle_error=None):
+    module = importlib.import_module(module_name)
+    if not getattr(module, "__addon_enabled__", False):
+        module.register()
+        module.__addon_enabled__ = True
+    return module
+
+
+def disable(module_name, default_set=False, handle_error=None):
+    module = sys.modules.get(module_name)
+    if module is not None and getattr(module, "__addon_enabled__", False):
+        module.unregister()
+        module.__addon_enabled__ = False
@@ -0,0 +1,41 @@
+# SPDX-License-Identifier: GPL-3.0-or-later
+# Copyright (C) Roland Vyens
+"""Fake ``bpy`` for running Industrial AOV Connector in plain CPython.
+
+It models just enough of Blender (scenes, view layers, AOVs, compositor node
+trees, nodes, sockets, links and addon preferences) for ``PassSorter``,
+``PathManager``, ``TokenReplacer``, the node builders and the arranger.
+Nothing is drawn and nothing is rendered.
+
+Select the emulated Blender version before importing the addon::
+
+    import bpy
+    bpy.reset(version=(5, 0, 0))
+
+This package is a developer tool and is not part of the packaged addon.
+"""
+
+from . import app, ops, path, props, types, utils
+from ._model import BlendData, Context
+
+data = BlendData()
+context = Context(data)
+
+
+def reset(version=None):
+    """Drop all data and start over with one empty scene.
+
+    Registered classes and addon preferences are kept.
+    """
+    global data
+    if version is not None:
+        app.version = tuple(version)
+        app.version_string = "{}.{}.{}".format(*app.version)
+    preferences = context.preferences
+    data = BlendData()
+    context.__init__(data)
+    context.preferences = preferences
+    return data
+
+
+__all__ = ["app", "context", "data", "ops", "path", "props", "reset", "types", "utils"]
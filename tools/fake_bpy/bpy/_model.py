@@ -0,0 +1,923 @@
+# SPDX-License-Identifier: GPL-3.0-or-later
+# Copyright (C) Roland Vyens
+"""Data model of the fake ``bpy``.
+
+Only what Industrial AOV Connector touches is modelled: scenes, view layers,
+AOVs, light groups, compositor node trees, nodes, sockets, links, materials
+and addon preferences. Render Layers outputs follow the Blender 4.x pass
+names (with the 5.0 color pass renames) and are derived from the view layer
+pass flags.
+"""
+
+import os
+import tempfile
+from contextlib import contextmanager
+from types import SimpleNamespace
+
+
+def _is_5_plus():
+    from . import app
+    return tuple(app.version) >= (5, 0, 0)
+
+
+# =============================================================================
+# RNA helpers
+# =============================================================================
+
+class _RNAProperty(SimpleNamespace):
+    pass
+
+
+class _RNA:
+    """Minimal ``bl_rna`` built from an instance's public attributes."""
+
+    def __init__(self, owner):
+        self.identifier = type(owner).__name__
+        self.properties = _PropertyList(owner)
+
+
+class _PropertyList(list):
+    def __init__(self, owner):
+        props = []
+        for name, value in vars(owner).items():
+            if name.startswith("_") or callable(value):
+                continue
+            if isinstance(value, bool):
+                kind = "BOOLEAN"
+            elif isinstance(value, int):
+                kind = "INT"
+            elif isinstance(value, float):
+                kind = "FLOAT"
+            elif isinstance(value, str):
+                kind = "STRING"
+            else:
+                kind = "POINTER"
+            props.append(_RNAProperty(identifier=name, type=kind))
+        super().__init__(props)
+
+    def get(self, name, default=None):
+        for prop in self:
+            if prop.identifier == name:
+                return prop
+        return default
+
+
+class Struct:
+    """Base of all fake RNA structs: ``bl_rna``, ``as_pointer`` and ID props."""
+
+    @property
+    def bl_rna(self):
+        return _RNA(self)
+
+    def as_pointer(self):
+        return id(self)
+
+    @property
+    def original(self):
+        """There are no evaluated copies, every struct is its own original."""
+        return self
+
+    def _idprops(self):
+        if "_idprops_store" not in self.__dict__:
+            self.__dict__["_idprops_store"] = {}
+        return self.__dict__["_idprops_store"]
+
+    def __getitem__(self, key):
+        return self._idprops()[key]
+
+    def __setitem__(self, key, value):
+        self._idprops()[key] = value
+
+    def __delitem__(self, key):
+        del self._idprops()[key]
+
+    def __contains__(self, key):
+        return key in self._idprops()
+
+    def get(self, key, default=None):
+        return self._idprops().get(key, default)
+
+    def keys(self):
+        return self._idprops().keys()
+
+
+class Collection(Struct):
+    """Ordered collection addressable by index or ``name``."""
+
+    def __init__(self, items=None):
+        self._items = list(items or [])
+
+    def __iter__(self):
+        return iter(list(self._items))
+
+    def __len__(self):
+        return len(self._items)
+
+    def __bool__(self):
+        return bool(self._items)
+
+    def __getitem__(self, key):
+        if isinstance(key, (int, slice)):
+            return self._items[key]
+        for item in self._items:
+            if item.name == key:
+                return item
+        raise KeyError(key)
+
+    def __contains__(self, key):
+        if isinstance(key, str):
+            return any(item.name == key for item in self._items)
+        return key in self._items
+
+    def get(self, key, default=None):
+        for item in self._items:
+            if item.name == key:
+                return item
+        return default
+
+    def keys(self):
+        return [item.name for item in self._items]
+
+    def values(self):
+        return list(self._items)
+
+    def items(self):
+        return [(item.name, item) for item in self._items]
+
+    def find(self, key):
+        for i, item in enumerate(self._items):
+            if item.name == key:
+                return i
+        return -1
+
+    def _unique(self, name, owner=None):
+        names = {item.name for item in self._items if item is not owner}
+        if name not in names:
+            return name
+        i = 1
+        while f"{name}.{i:03d}" in names:
+            i += 1
+        return f"{name}.{i:03d}"
+
+
+# =============================================================================
+# Sockets, nodes and links
+# =============================================================================
+
+SOCKET_TYPES = {
+    "RGBA": "NodeSocketColor",
+    "VALUE": "NodeSocketFloat",
+    "FLOAT": "NodeSocketFloat",
+    "VECTOR": "NodeSocketVector",
+    "NodeSocketColor": "NodeSocketColor",
+    "NodeSocketFloat": "NodeSocketFloat",
+    "NodeSocketVector": "NodeSocketVector",
+    "NodeSocketVector4D": "NodeSocketVector4D",
+}
+
+_SOCKET_DEFAULTS = {
+    "NodeSocketColor": (0.0, 0.0, 0.0, 1.0),
+    "NodeSocketFloat": 0.0,
+    "NodeSocketVector": (0.0, 0.0, 0.0),
+    "NodeSocketVector4D": (0.0, 0.0, 0.0, 0.0),
+}
+
+
+class NodeSocket(Struct):
+    def __init__(self, node, bl_idname, name, is_output):
+        self.node = node
+        self.bl_idname = bl_idname
+        self.name = name
+        self.identifier = name
+        self.is_output = is_output
+        self.enabled = True
+        self.hide = False
+        self.default_value = _SOCKET_DEFAULTS.get(bl_idname, 0.0)
+        self._link_count = 0
+
+    @property
+    def is_linked(self):
+        """A flag on the socket in Blender, cheap to read."""
+        return self._link_count > 0
+
+    @property
+    def links(self):
+        """Scans every link of the tree, as Blender does on each access."""
+        if self.is_output:
+            return [l for l in self.node.id_data.links._items if l.from_socket is self]
+        return [l for l in self.node.id_data.links._items if l.to_socket is self]
+
+    @property
+    def type(self):
+        return {
+            "NodeSocketColor": "RGBA",
+            "NodeSocketFloat": "VALUE",
+        }.get(self.bl_idname, "VECTOR")
+
+    def __repr__(self):
+        kind = "output" if self.is_output else "input"
+        return f"<NodeSocket {self.node.name}.{kind}[{self.name!r}]>"
+
+
+class NodeSockets(Collection):
+    def __init__(self, node, is_output):
+        super().__init__()
+        self._node = node
+        self._is_output = is_output
+
+    def new(self, type, name, identifier=""):
+        socket = NodeSocket(self._node, SOCKET_TYPES.get(type, type), name, self._is_output)
+        self._items.append(socket)
+        return socket
+
+    def remove(self, socket):
+        tree = self._node.id_data
+        if socket.is_linked:
+            for link in socket.links:
+                tree.links.remove(link)
+        self._items.remove(socket)
+
+    def clear(self):
+        for socket in list(self._items):
+            self.remove(socket)
+
+
+class _SlotView:
+    """``file_slots`` / ``layer_slots`` of a 4.x File Output node (inputs alias)."""
+
+    def __init__(self, node):
+        self._node = node
+
+    def new(self, name):
+        return self._node.inputs.new("NodeSocketColor", name)
+
+    def remove(self, socket):
+        self._node.inputs.remove(socket)
+
+    def clear(self):
+        self._node.inputs.clear()
+
+    def __iter__(self):
+        return iter(self._node.inputs)
+
+    def __len__(self):
+        return len(self._node.inputs)
+
+    def __getitem__(self, key):
+        return self._node.inputs[key]
+
+
+class _FileOutputItems(_SlotView):
+    """``file_output_items`` of a 5.x File Output node."""
+
+    def new(self, socket_type, name):
+        return self._node.inputs.new(SOCKET_TYPES.get(socket_type, "NodeSocketColor"), name)
+
+
+class Vector2(Struct):
+    def __init__(self, x=0.0, y=0.0):
+        self.x = float(x)
+        self.y = float(y)
+
+    def __iter__(self):
+        return iter((self.x, self.y))
+
+    def __getitem__(self, i):
+        return (self.x, self.y)[i]
+
+    def __eq__(self, other):
+        return tuple(self) == tuple(other)
+
+    def __repr__(self):
+        return f"Vector2({self.x}, {self.y})"
+
+
+class ImageFormatSettings(Struct):
+    def __init__(self):
+        if _is_5_plus():
+            self.media_type = "MULTI_LAYER_IMAGE"
+        self.file_format = "OPEN_EXR_MULTILAYER"
+        self.color_depth = "16"
+        self.exr_codec = "ZIP"
+        self.color_mode = "RGBA"
+
+
+class _EnumItems:
+    def __init__(self, identifiers):
+        self.enum_items = [SimpleNamespace(identifier=i) for i in identifiers]
+
+
+class _ImageFormatRNA:
+    FILE_FORMATS = ["PNG", "JPEG", "OPEN_EXR", "OPEN_EXR_MULTILAYER"]
+
+    class properties:
+        @staticmethod
+        def get(name, default=None):
+            if name == "file_format":
+                return _EnumItems(_ImageFormatRNA.FILE_FORMATS)
+            return default
+
+
+ImageFormatSettings.bl_rna = _ImageFormatRNA
+
+
+def _sockets(*specs):
+    return [(SOCKET_TYPES[kind], name) for kind, name in specs]
+
+
+# bl_idname -> (node.type, inputs, outputs)
+NODE_TYPES = {
+    "CompositorNodeRLayers": ("R_LAYERS", [], []),
+    "CompositorNodeOutputFile": ("OUTPUT_FILE", _sockets(("RGBA", "Image")), []),
+    "CompositorNodeComposite": ("COMPOSITE", _sockets(("RGBA", "Image")), []),
+    "CompositorNodeViewer": ("VIEWER", _sockets(("RGBA", "Image")), []),
+    "CompositorNodeDenoise": (
+        "DENOISE",
+        _sockets(("RGBA", "Image"), ("VECTOR", "Normal"), ("RGBA", "Albedo")),
+        _sockets(("RGBA", "Image")),
+    ),
+    "CompositorNodeSeparateXYZ": (
+        "SEPARATE_XYZ", _sockets(("VECTOR", "Vector")),
+        _sockets(("VALUE", "X"), ("VALUE", "Y"), ("VALUE", "Z")),
+    ),
+    "ShaderNodeSeparateXYZ": (
+        "SEPXYZ", _sockets(("VECTOR", "Vector")),
+        _sockets(("VALUE", "X"), ("VALUE", "Y"), ("VALUE", "Z")),
+    ),
+    "CompositorNodeCombineXYZ": (
+        "COMBINE_XYZ", _sockets(("VALUE", "X"), ("VALUE", "Y"), ("VALUE", "Z")),
+        _sockets(("VECTOR", "Vector")),
+    ),
+    "ShaderNodeCombineXYZ": (
+        "COMBXYZ", _sockets(("VALUE", "X"), ("VALUE", "Y"), ("VALUE", "Z")),
+        _sockets(("VECTOR", "Vector")),
+    ),
+    "CompositorNodeMath": (
+        "MATH", _sockets(("VALUE", "Value"), ("VALUE", "Value"), ("VALUE", "Value")),
+        _sockets(("VALUE", "Value")),
+    ),
+    "ShaderNodeMath": (
+        "MATH", _sockets(("VALUE", "Value"), ("VALUE", "Value"), ("VALUE", "Value")),
+        _sockets(("VALUE", "Value")),
+    ),
+    "CompositorNodeNormalize": (
+        "NORMALIZE", _sockets(("VALUE", "Value")), _sockets(("VALUE", "Value")),
+    ),
+    "CompositorNodeSeparateColor": (
+        "SEPARATE_COLOR", _sockets(("RGBA", "Image")),
+        _sockets(("VALUE", "Red"), ("VALUE", "Green"), ("VALUE", "Blue"), ("VALUE", "Alpha")),
+    ),
+    "CompositorNodeCombineColor": (
+        "COMBINE_COLOR",
+        _sockets(("VALUE", "Red"), ("VALUE", "Green"), ("VALUE", "Blue"), ("VALUE", "Alpha")),
+        _sockets(("RGBA", "Image")),
+    ),
+    "CompositorNodeGroup": ("GROUP", [], []),
+    "NodeGroupInput": ("GROUP_INPUT", [], []),
+    "NodeGroupOutput": ("GROUP_OUTPUT", [], []),
+    "NodeFrame": ("FRAME", [], []),
+    "NodeReroute": ("REROUTE", _sockets(("RGBA", "Input")), _sockets(("RGBA", "Output"))),
+    "ShaderNodeOutputAOV": ("OUTPUT_AOV", _sockets(("RGBA", "Color"), ("VALUE", "Value")), []),
+    "ShaderNodeOutputMaterial": ("OUTPUT_MATERIAL", _sockets(("RGBA", "Surface")), []),
+    "ShaderNodeGroup": ("GROUP", [], []),
+}
+
+SOCKET_HEIGHT = 22
+HEADER_HEIGHT = 30
+
+
+class Node(Struct):
+    def __init__(self, tree, bl_idname):
+        if bl_idname not in NODE_TYPES:
+            raise RuntimeError(f"Node type {bl_idname} undefined")
+        node_type, inputs, outputs = NODE_TYPES[bl_idname]
+        self.__dict__["_name"] = ""
+        self.id_data = tree
+        self.bl_idname = bl_idname
+        self.type = node_type
+        self.label = ""
+        self.hide = False
+        self.mute = False
+        self.select = False
+        self.parent = None
+        self.width = 140.0
+        self.use_custom_color = False
+        self.color = (0.6, 0.6, 0.6)
+        self.__dict__["_location"] = Vector2()
+        self.inputs = NodeSockets(self, False)
+        self._outputs = NodeSockets(self, True)
+        for kind, name in inputs:
+            self.inputs.new(kind, name)
+        for kind, name in outputs:
+            self._outputs.new(kind, name)
+        if node_type == "MATH":
+            self.operation = "ADD"
+            self.use_clamp = False
+        elif node_type == "DENOISE":
+            self.prefilter = "ACCURATE"
+            self.quality = "HIGH"
+            self.use_hdr = True
+        elif node_type == "OUTPUT_FILE":
+            self.format = ImageFormatSettings()
+            if _is_5_plus():
+                self.directory = ""
+                self.file_name = ""
+                self.file_output_items = _FileOutputItems(self)
+            else:
+                self.base_path = os.path.join(tempfile.gettempdir(), "")
+                self.file_slots = _SlotView(self)
+                self.layer_slots = _SlotView(self)
+        elif node_type == "R_LAYERS":
+            import bpy
+            self.scene = tree._scene or bpy.context.scene
+            self.layer = self.scene.view_layers[0].name if self.scene else ""
+        elif node_type == "GROUP":
+            self.__dict__["_node_tree"] = None
+        elif node_type == "GROUP_INPUT":
+            for item in tree.interface.items_tree:
+                if item.in_out == "INPUT":
+                    self._outputs.new(item.socket_type, item.name)
+        elif node_type == "GROUP_OUTPUT":
+            for item in tree.interface.items_tree:
+                if item.in_out == "OUTPUT":
+                    self.inputs.new(item.socket_type, item.name)
+        elif node_type == "OUTPUT_AOV":
+            self.aov_name = ""
+
+    @property
+    def name(self):
+        return self._name
+
+    @name.setter
+    def name(self, value):
+        self.__dict__["_name"] = self.id_data.nodes._unique(value, self)
+
+    @property
+    def location(self):
+        return self._location
+
+    @property
+    def node_tree(self):
+        return self.__dict__.get("_node_tree")
+
+    @node_tree.setter
+    def node_tree(self, group):
+        """Assigning a group rebuilds the sockets from its interface."""
+        self.__dict__["_node_tree"] = group
+        self.inputs.clear()
+        self._outputs.clear()
+        if group is None:
+            return
+        for item in group.interface.items_tree:
+            sockets = self.inputs if item.in_out == "INPUT" else self._outputs
+            sockets.new(item.socket_type, item.name)
+
+    @location.setter
+    def location(self, value):
+        x, y = value
+        self.__dict__["_location"] = Vector2(x, y)
+
+    @property
+    def dimensions(self):
+        if self.hide:
+            return Vector2(self.width, HEADER_HEIGHT)
+        visible = [s for s in self.inputs if s.enabled] + [s for s in self.outputs if s.enabled]
+        return Vector2(self.width, HEADER_HEIGHT + SOCKET_HEIGHT * len(visible))
+
+    @property
+    def outputs(self):
+        if self.type == "R_LAYERS":
+            self._sync_render_layer()
+        return self._outputs
+
+    def _sync_render_layer(self):
+        """Rebuild Render Layers outputs from the view layer pass flags."""
+        outputs = self._outputs
+        scene = self.scene
+        view_layer = scene.view_layers.get(self.layer) if scene else None
+        wanted = render_layer_passes(view_layer, scene) if view_layer else []
+        existing = {s.name: s for s in outputs._items}
+        names = set()
+        for bl_idname, name in wanted:
+            names.add(name)
+            socket = existing.get(name)
+            if socket is None:
+                socket = outputs.new(bl_idname, name)
+            socket.enabled = True
+        for socket in outputs._items:
+            if socket.name not in names:
+                socket.enabled = False
+
+    def __repr__(self):
+        return f"<Node {self.bl_idname} {self.name!r}>"
+
+
+class NodeLink(Struct):
+    def __init__(self, from_socket, to_socket):
+        self.from_socket = from_socket
+        self.to_socket = to_socket
+        self.from_node = from_socket.node
+        self.to_node = to_socket.node
+        self.is_valid = True
+        self.is_muted = False
+
+
+class Nodes(Collection):
+    def __init__(self, tree):
+        super().__init__()
+        self._tree = tree
+
+    def new(self, type):
+        node = Node(self._tree, type)
+        node.name = NODE_TYPES[type][0].replace("_", " ").title()
+        self._items.append(node)
+        return node
+
+    def remove(self, node):
+        for link in list(self._tree.links._items):
+            if link.from_node is node or link.to_node is node:
+                self._tree.links.remove(link)
+        for other in self._items:
+            if other.parent is node:
+                other.parent = None
+        self._items.remove(node)
+
+    def clear(self):
+        for node in list(self._items):
+            self.remove(node)
+
+
+class NodeLinks(Collection):
+    def __init__(self, tree):
+        super().__init__()
+        self._tree = tree
+
+    def new(self, input, output, verify_limits=True):
+        from_socket, to_socket = input, output
+        if from_socket.is_output is False:
+            from_socket, to_socket = to_socket, from_socket
+        if to_socket.is_linked:
+            for link in to_socket.links:
+                self.remove(link)
+        link = NodeLink(from_socket, to_socket)
+        from_socket._link_count += 1
+        to_socket._link_count += 1
+        self._items.append(link)
+        return link
+
+    def remove(self, link):
+        link.from_socket._link_count -= 1
+        link.to_socket._link_count -= 1
+        self._items.remove(link)
+
+    def clear(self):
+        for link in list(self._items):
+            self.remove(link)
+
+
+class _InterfaceSocket(Struct):
+    def __init__(self, name, in_out, socket_type):
+        self.name = name
+        self.in_out = in_out
+        self.socket_type = socket_type
+        self.item_type = "SOCKET"
+
+
+class NodeTreeInterface(Collection):
+    @property
+    def items_tree(self):
+        return self
+
+    def new_socket(self, name, in_out="INPUT", socket_type="NodeSocketFloat", parent=None):
+        item = _InterfaceSocket(name, in_out, socket_type)
+        self._items.append(item)
+        return item
+
+    def remove(self, item):
+        self._items.remove(item)
+
+    def clear(self):
+        self._items.clear()
+
+
+class NodeTree(Struct):
+    def __init__(self, name, bl_idname="CompositorNodeTree", scene=None):
+        self.name = name
+        self.bl_idname = bl_idname
+        self.type = "COMPOSITING" if bl_idname == "CompositorNodeTree" else "SHADER"
+        self.users = 1
+        self._scene = scene
+        self.nodes = Nodes(self)
+        self.links = NodeLinks(self)
+        self.interface = NodeTreeInterface()
+
+
+# =============================================================================
+# Scenes and view layers
+# =============================================================================
+
+class AOV(Struct):
+    def __init__(self):
+        self.name = "AOV"
+        self.type = "COLOR"
+        self.is_valid = True
+
+
+class AOVs(Collection):
+    def add(self):
+        aov = AOV()
+        aov.name = self._unique("AOV")
+        self._items.append(aov)
+        return aov
+
+    def remove(self, aov):
+        self._items.remove(aov)
+
+
+class Lightgroup(Struct):
+    def __init__(self, name):
+        self.name = name
+
+
+class Lightgroups(Collection):
+    def add(self, name="Lightgroup"):
+        group = Lightgroup(self._unique(name))
+        self._items.append(group)
+        return group
+
+    def remove(self, group):
+        self._items.remove(group)
+
+
+class CyclesViewLayerSettings(Struct):
+    def __init__(self):
+        self.denoising_store_passes = False
+        self.use_pass_shadow_catcher = False
+        self.use_pass_volume_direct = False
+        self.use_pass_volume_indirect = False
+        self.use_denoising = True
+
+
+class EeveeViewLayerSettings(Struct):
+    def __init__(self):
+        self.use_pass_transparent = False
+        self.use_pass_volume_direct = False
+
+
+# (flag, socket type, socket name) in Render Layers output order
+VIEW_LAYER_PASSES = (
+    ("use_pass_z", "NodeSocketFloat", "Depth"),
+    ("use_pass_mist", "NodeSocketFloat", "Mist"),
+    ("use_pass_position", "NodeSocketVector", "Position"),
+    ("use_pass_normal", "NodeSocketVector", "Normal"),
+    ("use_pass_vector", "NodeSocketVector", "Vector"),
+    ("use_pass_uv", "NodeSocketVector", "UV"),
+    ("use_pass_object_index", "NodeSocketFloat", "IndexOB"),
+    ("use_pass_material_index", "NodeSocketFloat", "IndexMA"),
+    ("use_pass_diffuse_direct", "NodeSocketColor", "DiffDir"),
+    ("use_pass_diffuse_indirect", "NodeSocketColor", "DiffInd"),
+    ("use_pass_diffuse_color", "NodeSocketColor", "DiffCol"),
+    ("use_pass_glossy_direct", "NodeSocketColor", "GlossDir"),
+    ("use_pass_glossy_indirect", "NodeSocketColor", "GlossInd"),
+    ("use_pass_glossy_color", "NodeSocketColor", "GlossCol"),
+    ("use_pass_transmission_direct", "NodeSocketColor", "TransDir"),
+    ("use_pass_transmission_indirect", "NodeSocketColor", "TransInd"),
+    ("use_pass_transmission_color", "NodeSocketColor", "TransCol"),
+    ("use_pass_emit", "NodeSocketColor", "Emit"),
+    ("use_pass_environment", "NodeSocketColor", "Env"),
+    ("use_pass_ambient_occlusion", "NodeSocketColor", "AO"),
+    ("use_pass_shadow", "NodeSocketColor", "Shadow"),
+)
+# Color pass sockets renamed in Blender 5.0
+PASS_NAMES_5 = {
+    "DiffCol": "Diffuse Color",
+    "GlossCol": "Glossy Color",
+    "TransCol": "Transmission Color",
+}
+CRYPTO_PASSES = (
+    ("use_pass_cryptomatte_object", "CryptoObject"),
+    ("use_pass_cryptomatte_material", "CryptoMaterial"),
+    ("use_pass_cryptomatte_asset", "CryptoAsset"),
+)
+
+
+def render_layer_passes(view_layer, scene):
+    """Return [(socket bl_idname, name)] a Render Layers node shows."""
+    passes = [("NodeSocketColor", "Image"), ("NodeSocketFloat", "Alpha")]
+    renames = PASS_NAMES_5 if _is_5_plus() else {}
+    for flag, kind, name in VIEW_LAYER_PASSES:
+        if getattr(view_layer, flag, False):
+            passes.append((kind, renames.get(name, name)))
+    cycles = scene is None or scene.render.engine == "CYCLES"
+    if cycles and view_layer.cycles.use_pass_shadow_catcher:
+        passes.append(("NodeSocketColor", "Shadow Catcher"))
+    if cycles and view_layer.cycles.denoising_store_passes:
+        passes += [
+            ("NodeSocketColor", "Noisy Image"),
+            ("NodeSocketVector", "Denoising Normal"),
+            ("NodeSocketColor", "Denoising Albedo"),
+            ("NodeSocketFloat", "Denoising Depth"),
+        ]
+    for flag, prefix in CRYPTO_PASSES:
+        if getattr(view_layer, flag):
+            for i in range(view_layer.pass_cryptomatte_depth // 2):
+                passes.append(("NodeSocketColor", f"{prefix}{i:02d}"))
+    for aov in view_layer.aovs:
+        kind = "NodeSocketColor" if aov.type == "COLOR" else "NodeSocketFloat"
+        passes.append((kind, aov.name))
+    if cycles:
+        for group in view_layer.lightgroups:
+            passes.append(("NodeSocketColor", f"Combined_{group.name}"))
+    return passes
+
+
+class ViewLayer(Struct):
+    def __init__(self, name):
+        self.name = name
+        self.use = True
+        self.samples = 0
+        self.use_pass_combined = True
+        for flag, _kind, _name in VIEW_LAYER_PASSES:
+            setattr(self, flag, False)
+        for flag, _prefix in CRYPTO_PASSES:
+            setattr(self, flag, False)
+        self.pass_cryptomatte_depth = 6
+        self.material_override = None
+        self.aovs = AOVs()
+        self.lightgroups = Lightgroups()
+        self.cycles = CyclesViewLayerSettings()
+        self.eevee = EeveeViewLayerSettings()
+
+
+class ViewLayers(Collection):
+    def new(self, name):
+        layer = ViewLayer(self._unique(name))
+        self._items.append(layer)
+        return layer
+
+    def remove(self, layer):
+        if len(self._items) == 1:
+            raise RuntimeError("ViewLayer cannot be removed, a scene needs at least one")
+        self._items.remove(layer)
+
+
+class RenderSettings(Struct):
+    def __init__(self):
+        self.engine = "CYCLES"
+        self.filepath = os.path.join(tempfile.gettempdir(), "")
+        self.use_compositing = True
+        self.fps = 24
+        self.resolution_x = 1920
+        self.resolution_y = 1080
+        self.resolution_percentage = 100
+
+
+class Scene(Struct):
+    def __init__(self, name):
+        self.name = name
+        self.render = RenderSettings()
+        self.view_layers = ViewLayers([ViewLayer("ViewLayer")])
+        self.camera = None
+        self.frame_start = 1
+        self.frame_end = 250
+        self.frame_step = 1
+        self.frame_current = 1
+        self.__dict__["_node_tree"] = None
+        self.__dict__["_use_nodes"] = False
+        self.compositing_node_group = None
+
+    @property
+    def use_nodes(self):
+        return self._use_nodes
+
+    @use_nodes.setter
+    def use_nodes(self, value):
+        self.__dict__["_use_nodes"] = bool(value)
+        if value and self._node_tree is None:
+            self.__dict__["_node_tree"] = NodeTree("Compositing Nodetree", scene=self)
+
+    @property
+    def node_tree(self):
+        return self._node_tree
+
+    def frame_set(self, frame, subframe=0.0):
+        self.frame_current = frame
+
+
+# =============================================================================
+# Materials
+# =============================================================================
+
+class Material(Struct):
+    def __init__(self, name):
+        self.name = name
+        self.use_nodes = True
+        self.node_tree = NodeTree(f"Shader Nodetree", "ShaderNodeTree")
+        self.users = 1
+
+
+# =============================================================================
+# bpy.data / bpy.context
+# =============================================================================
+
+class IDCollection(Collection):
+    def __init__(self, factory):
+        super().__init__()
+        self._factory = factory
+
+    def new(self, name, *args):
+        item = self._factory(self._unique(name), *args)
+        self._items.append(item)
+        return item
+
+    def remove(self, item, do_unlink=True):
+        self._items.remove(item)
+
+
+class BlendData:
+    def __init__(self):
+        self.filepath = ""
+        self.scenes = IDCollection(Scene)
+        self.materials = IDCollection(Material)
+        self.node_groups = IDCollection(lambda name, kind="CompositorNodeTree": NodeTree(name, kind))
+        self.objects = IDCollection(lambda name, data=None: SimpleNamespace(name=name, data=data))
+        self.scenes.new("Scene")
+
+
+class Addon(Struct):
+    def __init__(self, module, preferences=None):
+        self.module = module
+        self.preferences = preferences
+
+
+class Addons(Collection):
+    def new(self, module, preferences=None):
+        addon = self.get(module)
+        if addon is None:
+            addon = Addon(module, preferences)
+            addon.name = module
+            self._items.append(addon)
+        elif preferences is not None:
+            addon.preferences = preferences
+        return addon
+
+    def remove(self, addon):
+        self._items.remove(addon)
+
+
+class Preferences(Struct):
+    def __init__(self):
+        self.addons = Addons()
+        self.active_section = "INTERFACE"
+
+
+class Context(Struct):
+    def __init__(self, data):
+        self._data = data
+        self._scene = None
+        self._view_layer = None
+        self.preferences = Preferences()
+        self.screen = None
+        self.window = None
+        self.area = None
+        self.region = None
+        self.window_manager = SimpleNamespace(
+            windows=[], addon_search="", addon_filter="", progress_begin=lambda *a: None,
+            progress_update=lambda *a: None, progress_end=lambda *a: None,
+            event_timer_add=lambda *a, **k: SimpleNamespace(),
+            event_timer_remove=lambda *a, **k: None,
+            modal_handler_add=lambda *a, **k: True,
+        )
+
+    @property
+    def scene(self):
+        if self._scene is None or self._scene not in self._data.scenes._items:
+            self._scene = self._data.scenes[0] if self._data.scenes else None
+        return self._scene
+
+    @scene.setter
+    def scene(self, scene):
+        self._scene = scene
+        self._view_layer = None
+
+    @property
+    def view_layer(self):
+        scene = self.scene
+        if self._view_layer is not None and self._view_layer in scene.view_layers._items:
+            return self._view_layer
+        return scene.view_layers[0]
+
+    @view_layer.setter
+    def view_layer(self, view_layer):
+        self._view_layer = view_layer
+
+    @contextmanager
+    def temp_override(self, **overrides):
+        saved = {key: getattr(self, key) for key in overrides}
+        try:
+            for key, value in overrides.items():
+                setattr(self, key, value)
+            yield self
+        finally:
+            for key, value in saved.items():
+                setattr(self, key, value)
@@ -0,0 +1,11 @@
+# SPDX-License-Identifier: GPL-3.0-or-later
+# Copyright (C) Roland Vyens
+"""Fake ``bpy.app``."""
+
+from . import handlers, timers, translations
+
+version = (4, 2, 0)
+version_string = "4.2.0"
+version_file = version
+background = True
+binary_path = ""
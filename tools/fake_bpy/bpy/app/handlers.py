@@ -0,0 +1,23 @@
+# SPDX-License-Identifier: GPL-3.0-or-later
+# Copyright (C) Roland Vyens
+"""Fake ``bpy.app.handlers``: plain lists, never called automatically."""
+
+depsgraph_update_pre = []
+depsgraph_update_post = []
+frame_change_pre = []
+frame_change_post = []
+load_pre = []
+load_post = []
+render_init = []
+render_pre = []
+render_post = []
+render_cancel = []
+render_complete = []
+render_write = []
+save_pre = []
+save_post = []
+
+
+def persistent(func):
+    func._bpy_persistent = True
+    return func
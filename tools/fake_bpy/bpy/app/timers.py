@@ -0,0 +1,18 @@
+# SPDX-License-Identifier: GPL-3.0-or-later
+# Copyright (C) Roland Vyens
+"""Fake ``bpy.app.timers``: registered functions are kept, never run."""
+
+_registered = []
+
+
+def register(function, first_interval=0.0, persistent=False):
+    if function not in _registered:
+        _registered.append(function)
+
+
+def unregister(function):
+    _registered.remove(function)
+
+
+def is_registered(function):
+    return function in _registered
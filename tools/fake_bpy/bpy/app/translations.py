@@ -0,0 +1,23 @@
+# SPDX-License-Identifier: GPL-3.0-or-later
+# Copyright (C) Roland Vyens
+"""Fake ``bpy.app.translations``: every message is returned untranslated."""
+
+_dicts = {}
+
+
+def register(module_name, translations_dict):
+    _dicts[module_name] = translations_dict
+
+
+def unregister(module_name):
+    _dicts.pop(module_name, None)
+
+
+def pgettext(msgid, msgctxt=None):
+    return msgid
+
+
+pgettext_iface = pgettext
+pgettext_tip = pgettext
+pgettext_rpt = pgettext
+pgettext_data = pgettext
@@ -0,0 +1,24 @@
+# SPDX-License-Identifier: GPL-3.0-or-later
+# Copyright (C) Roland Vyens
+"""Fake ``bpy.ops``: every operator call is recorded and returns FINISHED."""
+
+calls = []
+
+
+class _Operator:
+    def __init__(self, path):
+        self._path = path
+
+    def __getattr__(self, name):
+        return _Operator(f"{self._path}.{name}")
+
+    def __call__(self, *args, **kwargs):
+        calls.append((self._path, kwargs))
+        return {"FINISHED"}
+
+    def poll(self, *args):
+        return True
+
+
+def __getattr__(name):
+    return _Operator(name)
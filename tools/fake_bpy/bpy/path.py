@@ -0,0 +1,28 @@
+# SPDX-License-Identifier: GPL-3.0-or-later
+# Copyright (C) Roland Vyens
+"""Fake ``bpy.path``."""
+
+import os
+
+
+def abspath(path, start=None, library=None):
+    if not path.startswith("//"):
+        return path
+    import bpy
+    if start is None:
+        start = os.path.dirname(bpy.data.filepath)
+    return os.path.join(start, path[2:])
+
+
+def basename(path):
+    return os.path.basename(path[2:] if path.startswith("//") else path)
+
+
+def clean_name(name, replace="_"):
+    return "".join(c if c.isalnum() or c in "-." else replace for c in name)
+
+
+def ensure_ext(filepath, ext, case_sensitive=False):
+    if filepath.lower().endswith(ext.lower()):
+        return filepath
+    return filepath + ext
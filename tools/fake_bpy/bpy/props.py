@@ -0,0 +1,146 @@
+# SPDX-License-Identifier: GPL-3.0-or-later
+# Copyright (C) Roland Vyens
+"""Fake ``bpy.props``.
+
+Property definitions are data descriptors: assigning one to a class (as
+``bpy.types.Scene.IDS_X = BoolProperty(...)`` or through ``__annotations__``
+and ``register_class``) gives every instance its own value, starting at the
+declared default. ``update`` callbacks are called with ``(self, context)``.
+"""
+
+
+class _PropertyDef:
+    kind = ""
+    fallback = None
+
+    def __init__(self, **kwargs):
+        self.keywords = kwargs
+        self.name = None
+
+    def __set_name__(self, owner, name):
+        self.name = name
+
+    def default(self):
+        return self.keywords.get("default", self.fallback)
+
+    def _key(self):
+        return f"_prop_{id(self)}"
+
+    def __get__(self, obj, owner=None):
+        if obj is None:
+            return self
+        store = obj.__dict__
+        key = self._key()
+        if key not in store:
+            store[key] = self.default()
+        return store[key]
+
+    def __set__(self, obj, value):
+        obj.__dict__[self._key()] = value
+        update = self.keywords.get("update")
+        if update is not None:
+            import bpy
+            update(obj, bpy.context)
+
+
+class _BoolProperty(_PropertyDef):
+    kind = "BOOLEAN"
+    fallback = False
+
+
+class _IntProperty(_PropertyDef):
+    kind = "INT"
+    fallback = 0
+
+
+class _FloatProperty(_PropertyDef):
+    kind = "FLOAT"
+    fallback = 0.0
+
+
+class _StringProperty(_PropertyDef):
+    kind = "STRING"
+    fallback = ""
+
+
+class _EnumProperty(_PropertyDef):
+    kind = "ENUM"
+
+    def default(self):
+        items = self.keywords.get("items", ())
+        options = self.keywords.get("options", set())
+        if "default" in self.keywords:
+            return self.keywords["default"]
+        if "ENUM_FLAG" in options:
+            return set()
+        if callable(items) or not items:
+            return ""
+        return items[0][0]
+
+
+class _CollectionValue(list):
+    def __init__(self, item_type):
+        super().__init__()
+        self._type = item_type
+
+    def add(self):
+        item = self._type()
+        self.append(item)
+        return item
+
+    def clear(self):
+        del self[:]
+
+
+class _PointerProperty(_PropertyDef):
+    kind = "POINTER"
+
+    def default(self):
+        item_type = self.keywords.get("type")
+        return item_type() if isinstance(item_type, type) else None
+
+
+class _CollectionProperty(_PropertyDef):
+    kind = "COLLECTION"
+
+    def default(self):
+        return _CollectionValue(self.keywords.get("type"))
+
+
+class _FloatVectorProperty(_PropertyDef):
+    kind = "FLOAT"
+
+    def default(self):
+        return tuple(self.keywords.get("default", (0.0,) * self.keywords.get("size", 3)))
+
+
+def BoolProperty(**kwargs):
+    return _BoolProperty(**kwargs)
+
+
+def IntProperty(**kwargs):
+    return _IntProperty(**kwargs)
+
+
+def FloatProperty(**kwargs):
+    return _FloatProperty(**kwargs)
+
+
+def StringProperty(**kwargs):
+    return _StringProperty(**kwargs)
+
+
+def EnumProperty(**kwargs):
+    return _EnumProperty(**kwargs)
+
+
+def PointerProperty(**kwargs):
+    return _PointerProperty(**kwargs)
+
+
+def CollectionProperty(**kwargs):
+    return _CollectionProperty(**kwargs)
+
+
+def FloatVectorProperty(**kwargs):
+    return _FloatVectorProperty(**kwargs)
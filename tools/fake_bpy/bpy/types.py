@@ -0,0 +1,55 @@
+# SPDX-License-Identifier: GPL-3.0-or-later
+# Copyright (C) Roland Vyens
+"""Fake ``bpy.types``: model classes plus the UI base classes addons subclass."""
+
+from ._model import (  # noqa: F401
+    AOV,
+    ImageFormatSettings,
+    Material,
+    Node,
+    NodeLink,
+    NodeSocket,
+    NodeTree,
+    RenderSettings,
+    Scene,
+    Struct as bpy_struct,
+    ViewLayer,
+)
+
+ID = bpy_struct
+CompositorNodeTree = NodeTree
+ShaderNodeTree = NodeTree
+
+
+class _Registrable(bpy_struct):
+    bl_idname = ""
+    bl_label = ""
+    is_registered = False
+
+    def report(self, type, message):
+        self.reports = getattr(self, "reports", [])
+        self.reports.append((set(type), message))
+
+
+class Operator(_Registrable):
+    pass
+
+
+class Panel(_Registrable):
+    pass
+
+
+class Menu(_Registrable):
+    pass
+
+
+class UIList(_Registrable):
+    pass
+
+
+class PropertyGroup(bpy_struct):
+    pass
+
+
+class AddonPreferences(bpy_struct):
+    pass
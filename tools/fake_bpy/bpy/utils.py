@@ -0,0 +1,51 @@
+# SPDX-License-Identifier: GPL-3.0-or-later
+# Copyright (C) Roland Vyens
+"""Fake ``bpy.utils``."""
+
+import os
+import tempfile
+
+from .props import _PropertyDef
+from .types import AddonPreferences
+
+
+def _annotations(cls):
+    for klass in reversed(cls.__mro__):
+        for name, value in getattr(klass, "__annotations__", {}).items():
+            if isinstance(value, _PropertyDef):
+                yield name, value
+
+
+def register_class(cls):
+    for name, prop in _annotations(cls):
+        setattr(cls, name, prop)
+    if issubclass(cls, AddonPreferences):
+        import bpy
+        bpy.context.preferences.addons.new(cls.bl_idname, cls())
+    cls.is_registered = True
+
+
+def unregister_class(cls):
+    if issubclass(cls, AddonPreferences):
+        import bpy
+        addons = bpy.context.preferences.addons
+        addon = addons.get(cls.bl_idname)
+        if addon is not None:
+            addons.remove(addon)
+    cls.is_registered = False
+
+
+def resource_path(type, major=None, minor=None):
+    return os.path.join(tempfile.gettempdir(), "fake_bpy", type.lower())
+
+
+def register_classes_factory(classes):
+    def register():
+        for cls in classes:
+            register_class(cls)
+
+    def unregister():
+        for cls in reversed(classes):
+            unregister_class(cls)
+
+    return register, unregister
@@ -0,0 +1,52 @@
+# SPDX-License-Identifier: GPL-3.0-or-later
+# Copyright (C) Roland Vyens
+"""Enable the working copy of Industrial AOV Connector from a tool script.
+
+Shared by the scripts in ``tools/`` that run inside Blender (or on top of
+``tools/fake_bpy``). This file is a developer tool and is not part of the
+packaged addon.
+"""
+
+import importlib
+import os
+import sys
+import tempfile
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+ADDON_MODULE = "industrial_aov_connector"
+
+_module = ADDON_MODULE
+
+
+def enable_addon(module=None):
+    """Enable the addon and return its module name.
+
+    Args:
+        module: Module name of an installed copy (for example
+            ``bl_ext.user_default.industrial_aov_connector``). None enables
+            the working copy this script belongs to, linked into a temp
+            folder under an importable name.
+    """
+    global _module
+    import addon_utils
+    import bpy
+
+    if module is None:
+        module = ADDON_MODULE
+        link_root = os.path.join(tempfile.gettempdir(), "iac_tools_addon")
+        link = os.path.join(link_root, ADDON_MODULE)
+        os.makedirs(link_root, exist_ok=True)
+        if not os.path.exists(link):
+            os.symlink(REPO_DIR, link, target_is_directory=True)
+        if link_root not in sys.path:
+            sys.path.insert(0, link_root)
+    addon_utils.enable(module, default_set=True, handle_error=None)
+    if module not in bpy.context.preferences.addons:
+        raise RuntimeError(f"could not enable {module}")
+    _module = module
+    return module
+
+
+def addon(name=None):
+    """Import the enabled addon, or one of its submodules."""
+    return importlib.import_module(f"{_module}.{name}" if name else _module)
@@ -0,0 +1,243 @@
+# SPDX-License-Identifier: GPL-3.0-or-later
+# Copyright (C) Roland Vyens
+"""Cook the connector trees of many .blend files in background Blender.
+
+Driver mode (plain Python) spreads the files over ``--jobs`` background
+Blender processes, each running this script in worker mode on one file, and
+collects per-file timings and errors into a JSON report::
+
+    python tools/iac_batch_cook.py --blender /path/to/blender --jobs 8 \\
+        --output-dir cooked/ --report batch.json shots/*.blend
+
+Worker mode runs inside Blender on the file it was opened with. It enables
+the addon, cooks the active scene (or every scene with ``--all-scenes``)
+through ``core.cook.cook_scene`` and saves the file::
+
+    blender -b shot.blend --python tools/iac_batch_cook.py -- --worker \\
+        --result shot.json
+
+Without ``--output-dir`` files are saved in place; ``--dry-run`` cooks
+without saving. ``--manifest-dir`` also writes the render manifest
+(``core.manifest``) of every cooked scene. The exit code is 1 when any file or scene failed.
+
+This file is a developer tool and is not part of the packaged addon.
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+TOOLS_DIR = os.path.dirname(os.path.abspath(__file__))
+STDERR_TAIL = 2000
+
+
+def script_args(argv):
+    """Return the arguments after ``--`` when running inside Blender."""
+    if "--" in argv:
+        return argv[argv.index("--") + 1:]
+    return argv[1:]
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(prog="iac_batch_cook")
+    parser.add_argument("files", nargs="*", help=".blend files to cook")
+    parser.add_argument("--blender", default=os.environ.get("BLENDER", "blender"),
+                        help="Blender executable (default: $BLENDER or blender)")
+    parser.add_argument("--jobs", type=int, default=os.cpu_count() or 1,
+                        help="number of Blender processes run in parallel")
+    parser.add_argument("--timeout", type=float, default=None,
+                        help="seconds before a worker is killed")
+    parser.add_argument("--report", default="iac_batch_cook.json",
+                        help="JSON report written by the driver")
+    parser.add_argument("--output-dir",
+                        help="save cooked copies here instead of saving in place")
+    parser.add_argument("--all-scenes", action="store_true",
+                        help="cook every scene instead of the active one")
+    parser.add_argument("--enable-compositor", action="store_true",
+                        help="enable the compositor in scenes that have it off")
+    parser.add_argument("--dry-run", action="store_true",
+                        help="cook without saving")
+    parser.add_argument("--manifest-dir",
+                        help="write a render manifest JSON per cooked scene here")
+    parser.add_argument("--addon-module",
+                        help="module name of an installed addon, default is this working copy")
+    parser.add_argument("--worker", action="store_true", help=argparse.SUPPRESS)
+    parser.add_argument("--result", help=argparse.SUPPRESS)
+    return parser.parse_args(argv)
+
+
+# ---------------------------------------------------------------------------
+# Worker (inside Blender)
+# ---------------------------------------------------------------------------
+
+def cook_scene_report(scene, args, session):
+    """Cook one scene and return its report entry."""
+    import bpy
+    from iac_addon import addon
+
+    helpers = addon("handy_functions")
+    cook = addon("core.cook")
+    profiling = addon("core.profiling")
+    manifest = addon("core.manifest")
+
+    entry = {"scene": scene.name, "ok": False}
+    try:
+        if args.enable_compositor and not helpers.CompositorHelper.is_enabled(scene):
+            helpers.CompositorHelper.enable(scene)
+        cook.validate_scene(scene)
+        profiler = profiling.CookProfiler(helpers.CompositorHelper.get_node_tree(scene), "batch")
+        with bpy.context.temp_override(scene=scene):
+            cook.cook_scene(scene, profiler=profiler, session=session)
+        entry.update(profiler.to_dict(summary=profiler.summary()), ok=True)
+        if args.manifest_dir:
+            path = os.path.join(
+                os.path.abspath(args.manifest_dir),
+                os.path.basename(manifest.default_manifest_path(scene)),
+            )
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            manifest.write_manifest(scene, path)
+            entry["manifest"] = path
+    except Exception as e:
+        entry["error"] = f"{type(e).__name__}: {e}"
+    return entry
+
+
+def run_worker(args):
+    import bpy
+    sys.path.insert(0, TOOLS_DIR)
+    from iac_addon import enable_addon
+
+    result = {"file": bpy.data.filepath, "ok": False, "scenes": []}
+    start = time.perf_counter()
+    try:
+        enable_addon(args.addon_module)
+        from iac_addon import addon
+        session = addon("core.cook").CookSession()
+        scenes = list(bpy.data.scenes) if args.all_scenes else [bpy.context.scene]
+        for scene in scenes:
+            result["scenes"].append(cook_scene_report(scene, args, session))
+
+        if args.dry_run:
+            result["saved"] = None
+        elif args.output_dir:
+            path = os.path.join(os.path.abspath(args.output_dir), os.path.basename(bpy.data.filepath))
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            bpy.ops.wm.save_as_mainfile(filepath=path, copy=True)
+            result["saved"] = path
+        else:
+            bpy.ops.wm.save_mainfile()
+            result["saved"] = bpy.data.filepath
+        result["ok"] = all(s["ok"] for s in result["scenes"])
+    except Exception as e:
+        result["error"] = f"{type(e).__name__}: {e}"
+    result["seconds"] = time.perf_counter() - start
+
+    text = json.dumps(result, indent=2)
+    if args.result:
+        with open(args.result, "w", encoding="utf-8") as f:
+            f.write(text)
+    else:
+        print(text)
+    return 0 if result["ok"] else 1
+
+
+# ---------------------------------------------------------------------------
+# Driver (plain Python)
+# ---------------------------------------------------------------------------
+
+def worker_command(args, path, result_path):
+    """Return the command line cooking ``path`` in a background Blender."""
+    command = [
+        args.blender, "-b", "--factory-startup", path,
+        "--python", os.path.abspath(__file__), "--",
+        "--worker", "--result", result_path,
+    ]
+    if args.output_dir:
+        command += ["--output-dir", os.path.abspath(args.output_dir)]
+    if args.manifest_dir:
+        command += ["--manifest-dir", os.path.abspath(args.manifest_dir)]
+    if args.addon_module:
+        command += ["--addon-module", args.addon_module]
+    for flag in ("all_scenes", "enable_compositor", "dry_run"):
+        if getattr(args, flag):
+            command.append("--" + flag.replace("_", "-"))
+    return command
+
+
+def run_file(args, number, path, result_dir):
+    """Cook ``path`` in its own Blender process and return its report entry."""
+    result_path = os.path.join(result_dir, f"{number:04d}.json")
+    entry = {"file": path, "ok": False}
+    start = time.perf_counter()
+    try:
+        process = subprocess.run(
+            worker_command(args, path, result_path),
+            capture_output=True, text=True, errors="replace", timeout=args.timeout,
+        )
+        entry["returncode"] = process.returncode
+        if process.returncode != 0:
+            entry["stderr"] = process.stderr[-STDERR_TAIL:]
+    except (OSError, subprocess.TimeoutExpired) as e:
+        entry["error"] = f"{type(e).__name__}: {e}"
+    entry["wall_seconds"] = time.perf_counter() - start
+
+    if os.path.exists(result_path):
+        with open(result_path, encoding="utf-8") as f:
+            worker = json.load(f)
+        worker.pop("file", None)
+        entry.update(worker)
+    elif "error" not in entry:
+        entry["error"] = "worker wrote no result (crashed before cooking?)"
+    return entry
+
+
+def run_driver(args):
+    files = [os.path.abspath(f) for f in args.files]
+    if not files:
+        raise SystemExit("no .blend files given")
+    missing = [f for f in files if not os.path.isfile(f)]
+    if missing:
+        raise SystemExit("not found: " + ", ".join(missing))
+
+    start = time.perf_counter()
+    with tempfile.TemporaryDirectory(prefix="iac_batch_cook_") as result_dir:
+        with ThreadPoolExecutor(max_workers=max(1, args.jobs)) as pool:
+            entries = list(pool.map(
+                lambda item: run_file(args, *item, result_dir), enumerate(files)
+            ))
+
+    report = {
+        "blender": args.blender,
+        "jobs": args.jobs,
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "wall_seconds": time.perf_counter() - start,
+        "failed": sum(1 for e in entries if not e["ok"]),
+        "files": entries,
+    }
+    with open(args.report, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+
+    for entry in entries:
+        status = "ok" if entry["ok"] else "FAILED"
+        print(f"{os.path.basename(entry['file']):40s} {status:6s} {entry['wall_seconds']:7.2f}s")
+        if entry.get("error"):
+            print(f"    {entry['error']}")
+        for scene in entry.get("scenes", []):
+            print(f"    {scene['scene']}: {scene.get('summary') or scene.get('error')}")
+    print(f"[iac_batch_cook] {len(entries) - report['failed']}/{len(entries)} files cooked "
+          f"in {report['wall_seconds']:.2f}s, wrote {args.report}")
+    return 1 if report["failed"] else 0
+
+
+def main(argv=None):
+    args = parse_args(script_args(sys.argv) if argv is None else argv)
+    sys.exit(run_worker(args) if args.worker else run_driver(args))
+
+
+if __name__ == "__main__":
+    main()
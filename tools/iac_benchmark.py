@@ -0,0 +1,394 @@
+# SPDX-License-Identifier: GPL-3.0-or-later
+# Copyright (C) Roland Vyens
+"""Scaling benchmark for Industrial AOV Connector.
+
+Runs inside Blender in background mode, builds synthetic scenes and times the
+cook pipeline (connect, arrange, rename_outputs, TokenReplacer).
+
+Usage::
+
+    blender -b --factory-startup --python tools/iac_benchmark.py -- \\
+        --layers 4,16,64 --lightgroups 4 --aovs 8 --data-layers 2 \\
+        --crypto-layers 2 --modes separate,all_in_one,adv \\
+        --blend layer_demo.blend --output bench.json
+
+    # Compare against a stored run, exit code 1 on regression
+    blender -b --factory-startup --python tools/iac_benchmark.py -- \\
+        --output new.json --baseline bench.json --tolerance 0.25
+
+This file is a developer tool and is not part of the packaged addon.
+"""
+
+import argparse
+import json
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+import bpy
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from iac_addon import addon, enable_addon  # noqa: E402
+
+MODES = ("separate", "all_in_one", "adv")
+
+COLOR_PASSES = (
+    "use_pass_combined",
+    "use_pass_diffuse_direct",
+    "use_pass_diffuse_indirect",
+    "use_pass_diffuse_color",
+    "use_pass_glossy_direct",
+    "use_pass_glossy_indirect",
+    "use_pass_glossy_color",
+    "use_pass_transmission_direct",
+    "use_pass_emit",
+    "use_pass_environment",
+    "use_pass_ambient_occlusion",
+)
+DATA_PASSES = (
+    "use_pass_z",
+    "use_pass_mist",
+    "use_pass_normal",
+    "use_pass_position",
+    "use_pass_vector",
+    "use_pass_uv",
+    "use_pass_object_index",
+    "use_pass_material_index",
+)
+CRYPTO_PASSES = (
+    "use_pass_cryptomatte_object",
+    "use_pass_cryptomatte_material",
+    "use_pass_cryptomatte_asset",
+)
+
+
+# =============================================================================
+# Setup
+# =============================================================================
+
+def _enable(owner, names):
+    for name in names:
+        if hasattr(owner, name):
+            setattr(owner, name, True)
+
+
+def build_scene(name, layers, lightgroups, aovs, data_layers, crypto_layers):
+    """Create a synthetic scene.
+
+    Args:
+        name: Scene name
+        layers: Number of regular view layers
+        lightgroups: Light groups per regular layer
+        aovs: Material AOVs per regular layer
+        data_layers: Number of DATA (-_-exP_) view layers
+        crypto_layers: Number of regular layers with Cryptomatte enabled
+    """
+    helpers = addon("handy_functions")
+    constants = addon("constants")
+    tree_plan = addon("core.tree_plan")
+
+    scene = bpy.data.scenes.new(name)
+    scene.render.engine = "CYCLES"
+    scene.render.filepath = os.path.join(tempfile.gettempdir(), "iac_benchmark", name, "")
+    helpers.CompositorHelper.enable(scene)
+
+    names = [f"Layer{i:03d}" for i in range(layers)]
+    names += [
+        f"{constants.DATA_LAYER_PREFIX}Layer{i:03d}{constants.DATA_LAYER_SUFFIX}"
+        for i in range(data_layers)
+    ]
+    scene.view_layers[0].name = names[0]
+    for layer_name in names[1:]:
+        scene.view_layers.new(layer_name)
+
+    for i, view_layer in enumerate(scene.view_layers):
+        if tree_plan.is_data_layer(view_layer.name):
+            _enable(view_layer, DATA_PASSES)
+            continue
+        _enable(view_layer, COLOR_PASSES)
+        _enable(view_layer, DATA_PASSES)
+        if i < crypto_layers:
+            _enable(view_layer, CRYPTO_PASSES)
+        if hasattr(view_layer, "cycles"):
+            view_layer.cycles.denoising_store_passes = True
+        for g in range(lightgroups):
+            view_layer.lightgroups.add(name=f"lg_{g:02d}")
+        for a in range(aovs):
+            aov = view_layer.aovs.add()
+            aov.name = f"aov_{a:02d}"
+            aov.type = "COLOR" if a % 2 else "VALUE"
+    return scene
+
+
+def build_aov_materials(count):
+    """Create ``count`` materials, each with one AOV Output node.
+
+    Material ``i`` writes ``aov_{i:02d}``, so the first materials match the
+    AOVs ``build_scene`` puts on the view layers and the rest are new.
+    """
+    materials = []
+    for i in range(count):
+        material = bpy.data.materials.new(f"IAC_Bench_AOV_{i:02d}")
+        material.use_nodes = True
+        node = material.node_tree.nodes.new("ShaderNodeOutputAOV")
+        node.name = f"aov_{i:02d}"
+        materials.append(material)
+    return materials
+
+
+def configure(scene, mode):
+    """Set the scene properties that select a cook mode."""
+    scene.IDS_ConfIg = "OPTION2" if mode == "all_in_one" else "OPTION1"
+    scene.IDS_AdvMode = mode == "adv"
+    scene.IDS_UseDATALayer = mode == "adv"
+    scene.IDS_UsedN = True
+
+
+# =============================================================================
+# Timing
+# =============================================================================
+
+def timed(func, repeat, setup=None):
+    """Run ``func`` ``repeat`` times and return wall times in seconds."""
+    runs = []
+    for _ in range(repeat):
+        if setup is not None:
+            setup()
+        start = time.perf_counter()
+        func()
+        runs.append(time.perf_counter() - start)
+    return runs
+
+
+def summary(runs):
+    return {
+        "min": min(runs),
+        "median": statistics.median(runs),
+        "runs": runs,
+    }
+
+
+def run_case(scene, mode, repeat):
+    """Time one scene in one cook mode."""
+    node_builder = addon("core.node_builder")
+    sort_passes = addon("sort_passes")
+    renderpath = addon("renderpath_preset")
+    helpers = addon("handy_functions")
+
+    configure(scene, mode)
+    tree = helpers.CompositorHelper.get_node_tree(scene)
+
+    def connect():
+        connector = node_builder.NodeConnector(scene)
+        if mode == "adv":
+            connector.connect_all_adv()
+        else:
+            connector.connect_all()
+
+    def cold_setup():
+        tree.nodes.clear()
+        sort_passes.clear_pass_cache()
+
+    def arrange():
+        node_builder.NodeArranger(scene).arrange()
+
+    def tokens():
+        replacer = renderpath.TokenReplacer(scene)
+        replacer.replace()
+        replacer.restore()
+
+    metrics = {
+        "connect_cold": summary(timed(connect, repeat, cold_setup)),
+        "connect_warm": summary(timed(connect, repeat)),
+        "arrange_all": summary(timed(lambda: node_builder.NodeArranger(scene).arrange_all(), repeat)),
+        "arrange_layout": summary(timed(arrange, repeat)),
+        "arrange_unchanged": summary(timed(lambda: node_builder.NodeArranger(scene).arrange_all(set()), repeat)),
+        "rename_outputs": summary(timed(lambda: node_builder.NodeArranger(scene).rename_outputs(), repeat)),
+        "token_replace": summary(timed(tokens, repeat)),
+    }
+    counts = {
+        "view_layers": len(scene.view_layers),
+        "nodes": len(tree.nodes),
+        "links": len(tree.links),
+    }
+    return {"metrics": metrics, "counts": counts}
+
+
+def run_aov_case(scene, repeat, aovs, stale):
+    """Time DataLayerHelper.auto_set_aov on a scene with AOV materials.
+
+    ``aov_sync_cold`` starts every run from view layers holding ``aovs``
+    matching and ``stale`` obsolete AOVs; ``aov_sync_warm`` runs on layers
+    that are already in sync.
+    """
+    helpers = addon("handy_functions")
+    aov_index = addon("aov_index")
+    counts = {}
+
+    def cold_setup():
+        aov_index.clear_aov_index()
+        for view_layer in scene.view_layers:
+            for aov in list(view_layer.aovs):
+                view_layer.aovs.remove(aov)
+            for a in range(aovs):
+                view_layer.aovs.add().name = f"aov_{a:02d}"
+            for a in range(stale):
+                view_layer.aovs.add().name = f"stale_{a:02d}"
+
+    def sync():
+        counts["added"], counts["removed"] = helpers.DataLayerHelper.auto_set_aov(scene)
+
+    metrics = {"aov_sync_cold": summary(timed(sync, repeat, cold_setup))}
+    cold_counts = dict(counts)
+    metrics["aov_sync_warm"] = summary(timed(sync, repeat))
+    return {
+        "metrics": metrics,
+        "counts": {
+            "view_layers": len(scene.view_layers),
+            "materials": len(bpy.data.materials),
+            "aovs_added": cold_counts["added"],
+            "aovs_removed": cold_counts["removed"],
+            "aovs_changed_warm": counts["added"] + counts["removed"],
+        },
+    }
+
+
+def run_aov_materials_case(scene, args):
+    """Run ``run_aov_case`` with temporary AOV materials."""
+    materials = build_aov_materials(args.material_aovs)
+    try:
+        return run_aov_case(scene, args.repeat, args.aovs, args.aovs)
+    finally:
+        for material in materials:
+            bpy.data.materials.remove(material)
+
+
+def in_scene(scene, func, *args):
+    """Run ``func`` with ``scene`` and its first view layer as context."""
+    with bpy.context.temp_override(scene=scene, view_layer=scene.view_layers[0]):
+        return func(scene, *args)
+
+
+# =============================================================================
+# Baseline comparison
+# =============================================================================
+
+def compare(results, baseline, tolerance, min_delta):
+    """Return a list of regressions of ``results`` against ``baseline``.
+
+    A metric regresses when its median is slower than the baseline median by
+    more than ``tolerance`` (relative) and ``min_delta`` seconds (absolute).
+    """
+    regressions = []
+    for case, data in results["cases"].items():
+        base_case = baseline.get("cases", {}).get(case)
+        if base_case is None:
+            continue
+        for metric, values in data["metrics"].items():
+            base = base_case["metrics"].get(metric)
+            if base is None:
+                continue
+            new, old = values["median"], base["median"]
+            if new > old * (1 + tolerance) and new - old > min_delta:
+                regressions.append((case, metric, old, new))
+    return regressions
+
+
+# =============================================================================
+# Entry point
+# =============================================================================
+
+def parse_args():
+    argv = sys.argv[sys.argv.index("--") + 1:] if "--" in sys.argv else []
+    parser = argparse.ArgumentParser(prog="iac_benchmark")
+    parser.add_argument("--layers", default="4,16,64",
+                        help="comma separated regular view layer counts")
+    parser.add_argument("--lightgroups", type=int, default=4)
+    parser.add_argument("--aovs", type=int, default=8)
+    parser.add_argument("--data-layers", type=int, default=2)
+    parser.add_argument("--crypto-layers", type=int, default=2)
+    parser.add_argument("--material-aovs", type=int, default=30,
+                        help="AOV materials for the aov_sync case, 0 skips it")
+    parser.add_argument("--modes", default=",".join(MODES))
+    parser.add_argument("--blend", action="append", default=[],
+                        help="real .blend fixture, timed on its active scene")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--output", default="iac_benchmark.json")
+    parser.add_argument("--baseline", help="JSON of a previous run to compare with")
+    parser.add_argument("--tolerance", type=float, default=0.25,
+                        help="allowed relative slowdown of a median")
+    parser.add_argument("--min-delta", type=float, default=0.002,
+                        help="ignore slowdowns smaller than this many seconds")
+    return parser.parse_args(argv)
+
+
+def main():
+    args = parse_args()
+    enable_addon()
+    modes = [m for m in args.modes.split(",") if m]
+    for mode in modes:
+        if mode not in MODES:
+            raise SystemExit(f"unknown mode {mode!r}, expected one of {MODES}")
+
+    results = {
+        "blender": bpy.app.version_string,
+        "addon_version": ".".join(str(v) for v in addon().bl_info["version"]),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "cases": {},
+    }
+
+    for layers in (int(n) for n in args.layers.split(",") if n):
+        params = {
+            "layers": layers,
+            "lightgroups": args.lightgroups,
+            "aovs": args.aovs,
+            "data_layers": args.data_layers,
+            "crypto_layers": args.crypto_layers,
+        }
+        name = "L{layers}-G{lightgroups}-A{aovs}-D{data_layers}-C{crypto_layers}".format(**params)
+        scene = build_scene(f"IAC_Bench_{name}", **params)
+        for mode in modes:
+            case = f"{mode}-{name}"
+            print(f"[iac_benchmark] {case}")
+            results["cases"][case] = dict(params=params, **in_scene(scene, run_case, mode, args.repeat))
+        if args.material_aovs:
+            case = f"aov_sync-{name}-M{args.material_aovs}"
+            print(f"[iac_benchmark] {case}")
+            results["cases"][case] = dict(
+                params=dict(params, material_aovs=args.material_aovs),
+                **run_aov_materials_case(scene, args),
+            )
+        bpy.data.scenes.remove(scene)
+
+    for blend in args.blend:
+        bpy.ops.wm.open_mainfile(filepath=os.path.abspath(blend))
+        scene = bpy.context.scene
+        for mode in modes:
+            case = f"{mode}-{os.path.basename(blend)}"
+            print(f"[iac_benchmark] {case}")
+            results["cases"][case] = dict(params={"blend": blend}, **in_scene(scene, run_case, mode, args.repeat))
+
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(results, f, indent=2)
+    print(f"[iac_benchmark] wrote {args.output}")
+
+    for case, data in results["cases"].items():
+        line = "  ".join(f"{k}={v['median'] * 1000:.1f}ms" for k, v in data["metrics"].items())
+        print(f"{case:40s} {line}")
+
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)
+        regressions = compare(results, baseline, args.tolerance, args.min_delta)
+        for case, metric, old, new in regressions:
+            print(f"[iac_benchmark] REGRESSION {case} {metric}: "
+                  f"{old * 1000:.1f}ms -> {new * 1000:.1f}ms")
+        if regressions:
+            sys.exit(1)
+        print("[iac_benchmark] no regressions against baseline")
+
+
+if __name__ == "__main__":
+    main()
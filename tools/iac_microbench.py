@@ -0,0 +1,195 @@
+# SPDX-License-Identifier: GPL-3.0-or-later
+# Copyright (C) Roland Vyens
+"""CPython microbenchmark for Industrial AOV Connector.
+
+Runs without Blender on top of the fake ``bpy`` in ``tools/fake_bpy``. It
+reuses the synthetic scenes of ``iac_benchmark`` and times the pure-Python
+parts of a cook (PassSorter, TreePlanner, PathManager, TokenReplacer) next to
+the node builders and the arranger running against fake node trees.
+
+Absolute numbers say nothing about Blender, which pays RNA overhead on every
+attribute access; use the medians to compare two revisions of the addon on
+the same machine.
+
+Usage::
+
+    python tools/iac_microbench.py --layers 4,16,64 --output micro.json
+    python tools/iac_microbench.py --blender-version 5.0 --baseline micro.json
+
+This file is a developer tool and is not part of the packaged addon.
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import sys
+import time
+
+TOOLS_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(TOOLS_DIR, "fake_bpy"))
+sys.path.insert(0, TOOLS_DIR)
+
+import bpy  # noqa: E402  (fake bpy from tools/fake_bpy)
+import iac_benchmark as bench  # noqa: E402
+
+
+def quiet(func):
+    """Wrap ``func`` so the addon's progress prints do not skew timings."""
+    def run():
+        with contextlib.redirect_stdout(io.StringIO()):
+            return func()
+    return run
+
+
+def run_pure_case(scene, mode, repeat):
+    """Time the parts of a cook that do not create nodes."""
+    sort_passes = bench.addon("sort_passes")
+    node_builder = bench.addon("core.node_builder")
+    tree_plan = bench.addon("core.tree_plan")
+    path_modify = bench.addon("path_modify_v2")
+
+    bench.configure(scene, mode)
+
+    def sort():
+        return sort_passes.PassSorter(scene).sort()
+
+    viewlayer_full, viewlayers = quiet(sort)()
+    builder = node_builder.TreeBuilder(scene)
+    settings = builder.plan_settings()
+    planner = tree_plan.TreePlanner(settings)
+
+    def paths():
+        manager = path_modify.PathManager(scene)
+        for view_layer in viewlayers:
+            for output_type in ("RGBA", "DATA", "Cryptomatte"):
+                manager.create_final_path(view_layer, output_type)
+
+    plan = planner.plan(viewlayer_full, viewlayers)
+    metrics = {
+        "sort_cold": bench.summary(bench.timed(quiet(sort), repeat, sort_passes.clear_pass_cache)),
+        "sort_warm": bench.summary(bench.timed(quiet(sort), repeat)),
+        "plan": bench.summary(bench.timed(lambda: planner.plan(viewlayer_full, viewlayers), repeat)),
+        "final_path": bench.summary(bench.timed(paths, repeat)),
+    }
+    counts = dict(plan.stats())
+    return {"metrics": metrics, "counts": counts}
+
+
+def run_link_case(scene, mode, repeat):
+    """Time link application alone, on a built tree without links."""
+    node_builder = bench.addon("core.node_builder")
+    helpers = bench.addon("handy_functions")
+
+    bench.configure(scene, mode)
+    tree = helpers.CompositorHelper.get_node_tree(scene)
+    state = {}
+
+    def setup():
+        tree.links.clear()
+        builder = node_builder.TreeBuilder(scene)
+        quiet(builder.build_all)()
+        state["builder"] = builder
+
+    def link():
+        builder = state["builder"]
+        builder.applier.apply_links(builder.plan)
+
+    return {"link_cold": bench.summary(bench.timed(link, repeat, setup))}
+
+
+def run_case(scene, mode, repeat):
+    pure = run_pure_case(scene, mode, repeat)
+    tree = quiet(lambda: bench.run_case(scene, mode, repeat))()
+    pure["metrics"].update(tree["metrics"])
+    pure["metrics"].update(run_link_case(scene, mode, repeat))
+    pure["counts"].update(tree["counts"])
+    return pure
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(prog="iac_microbench")
+    parser.add_argument("--blender-version", default="4.2",
+                        help="emulated Blender version, e.g. 4.2 or 5.0")
+    parser.add_argument("--layers", default="4,16,64",
+                        help="comma separated regular view layer counts")
+    parser.add_argument("--lightgroups", type=int, default=4)
+    parser.add_argument("--aovs", type=int, default=8)
+    parser.add_argument("--data-layers", type=int, default=2)
+    parser.add_argument("--crypto-layers", type=int, default=2)
+    parser.add_argument("--material-aovs", type=int, default=30,
+                        help="AOV materials for the aov_sync case, 0 skips it")
+    parser.add_argument("--modes", default=",".join(bench.MODES))
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--output", default="iac_microbench.json")
+    parser.add_argument("--baseline", help="JSON of a previous run to compare with")
+    parser.add_argument("--tolerance", type=float, default=0.25,
+                        help="allowed relative slowdown of a median")
+    parser.add_argument("--min-delta", type=float, default=0.0005,
+                        help="ignore slowdowns smaller than this many seconds")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    version = tuple(int(v) for v in args.blender_version.split(".")) + (0,) * 3
+    bpy.reset(version=version[:3])
+    bench.enable_addon()
+    modes = [m for m in args.modes.split(",") if m]
+    for mode in modes:
+        if mode not in bench.MODES:
+            raise SystemExit(f"unknown mode {mode!r}, expected one of {bench.MODES}")
+
+    results = {
+        "blender": f"fake {bpy.app.version_string}",
+        "python": sys.version.split()[0],
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "cases": {},
+    }
+
+    for layers in (int(n) for n in args.layers.split(",") if n):
+        params = {
+            "layers": layers,
+            "lightgroups": args.lightgroups,
+            "aovs": args.aovs,
+            "data_layers": args.data_layers,
+            "crypto_layers": args.crypto_layers,
+        }
+        name = "L{layers}-G{lightgroups}-A{aovs}-D{data_layers}-C{crypto_layers}".format(**params)
+        scene = bench.build_scene(f"IAC_Micro_{name}", **params)
+        for mode in modes:
+            case = f"{mode}-{name}"
+            print(f"[iac_microbench] {case}")
+            results["cases"][case] = dict(params=params, **bench.in_scene(scene, run_case, mode, args.repeat))
+        if args.material_aovs:
+            case = f"aov_sync-{name}-M{args.material_aovs}"
+            print(f"[iac_microbench] {case}")
+            results["cases"][case] = dict(
+                params=dict(params, material_aovs=args.material_aovs),
+                **bench.run_aov_materials_case(scene, args),
+            )
+        bpy.data.scenes.remove(scene)
+
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(results, f, indent=2)
+    print(f"[iac_microbench] wrote {args.output}")
+
+    for case, data in results["cases"].items():
+        line = "  ".join(f"{k}={v['median'] * 1000:.2f}ms" for k, v in data["metrics"].items())
+        print(f"{case:40s} {line}")
+
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)
+        regressions = bench.compare(results, baseline, args.tolerance, args.min_delta)
+        for case, metric, old, new in regressions:
+            print(f"[iac_microbench] REGRESSION {case} {metric}: "
+                  f"{old * 1000:.2f}ms -> {new * 1000:.2f}ms")
+        if regressions:
+            sys.exit(1)
+        print("[iac_microbench] no regressions against baseline")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,130 @@
+# SPDX-License-Identifier: GPL-3.0-or-later
+# Copyright (C) Roland Vyens
+"""Check the rendered frames of render manifests without Blender.
+
+Reads manifests written by ``compositor.export_manifest`` (or
+``iac_batch_cook.py --manifest-dir``) and scans every unmuted output for
+missing, empty, truncated and non-EXR frames with ``core/output_scan.py``.
+``--channels`` also compares the channels in the EXR headers with the slots
+of each output. Prints the frames to resubmit per output and exits with 1
+when any frame is bad::
+
+    python tools/iac_output_scan.py shots/*_manifest.json --jobs 32
+    python tools/iac_output_scan.py shot_manifest.json --frames 1001-1100 \\
+        --headers --output scan.json
+    python tools/iac_output_scan.py shot_manifest.json --channels --first 10
+
+This file is a developer tool and is not part of the packaged addon.
+"""
+
+import argparse
+import importlib.util
+import json
+import os
+import sys
+import time
+import types
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def load_output_scan():
+    """Import ``core/output_scan.py`` and ``core/exr_header.py`` without the
+    addon package, whose ``__init__`` needs bpy."""
+    core_dir = os.path.join(REPO_DIR, "core")
+    package = types.ModuleType("iac_core")
+    package.__path__ = [core_dir]
+    sys.modules["iac_core"] = package
+    module = None
+    for name in ("exr_header", "output_scan"):
+        spec = importlib.util.spec_from_file_location(
+            f"iac_core.{name}", os.path.join(core_dir, f"{name}.py")
+        )
+        module = importlib.util.module_from_spec(spec)
+        sys.modules[spec.name] = module
+        spec.loader.exec_module(module)
+    return module
+
+
+def parse_frames(text):
+    """Parse ``"1-10,12,20-30x2"`` into (frames, step)."""
+    frames = []
+    step = 1
+    for part in text.split(","):
+        part = part.strip()
+        if not part:
+            continue
+        if "-" in part[1:]:
+            start, _, end = part[1:].partition("-")
+            start = part[0] + start
+            end, _, by = end.partition("x")
+            step = int(by) if by else 1
+            frames.extend(range(int(start), int(end) + 1, step))
+        else:
+            frames.append(int(part))
+    return frames, step
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(prog="iac_output_scan")
+    parser.add_argument("manifests", nargs="+", help="render manifest JSON files")
+    parser.add_argument("--frames", help="frames to check, e.g. 1001-1100; default is the manifest range")
+    parser.add_argument("--jobs", type=int, default=16,
+                        help="threads for directory listings, stat calls and header reads")
+    parser.add_argument("--headers", action="store_true",
+                        help="read the EXR header of every frame, not only suspiciously small ones")
+    parser.add_argument("--channels", action="store_true",
+                        help="compare the channels of every EXR header with the output slots")
+    parser.add_argument("--first", type=int,
+                        help="with --channels, audit only the first N existing frames per output")
+    parser.add_argument("--output", help="write the full report as JSON")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    output_scan = load_output_scan()
+    scanner = output_scan.OutputScanner(args.jobs, args.headers)
+
+    start = time.perf_counter()
+    results = []
+    for path in args.manifests:
+        with open(path, encoding="utf-8") as f:
+            manifest = json.load(f)
+        if args.frames:
+            frames, step = parse_frames(args.frames)
+        else:
+            rng = manifest["frames"]
+            step = rng["step"]
+            frames = range(rng["start"], rng["end"] + 1, step)
+        outputs = [o for o in manifest["outputs"] if not o.get("mute")]
+        reports = scanner.scan(outputs, frames, step)
+        result = {"manifest": path, "scene": manifest.get("scene"), "outputs": reports}
+        if args.channels:
+            result["channels"] = scanner.audit(outputs, frames, step, args.first)
+        results.append(result)
+
+        print(f"{manifest.get('scene')} ({os.path.basename(path)})")
+        for report in reports:
+            status = "ok" if report["ok"] else f"resubmit {report['resubmit']}"
+            label = report["node"] if report.get("slot") is None else f"{report['node']} [{report['slot']}]"
+            print(f"    {label:40s} {report['present']:5d}/{report['expected']:<5d} {status}")
+        for audit in result.get("channels", ()):
+            if audit["ok"]:
+                continue
+            print(f"    {audit['node']:40s} channels: frames {audit['layout_frames'] or '-'}")
+            for key in ("missing_channels", "unexpected_channels", "wrong_type_channels"):
+                if audit[key]:
+                    print(f"        {key.split('_')[0]}: {', '.join(audit[key])}")
+
+    elapsed = time.perf_counter() - start
+    bad = sum(1 for r in results for o in r["outputs"] + r.get("channels", []) if not o["ok"])
+    print(f"[iac_output_scan] {bad} incomplete outputs, scanned in {elapsed:.2f}s")
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump({"seconds": elapsed, "manifests": results}, f, indent=1)
+    return 1 if bad else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
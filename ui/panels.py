@@ -5,13 +5,19 @@
 import bpy
 
 from ..handy_functions import BlenderCompat, CompositorHelper, IDS_OT_Open_Preference
+from ..core.codec_bench import load_report
 from ..operators import (
     Compositor_OT_enable_use_nodes,
     IDS_OT_Turn_Denoise,
     IDS_OT_Make_Tree,
+    IDS_OT_Make_Tree_Scenes,
     IDS_OT_Update_Tree,
     IDS_OT_Arr_Tree,
+    IDS_OT_Export_Manifest,
     IDS_OT_Delete_Trash,
+    IDS_OT_Scan_Outputs,
+    IDS_OT_Benchmark_Codecs,
+    IDS_OT_Apply_Codec_Recommendation,
     IDS_OT_CloudMode,
     IDS_OT_Draw_DataMenu,
     IDS_OT_Convert_DATALayer,
@@ -21,6 +27,36 @@ from ..operators import (
 
 
 
+def draw_codec_report(layout, report):
+    """Draw the codec benchmark table, recommended codecs are highlighted."""
+    recommended = report["recommended"]
+    box = layout.box()
+    width, height = report["resolution"]
+    box.label(
+        text=bpy.app.translations.pgettext_iface("Codec Benchmark ({width}x{height}):").format(
+            width=width, height=height
+        ),
+        icon="TIME",
+    )
+    col = box.column(align=True)
+    header = col.row(align=True)
+    for title in ("Output", "Codec", "Depth", "Size", "Write", "Read"):
+        header.label(text=title)
+    for row in report["results"]:
+        picked = recommended.get(row["output_type"]) == row["codec"]
+        line = col.row(align=True)
+        line.label(text=row["output_type"])
+        line.label(text=row["codec"], icon="CHECKMARK" if picked else "BLANK1")
+        line.label(text=f"{row['depth']} bit")
+        line.label(text=f"{row['bytes'] / 1048576:.2f} MB")
+        line.label(text=f"{row['write_ms']:.0f} ms")
+        line.label(text=f"{row['read_ms']:.0f} ms")
+    box.label(
+        text=" / ".join(f"{output_type}: {codec}" for output_type, codec in recommended.items())
+    )
+    box.operator(IDS_OT_Apply_Codec_Recommendation.bl_idname, icon="CHECKMARK")
+
+
 class IDS_PT_OutputPanel_Base:
 
     def draw_header(self, context):
@@ -84,8 +120,14 @@ class IDS_PT_OutputPanel_Base:
         row = box.row()
         row.prop(context.scene, "IDS_FileloC", toggle=True)
         row.prop(context.scene, "IDS_UsedN", toggle=True)
+        if context.scene.IDS_UsedN is True:
+            box.prop(context.scene, "IDS_DenoisePolicy")
+            box.prop(context.scene, "IDS_ShareDenoiseAux", toggle=True)
         box.prop(context.scene, "IDS_SepCryptO", toggle=True)
         box.prop(context.scene, "IDS_ArtDepth", toggle=True)
+        box.prop(context.scene, "IDS_SplitHalfData", toggle=True)
+        box.label(text="Split RGBA:")
+        box.row().prop(context.scene, "IDS_RGBASplitGroups")
         box.prop(context.scene, "IDS_UseDeepEXR", toggle=True)
         if bpy.context.scene.IDS_AdvMode is True:
             box1 = layout.box()
@@ -95,6 +137,17 @@ class IDS_PT_OutputPanel_Base:
             box1.prop(context.scene, "IDS_DATACompression")
             if bpy.context.scene.IDS_SepCryptO is True:
                 box1.prop(context.scene, "IDS_CryptoCompression")
+            split_groups = context.scene.IDS_RGBASplitGroups
+            if "LIGHTGROUPS" in split_groups:
+                box1.prop(context.scene, "IDS_LightgroupCompression")
+            if "SHADING" in split_groups:
+                box1.prop(context.scene, "IDS_ShadingCompression")
+            if "AOVS" in split_groups:
+                box1.prop(context.scene, "IDS_AOVCompression")
+            box1.operator(IDS_OT_Benchmark_Codecs.bl_idname, icon="SORTTIME")
+            report = load_report(context.scene)
+            if report is not None:
+                draw_codec_report(box1, report)
             box2 = box1.box()
             box2.label(text="Independent DATA Layer Config:", icon="SHADERFX")
             box2.prop(context.scene, "IDS_UseDATALayer")
@@ -126,19 +179,30 @@ class IDS_PT_OutputPanel_Base:
         col.scale_y = 3
         col.operator(IDS_OT_Make_Tree.bl_idname, icon="NODETREE")
         col.operator(IDS_OT_Update_Tree.bl_idname, icon="NODE_INSERT_OFF")
+        if len(bpy.data.scenes) > 1:
+            layout.operator(IDS_OT_Make_Tree_Scenes.bl_idname, icon="SCENE_DATA")
+        if context.scene.IDS_LastCookReport:
+            box = layout.box()
+            timing, _, counts = context.scene.IDS_LastCookReport.partition(" | ")
+            box.label(text=f"Last Cook: {timing}", icon="TIME")
+            if counts:
+                box.label(text=counts)
         col1 = layout.column()
         col1.operator(IDS_OT_Arr_Tree.bl_idname, icon="MOD_ARRAY")
         col1.operator(IDS_OT_Set_Material_AOV.bl_idname, icon="MATERIAL")
+        col1.operator(IDS_OT_Export_Manifest.bl_idname, icon="EXPORT")
         col2 = layout.column()
         if addon_prefs.Show_QuickDel is True:
             col2.label(text="Output Tools:")
             col2.operator(IDS_OT_Delete_Trash.bl_idname, icon="TRASH")
+            col2.operator(IDS_OT_Scan_Outputs.bl_idname, icon="VIEWZOOM")
         else:
             col2.label(text="Enable Output Tools in addon setting")
         if context.scene.IDS_CloudModeActive:
             col2.operator(IDS_OT_CloudMode.bl_idname, text="Restore Path Preset", icon="LOOP_BACK")
         else:
             col2.operator(IDS_OT_CloudMode.bl_idname, icon="SCREEN_BACK")
+        col2.prop(context.scene, "IDS_TokenChunkSize")
 
 
 class IDS_PT_OutputPanel(bpy.types.Panel, IDS_PT_OutputPanel_Base):